@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+실시간 알림 규칙
+링 버퍼 버킷 카운터와 누적 합으로 슬라이딩 윈도우를 유지해 로그당 O(1)로 판정
+"""
+
+import time
+from typing import Dict, List, Optional
+
+from storage import LogEntry
+
+
+class WindowCounter:
+    """최근 window초 동안의 건수 (링 버퍼 버킷)
+    
+    window를 buckets개 구간으로 나눠 세고, 시간이 흐르면 지난 버킷만
+    비우면서 합계에서 뺀다. 경계 버킷 하나만큼 오차가 있다.
+    """
+    
+    __slots__ = ('width', 'size', 'counts', 'current', 'total')
+    
+    def __init__(self, window: float, buckets: int = 60):
+        self.size = max(1, int(buckets))
+        self.width = window / self.size
+        self.counts = [0] * self.size
+        self.current = None  # 마지막 버킷 번호 (now // width)
+        self.total = 0
+        
+    def _advance(self, now: float):
+        index = int(now // self.width)
+        if self.current is None:
+            self.current = index
+            return
+        if index <= self.current:
+            return  # 같은 버킷 (시계가 뒤로 가면 현재 버킷에 합산)
+        if index - self.current >= self.size:
+            self.counts = [0] * self.size
+            self.total = 0
+        else:
+            for i in range(self.current + 1, index + 1):
+                slot = i % self.size
+                self.total -= self.counts[slot]
+                self.counts[slot] = 0
+        self.current = index
+        
+    def add(self, now: float, amount: int = 1) -> int:
+        """건수 추가 후 윈도우 합계 반환"""
+        self._advance(now)
+        self.counts[self.current % self.size] += amount
+        self.total += amount
+        return self.total
+        
+    def count(self, now: float) -> int:
+        self._advance(now)
+        return self.total
+
+
+class RunningMean:
+    """최근 size개 값의 평균 (링 버퍼 + 누적 합)
+    
+    한 바퀴 돌 때마다 합계를 다시 계산해 부동소수 오차가 쌓이지 않게 한다.
+    """
+    
+    __slots__ = ('values', 'index', 'count', 'total')
+    
+    def __init__(self, size: int = 100):
+        self.values = [0.0] * max(1, int(size))
+        self.index = 0
+        self.count = 0
+        self.total = 0.0
+        
+    def add(self, value: float):
+        if self.count == len(self.values):
+            self.total -= self.values[self.index]
+        else:
+            self.count += 1
+        self.values[self.index] = value
+        self.total += value
+        self.index = (self.index + 1) % len(self.values)
+        if self.index == 0:
+            self.total = sum(self.values)
+            
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class AlertRule:
+    """알림 규칙 기본 클래스
+    
+    sources가 있으면 해당 소스에만, levels가 있으면 해당 레벨에만 적용한다.
+    상태는 소스별로 따로 유지하고, cooldown(초) 동안은 같은 소스에 다시 알리지 않는다.
+    """
+    
+    type = None
+    
+    def __init__(self, config: Dict):
+        self.name = config.get('name') or self.type
+        self.sources = frozenset(config.get('sources') or ())
+        self.levels = frozenset(level.upper() for level in (config.get('levels') or ()))
+        self.cooldown = float(config.get('cooldown', 0))
+        self.last_fired = {}  # source -> 마지막 알림 시각
+        
+    def evaluate(self, log_entry: LogEntry, now: float) -> Optional[Dict]:
+        if self.levels and log_entry.level not in self.levels:
+            return None
+        alert = self.check(log_entry, now)
+        if alert is None:
+            return None
+        if self.cooldown:
+            last = self.last_fired.get(log_entry.source)
+            if last is not None and now - last < self.cooldown:
+                return None
+            self.last_fired[log_entry.source] = now
+        alert['rule'] = self.name
+        return alert
+        
+    def check(self, log_entry: LogEntry, now: float) -> Optional[Dict]:
+        raise NotImplementedError
+        
+    def describe(self) -> Dict:
+        return {
+            'name': self.name,
+            'type': self.type,
+            'sources': sorted(self.sources),
+            'levels': sorted(self.levels),
+            'cooldown': self.cooldown
+        }
+
+
+class ErrorSpikeRule(AlertRule):
+    """window초 동안 지정 레벨 로그가 threshold개 이상이면 알림"""
+    
+    type = 'error_spike'
+    
+    def __init__(self, config: Dict):
+        config = {'levels': ['ERROR', 'FATAL'], **config}
+        super().__init__(config)
+        self.threshold = int(config.get('threshold', 10))
+        self.window = float(config.get('window', 60))
+        self.buckets = int(config.get('buckets', 60))
+        self.counters = {}  # source -> WindowCounter
+        
+    def check(self, log_entry: LogEntry, now: float) -> Optional[Dict]:
+        counter = self.counters.get(log_entry.source)
+        if counter is None:
+            counter = self.counters[log_entry.source] = WindowCounter(self.window, self.buckets)
+        count = counter.add(now)
+        if count < self.threshold:
+            return None
+        return {
+            'type': 'error_spike',
+            'source': log_entry.source,
+            'count': count,
+            'window': self.window,
+            'threshold': self.threshold,
+            'message': f'{log_entry.source}에서 {self.window:g}초간 {count}개 에러 발생'
+        }
+        
+    def describe(self) -> Dict:
+        return {**super().describe(), 'threshold': self.threshold, 'window': self.window}
+
+
+class SlowResponseRule(AlertRule):
+    """metadata.duration_ms가 최근 samples개 평균의 multiplier배 이상이면 알림"""
+    
+    type = 'slow_response'
+    
+    def __init__(self, config: Dict):
+        super().__init__(config)
+        self.multiplier = float(config.get('multiplier', 3.0))
+        self.samples = int(config.get('samples', 100))
+        self.min_samples = int(config.get('min_samples', 10))
+        self.means = {}  # source -> RunningMean
+        
+    def check(self, log_entry: LogEntry, now: float) -> Optional[Dict]:
+        metadata = log_entry.metadata if isinstance(log_entry.metadata, dict) else {}
+        duration = metadata.get('duration_ms')
+        if not isinstance(duration, (int, float)) or isinstance(duration, bool) or duration <= 0:
+            return None
+        running = self.means.get(log_entry.source)
+        if running is None:
+            running = self.means[log_entry.source] = RunningMean(self.samples)
+        # 이번 값을 넣기 전 평균과 비교 (느린 요청이 기준을 끌어올리지 않게)
+        average = running.mean
+        enough = running.count >= self.min_samples
+        running.add(duration)
+        if not enough or duration <= average * self.multiplier:
+            return None
+        return {
+            'type': 'slow_response',
+            'source': log_entry.source,
+            'duration': duration,
+            'average': average,
+            'message': f'{log_entry.source} 응답시간 지연: {duration}ms (평균 {average:.1f}ms)'
+        }
+        
+    def describe(self) -> Dict:
+        return {**super().describe(), 'multiplier': self.multiplier, 'samples': self.samples}
+
+
+# 규칙 타입 등록표 - alerts.rules[].type 으로 선택
+ALERT_RULES = {
+    ErrorSpikeRule.type: ErrorSpikeRule,
+    SlowResponseRule.type: SlowResponseRule,
+}
+
+
+def default_rule_configs(config: Dict) -> List[Dict]:
+    """alerts.rules가 없을 때 기존 alerts 설정 값으로 기본 규칙 구성"""
+    return [
+        {
+            'type': 'error_spike',
+            'threshold': config.get('error_spike_threshold', 10),
+            'window': config.get('error_spike_window', 60)
+        },
+        {
+            'type': 'slow_response',
+            'sources': ['http_traffic', 'db_query'],
+            'multiplier': config.get('slow_response_multiplier', 3.0)
+        }
+    ]
+
+
+class RuleEngine:
+    """알림 규칙 묶음 - 소스별 적용 규칙 목록을 캐시해 로그마다 해당 규칙만 평가"""
+    
+    def __init__(self, rules: List[AlertRule]):
+        self.rules = rules
+        self.by_source = {}  # source -> 적용 규칙 튜플
+        
+    @classmethod
+    def from_config(cls, config: Dict = None) -> 'RuleEngine':
+        config = config or {}
+        if not config.get('enabled', True):
+            return cls([])
+        rules = []
+        for rule_config in config.get('rules') or default_rule_configs(config):
+            rule_class = ALERT_RULES.get(rule_config.get('type'))
+            if rule_class is None:
+                print(f"[WARNING] 알 수 없는 알림 규칙 타입: {rule_config.get('type')}")
+                continue
+            try:
+                rules.append(rule_class(rule_config))
+            except (TypeError, ValueError) as e:
+                print(f"[WARNING] 알림 규칙 설정 오류 ({rule_config}): {e}")
+        return cls(rules)
+        
+    def evaluate(self, log_entry: LogEntry, now: float = None) -> List[Dict]:
+        rules = self.by_source.get(log_entry.source)
+        if rules is None:
+            rules = self.by_source[log_entry.source] = tuple(
+                rule for rule in self.rules if not rule.sources or log_entry.source in rule.sources)
+        if not rules:
+            return []
+        now = now or time.time()
+        alerts = []
+        for rule in rules:
+            alert = rule.evaluate(log_entry, now)
+            if alert:
+                alerts.append(alert)
+        return alerts
+        
+    def describe(self) -> List[Dict]:
+        return [rule.describe() for rule in self.rules]
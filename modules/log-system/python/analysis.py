@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+로그 분석 엔진
+롤업(log_rollups)과 지연 시간 스케치(log_latency)를 컬럼 배열로 받아
+시간대별 분포, 에러율 시계열, 추세(선형 회귀/EWMA)를 벡터 연산으로 계산
+"""
+
+import math
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+
+ERROR_LEVELS = ('ERROR', 'CRITICAL', 'FATAL')
+
+# 회귀선 기준 구간 전체 변화율이 이 값(%) 미만이면 stable
+STABLE_CHANGE_PERCENT = 5.0
+
+# 시계열 점 개수 목표 (구간 길이 / SERIES_POINTS 를 롤업 단위로 올림)
+SERIES_POINTS = 24
+
+
+def _array(values: Sequence, dtype=float):
+    return np.asarray(values, dtype=dtype) if HAS_NUMPY else [dtype(value) for value in values]
+
+
+def _bincount(index, weights, size: int) -> List[float]:
+    """index별 weights 합계 (size 범위 밖 index는 무시)"""
+    if HAS_NUMPY:
+        index = np.asarray(index, dtype=np.int64)
+        weights = np.asarray(weights, dtype=float)
+        valid = (index >= 0) & (index < size)
+        return np.bincount(index[valid], weights=weights[valid], minlength=size)[:size].tolist()
+
+    totals = [0.0] * size
+    for position, weight in zip(index, weights):
+        if 0 <= position < size:
+            totals[position] += weight
+    return totals
+
+
+def _bucket_index(buckets, origin: float, width: float):
+    """버킷 시작 시각 -> 시계열 위치"""
+    if HAS_NUMPY:
+        return ((np.asarray(buckets, dtype=float) - origin) // width).astype(np.int64)
+    return [int((bucket - origin) // width) for bucket in buckets]
+
+
+def _mask(values, allowed: Sequence):
+    """values 중 allowed에 포함된 위치 (가중치 0/1)"""
+    if HAS_NUMPY:
+        return np.isin(np.asarray(values, dtype=object), list(allowed)).astype(float)
+    allowed = set(allowed)
+    return [1.0 if value in allowed else 0.0 for value in values]
+
+
+def _multiply(left, right):
+    if HAS_NUMPY:
+        return np.asarray(left, dtype=float) * np.asarray(right, dtype=float)
+    return [a * b for a, b in zip(left, right)]
+
+
+def linear_trend(values: Sequence[float]) -> Dict:
+    """최소제곱 직선 적합 - slope(점당 변화), intercept, r2"""
+    n = len(values)
+    if n < 2:
+        return {'slope': 0.0, 'intercept': float(values[0]) if n else 0.0, 'r2': 0.0}
+
+    if HAS_NUMPY:
+        y = np.asarray(values, dtype=float)
+        x = np.arange(n, dtype=float)
+        x_mean, y_mean = x.mean(), y.mean()
+        sxx = float(((x - x_mean) ** 2).sum())
+        sxy = float(((x - x_mean) * (y - y_mean)).sum())
+        syy = float(((y - y_mean) ** 2).sum())
+    else:
+        x_mean = (n - 1) / 2
+        y_mean = sum(values) / n
+        sxx = sum((x - x_mean) ** 2 for x in range(n))
+        sxy = sum((x - x_mean) * (y - y_mean) for x, y in enumerate(values))
+        syy = sum((y - y_mean) ** 2 for y in values)
+
+    slope = sxy / sxx
+    r2 = (sxy * sxy) / (sxx * syy) if syy > 0 else 0.0
+    return {'slope': slope, 'intercept': float(y_mean - slope * x_mean), 'r2': r2}
+
+
+def ewma(values: Sequence[float], span: int = 6) -> Optional[float]:
+    """지수 가중 이동 평균의 마지막 값 (alpha = 2 / (span + 1))"""
+    n = len(values)
+    if not n:
+        return None
+    alpha = 2 / (span + 1)
+    if HAS_NUMPY:
+        weights = (1 - alpha) ** np.arange(n - 1, -1, -1, dtype=float)
+        return float(np.dot(weights, np.asarray(values, dtype=float)) / weights.sum())
+    weights = [(1 - alpha) ** (n - 1 - i) for i in range(n)]
+    return sum(w * v for w, v in zip(weights, values)) / sum(weights)
+
+
+def describe_trend(values: Sequence[float]) -> Dict:
+    """시계열 추세 - 회귀선 기준 구간 전체 변화율, 방향, 신뢰도(r2), EWMA"""
+    values = [float(value) for value in values]
+    fit = linear_trend(values)
+    n = len(values)
+    start = fit['intercept']
+    end = fit['intercept'] + fit['slope'] * (n - 1)
+    mean = sum(values) / n if n else 0.0
+    # 시작점이 0 근처면 평균 대비 변화율 사용
+    base = abs(start) if abs(start) > 1e-9 else abs(mean)
+    change = (end - start) / base * 100 if base > 1e-9 else 0.0
+
+    if abs(change) < STABLE_CHANGE_PERCENT:
+        direction = 'stable'
+    else:
+        direction = 'increasing' if change > 0 else 'decreasing'
+
+    smoothed = ewma(values)
+    return {
+        'direction': direction,
+        'change_percentage': round(change, 2),
+        'confidence': round(fit['r2'], 3),
+        'slope_per_point': round(fit['slope'], 6),
+        'ewma': round(smoothed, 6) if smoothed is not None else None,
+        'mean': round(mean, 6),
+        'next_estimate': round(max(0.0, fit['intercept'] + fit['slope'] * n), 6)
+    }
+
+
+def series_width(columns: Dict) -> int:
+    """시계열 한 점의 길이 (초) - 롤업 단위의 배수로 약 SERIES_POINTS 개"""
+    unit = columns['width']
+    span = max(unit, columns['until'] - columns['since'])
+    return max(unit, math.ceil(span / SERIES_POINTS / unit) * unit)
+
+
+def build_series(columns: Dict, width: int = None) -> Dict:
+    """롤업 컬럼 -> 구간별 전체/에러 건수, 평균 지연 시간 시계열"""
+    width = width or series_width(columns)
+    origin = columns['since'] // columns['width'] * columns['width']
+    size = max(1, math.ceil((columns['until'] - origin) / width))
+
+    index = _bucket_index(columns['bucket'], origin, width)
+    counts = _array(columns['count'])
+    totals = _bincount(index, counts, size)
+    errors = _bincount(index, _multiply(counts, _mask(columns['level'], ERROR_LEVELS)), size)
+
+    latency_index = _bucket_index(columns['latency_bucket'], origin, width)
+    latency_counts = _bincount(latency_index, _array(columns['latency_count']), size)
+    latency_totals = _bincount(latency_index, _array(columns['latency_total_ms']), size)
+
+    # 구간 양 끝 점은 일부만 조회 범위에 들어가므로 건수 추세는 포함 비율로 보정
+    starts = [origin + i * width for i in range(size)]
+    coverage = [max(0.0, min(start + width, columns['until']) - start) / width for start in starts]
+
+    return {
+        'width': width,
+        'starts': starts,
+        'coverage': coverage,
+        'totals': totals,
+        'volume_rates': [t / c if c > 0 else 0.0 for t, c in zip(totals, coverage)],
+        'errors': errors,
+        'error_rates': [e / t * 100 if t else 0.0 for e, t in zip(errors, totals)],
+        'latency_counts': latency_counts,
+        'avg_latency': [s / c if c else None for s, c in zip(latency_totals, latency_counts)]
+    }
+
+
+def hourly_histogram(columns: Dict, utc_offset: float = None) -> List[Dict]:
+    """시간대(0~23시, 로컬 시각)별 전체/에러 건수"""
+    if utc_offset is None:
+        utc_offset = time.localtime().tm_gmtoff
+    counts = _array(columns['count'])
+    if HAS_NUMPY:
+        hours = ((np.asarray(columns['bucket'], dtype=float) + utc_offset) // 3600 % 24).astype(np.int64)
+    else:
+        hours = [int((bucket + utc_offset) // 3600 % 24) for bucket in columns['bucket']]
+    totals = _bincount(hours, counts, 24)
+    errors = _bincount(hours, _multiply(counts, _mask(columns['level'], ERROR_LEVELS)), 24)
+    grand_total = sum(totals)
+    return [{
+        'hour': hour,
+        'count': int(totals[hour]),
+        'error_count': int(errors[hour]),
+        'error_rate': round(errors[hour] / max(1, grand_total) * 100, 2)
+    } for hour in range(24)]
+
+
+def analyze_trends(columns: Dict) -> Dict:
+    """볼륨/에러율/응답시간 추세 분석"""
+    series = build_series(columns)
+    volume = describe_trend(series['volume_rates'])
+    error_rate = describe_trend(series['error_rates'])
+
+    # 응답시간은 측정값이 있는 구간만 사용
+    latencies = [value for value in series['avg_latency'] if value is not None]
+    if len(latencies) >= 2:
+        latency = describe_trend(latencies)
+        response_time_trend = {'increasing': 'degrading', 'decreasing': 'improving'}.get(latency['direction'], 'stable')
+    else:
+        latency = None
+        response_time_trend = 'unknown'
+
+    throughput_trend = {'increasing': 'increasing', 'decreasing': 'decreasing'}.get(volume['direction'], 'stable')
+    total = sum(series['totals'])
+
+    return {
+        'volume_trend': volume,
+        'error_rate_trend': error_rate,
+        'latency_trend': latency,
+        'performance_trend': {
+            'response_time_trend': response_time_trend,
+            'throughput_trend': throughput_trend
+        },
+        'predictions': [
+            {'metric': 'volume', 'next_interval_estimate': volume['next_estimate'], 'interval_seconds': series['width']},
+            {'metric': 'error_rate', 'next_interval_estimate': error_rate['next_estimate'], 'interval_seconds': series['width']}
+        ],
+        'series': {
+            'interval_seconds': series['width'],
+            'starts': series['starts'],
+            'totals': [int(value) for value in series['totals']],
+            'errors': [int(value) for value in series['errors']],
+            'error_rates': [round(value, 3) for value in series['error_rates']],
+            'avg_latency_ms': [round(value, 3) if value is not None else None for value in series['avg_latency']]
+        },
+        'total_logs': int(total),
+        'total_errors': int(sum(series['errors']))
+    }
+
+
+class SeasonalBaseline:
+    """시간대(로컬 0~23시)별 지수 가중 평균/분산
+    
+    표본이 1/alpha 개보다 적은 동안은 단순 평균(Welford)처럼 동작하고,
+    그 뒤로는 alpha 비율로 최근 값을 반영한다. 갱신/판정 모두 O(1).
+    마지막 슬롯(ALL)은 시간대와 무관한 전체 기준선으로, 해당 시간대
+    표본이 부족할 때 대신 쓴다.
+    """
+    
+    ALL = 24
+    
+    __slots__ = ('n', 'mean', 'var')
+    
+    def __init__(self):
+        self.n = [0] * 25
+        self.mean = [0.0] * 25
+        self.var = [0.0] * 25
+        
+    def select(self, slot: int, min_samples: int) -> Optional[int]:
+        """판정에 쓸 슬롯 - 시간대 표본이 부족하면 전체 기준선, 둘 다 부족하면 None"""
+        if self.n[slot] >= min_samples:
+            return slot
+        if self.n[self.ALL] >= min_samples:
+            return self.ALL
+        return None
+        
+    def score(self, slot: int, value: float, floor: float) -> float:
+        """기준선 대비 편차 (표준편차 단위) - floor는 분산 하한"""
+        spread = math.sqrt(max(self.var[slot], floor))
+        return (value - self.mean[slot]) / spread if spread > 0 else 0.0
+        
+    def update(self, slot: int, value: float, alpha: float):
+        self._update(slot, value, alpha)
+        self._update(self.ALL, value, alpha)
+        
+    def _update(self, slot: int, value: float, alpha: float):
+        self.n[slot] += 1
+        weight = max(alpha, 1.0 / self.n[slot])
+        diff = value - self.mean[slot]
+        increment = weight * diff
+        self.mean[slot] += increment
+        self.var[slot] = (1 - weight) * (self.var[slot] + diff * increment)
+
+
+class AnomalyDetector:
+    """분 단위 시계열 이상 탐지
+    
+    (소스, 레벨)별 분당 건수와 소스별 분당 평균 응답시간(metadata.duration_ms)을
+    시간대별 SeasonalBaseline과 비교한다. 로그마다 현재 분 카운터만 올리고,
+    분이 바뀔 때 닫힌 분의 값을 한 번씩 판정한 뒤 기준선에 반영한다.
+    """
+    
+    def __init__(self, z_threshold: float = 4.0, alpha: float = 0.05, min_samples: int = 30,
+                 max_gap_minutes: int = 60, history: int = 500):
+        self.z_threshold = z_threshold
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.max_gap_minutes = max_gap_minutes
+        self.counts = {}  # (source, level) -> SeasonalBaseline
+        self.latency = {}  # source -> SeasonalBaseline
+        self.minute = None  # 집계 중인 분 (시작 epoch 초)
+        self.current_counts = {}
+        self.current_latency = {}  # source -> [건수, 합계 ms]
+        self.last_scores = {}  # 시계열 -> 마지막으로 닫힌 분의 판정
+        self.recent = deque(maxlen=history)  # 최근 이상 징후
+        
+    @staticmethod
+    def _slot(minute: float) -> int:
+        return time.localtime(minute).tm_hour
+        
+    def observe(self, source: str, level: str, duration, now: float) -> List[Dict]:
+        """로그 한 건 반영 - 분이 바뀌었으면 닫힌 분의 이상 징후 반환"""
+        alerts = self.tick(now)
+        key = (source, level)
+        self.current_counts[key] = self.current_counts.get(key, 0) + 1
+        if isinstance(duration, (int, float)) and not isinstance(duration, bool):
+            latency = self.current_latency.get(source)
+            if latency is None:
+                self.current_latency[source] = [1, float(duration)]
+            else:
+                latency[0] += 1
+                latency[1] += duration
+        return alerts
+        
+    def tick(self, now: float) -> List[Dict]:
+        """현재 분이 지났으면 닫고 (로그가 없던 분은 0건으로) 판정"""
+        minute = int(now // 60) * 60
+        if self.minute is None:
+            self.minute = minute
+            return []
+        if minute <= self.minute:
+            return []
+            
+        alerts = self._fold(self.minute, self.current_counts, self.current_latency)
+        self.current_counts = {}
+        self.current_latency = {}
+        gap = min(int((minute - self.minute) // 60) - 1, self.max_gap_minutes)
+        for i in range(gap, 0, -1):
+            alerts.extend(self._fold(minute - i * 60, {}, {}))
+        self.minute = minute
+        return alerts
+        
+    def _fold(self, minute: float, counts: Dict, latency: Dict) -> List[Dict]:
+        slot = self._slot(minute)
+        alerts = []
+        for key in set(self.counts).union(counts):
+            baseline = self.counts.get(key)
+            if baseline is None:
+                baseline = self.counts[key] = SeasonalBaseline()
+            value = counts.get(key, 0)
+            # 건수는 포아송 분산(평균) 이상, 최소 1
+            alert = self._check(('count',) + key, baseline, slot, minute, value,
+                                lambda mean: max(mean, 1.0))
+            if alert:
+                alerts.append(alert)
+            baseline.update(slot, value, self.alpha)
+            
+        for source in self.latency:
+            if source not in latency:
+                # 응답시간이 없던 분은 판정하지 않음 (0ms로 보지 않는다)
+                self.last_scores.pop(('latency', source, None), None)
+        for source, (count, total) in latency.items():
+            baseline = self.latency.get(source)
+            if baseline is None:
+                baseline = self.latency[source] = SeasonalBaseline()
+            value = total / count
+            # 응답시간은 평균의 10% 이상, 최소 1ms 흔들림은 정상으로 간주
+            alert = self._check(('latency', source, None), baseline, slot, minute, value,
+                                lambda mean: max((mean * 0.1) ** 2, 1.0))
+            if alert:
+                alerts.append(alert)
+            baseline.update(slot, value, self.alpha)
+        return alerts
+        
+    def _check(self, series: tuple, baseline: SeasonalBaseline, slot: int, minute: float,
+               value: float, floor) -> Optional[Dict]:
+        """floor(기준 평균) -> 분산 하한"""
+        slot = baseline.select(slot, self.min_samples)
+        if slot is None:
+            self.last_scores.pop(series, None)
+            return None
+        score = baseline.score(slot, value, floor(baseline.mean[slot]))
+        expected = baseline.mean[slot]
+        self.last_scores[series] = (minute, value, expected, score)
+        if abs(score) < self.z_threshold:
+            return None
+            
+        metric, source, level = series
+        direction = 'spike' if score > 0 else 'drop'
+        label = f"{source}/{level} 분당 로그 수" if metric == 'count' else f"{source} 평균 응답시간"
+        anomaly = {
+            'id': f"anomaly_{int(minute)}_{metric}_{source}_{level or ''}",
+            'type': f"{metric}_{direction}",
+            'severity': 'high' if abs(score) >= self.z_threshold * 2 else 'medium',
+            'timestamp': datetime.fromtimestamp(minute).isoformat(),
+            'minute': minute,
+            'metric': metric,
+            'source': source,
+            'level': level,
+            'actual_value': round(value, 3),
+            'expected_value': round(expected, 3),
+            'deviation_score': round(score, 2),
+            'message': f"{label} {value:.1f} (기준 {expected:.1f}, {score:+.1f}σ)"
+        }
+        self.recent.append(anomaly)
+        return anomaly
+        
+    def seed(self, columns: Dict):
+        """분 롤업 컬럼(get_analysis_columns)으로 기준선 초기화 - 시작 시 한 번
+        
+        기존 기준선은 버리고 구간의 모든 분(로그가 없던 분은 0건)을 순서대로 반영한다.
+        """
+        if columns['width'] != 60 or not columns['bucket']:
+            return
+        self.counts = {}
+        self.latency = {}
+        start = int(columns['since'] // 60 * 60)
+        end = int(columns['until'] // 60 * 60)  # 현재 분은 제외 (실시간 집계에서 이어서 셈)
+        minutes = range(start, end, 60)
+        
+        values = defaultdict(dict)  # (source, level) -> {minute: 건수}
+        for bucket, source, level, count in zip(columns['bucket'], columns['source'],
+                                                columns['level'], columns['count']):
+            if bucket < end:
+                values[(source, level)][bucket] = count
+        for key, series in values.items():
+            baseline = self.counts[key] = SeasonalBaseline()
+            first = min(series)
+            for minute in minutes:
+                if minute >= first:
+                    baseline.update(self._slot(minute), series.get(minute, 0), self.alpha)
+                    
+        latency = defaultdict(list)
+        for bucket, source, count, total in zip(columns['latency_bucket'], columns['latency_source'],
+                                                columns['latency_count'], columns['latency_total_ms']):
+            if bucket < end and count:
+                latency[source].append((bucket, total / count))
+        for source, series in latency.items():
+            baseline = self.latency[source] = SeasonalBaseline()
+            for minute, value in sorted(series):
+                baseline.update(self._slot(minute), value, self.alpha)
+                
+    def report(self, since: float) -> Dict:
+        """since 이후 이상 징후와 마지막으로 닫힌 분의 시계열별 편차"""
+        anomalies = [anomaly for anomaly in self.recent if anomaly['minute'] >= since]
+        current = sorted(self.last_scores.items(), key=lambda item: abs(item[1][3]), reverse=True)
+        worst = abs(current[0][1][3]) if current else 0.0
+        anomalous = sum(1 for _, (_, _, _, score) in current if abs(score) >= self.z_threshold)
+        return {
+            'anomalies': list(reversed(anomalies)),
+            'overall_anomaly_score': round(min(1.0, worst / (self.z_threshold * 2)), 3),
+            'health_score': round(1.0 - anomalous / len(current), 3) if current else 1.0,
+            'current': [{
+                'metric': metric,
+                'source': source,
+                'level': level,
+                'minute': datetime.fromtimestamp(minute).isoformat(),
+                'actual_value': round(value, 3),
+                'expected_value': round(expected, 3),
+                'deviation_score': round(score, 2)
+            } for (metric, source, level), (minute, value, expected, score) in current[:20]],
+            'baselines': {
+                'count_series': len(self.counts),
+                'latency_series': len(self.latency),
+                'z_threshold': self.z_threshold,
+                'min_samples': self.min_samples
+            }
+        }
@@ -5,6 +5,8 @@
 """
 
 import asyncio
+import fnmatch
+import gzip
 import json
 import time
 import uuid
@@ -16,7 +18,8 @@ import re
 import os
 import sys
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any, Callable, Set
+from typing import Dict, List, Optional, Any, Callable, Set, Tuple
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass
@@ -36,6 +39,7 @@ try:
     from watchdog.events import FileSystemEventHandler
     HAS_WATCHDOG = True
 except ImportError:
+    FileSystemEventHandler = object
     HAS_WATCHDOG = False
 
 try:
@@ -46,10 +50,31 @@ except ImportError:
 
 try:
     import aiohttp
+    from aiohttp import web
     HAS_AIOHTTP = True
 except ImportError:
     HAS_AIOHTTP = False
 
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:
+    from compression import zstd  # Python 3.14+
+    zstd_compress = zstd.compress
+    HAS_ZSTD = True
+except ImportError:
+    try:
+        import zstandard
+        zstd_compress = zstandard.ZstdCompressor().compress
+        HAS_ZSTD = True
+    except ImportError:
+        HAS_ZSTD = False
+
+from tailer import FileTailer
+
 
 @dataclass
 class CollectorConfig:
@@ -60,16 +85,73 @@ class CollectorConfig:
     flush_interval: float = 1.0
     retry_count: int = 3
     retry_delay: float = 1.0
+    max_buffer_size: int = 10000  # 전송 대기 중 메모리에 둘 최대 로그 수
+    spool_dir: Optional[str] = "./logs/spool"  # None이면 스풀 없이 재시도 후 버림
+    spool_max_bytes: int = 64 * 1024 * 1024
+    spool_segment_bytes: int = 4 * 1024 * 1024
+    replay_rate: float = 2000.0  # 스풀 재전송 속도 (로그/초)
+    replay_batch_size: int = 500
+    replay_max_attempts: int = 5  # 서버가 거부(4xx)한 로그 하나를 격리하기 전 재시도 횟수
 
 
 class LogClient:
-    """JSON-RPC 클라이언트"""
+    """JSON-RPC 클라이언트
+    
+    처음 배치를 보낼 때 ping으로 서버가 받을 수 있는 Content-Encoding과 본문 형식을
+    확인한다. 배치는 크기와 관계없이 msgpack(양쪽에 설치된 경우)으로 인코딩하고,
+    본문이 compress_min_bytes 이상이면 zstd 또는 gzip으로 압축해 보낸다.
+    서버가 알려주지 않으면 평문 JSON을 보낸다.
+    """
+    
+    # 클라이언트가 만들 수 있는 압축 (선호 순)
+    ENCODERS = {
+        'zstd': zstd_compress if HAS_ZSTD else None,
+        # 반복이 많은 로그 JSON은 가장 낮은 압축 수준에서도 대부분 줄어든다
+        'gzip': lambda body: gzip.compress(body, compresslevel=1),
+    }
     
-    def __init__(self, server_url: str):
+    def __init__(self, server_url: str, compress_min_bytes: int = 4096):
         self.server_url = server_url
+        self.compress_min_bytes = compress_min_bytes
+        self.capabilities = None  # ping으로 확인한 서버 기능 (None이면 아직 확인 전)
+        self.encoding = None  # 배치에 쓸 Content-Encoding
+        self.binary = False  # 배치를 msgpack으로 보낼지
         self.session = None
         if HAS_AIOHTTP:
             self.session = aiohttp.ClientSession()
+            
+    async def negotiate(self) -> Dict:
+        """서버 기능 확인 - 실패하면 다음 배치에서 다시 시도"""
+        if self.capabilities is not None or not self.session:
+            return self.capabilities or {}
+        payload = {"jsonrpc": "2.0", "method": "ping", "params": {}, "id": str(uuid.uuid4())}
+        try:
+            async with self.session.post(self.server_url, json=payload) as resp:
+                if resp.status != 200:
+                    return {}
+                result = (await resp.json()).get('result') or {}
+        except Exception:
+            return {}
+        # capabilities가 없는 서버는 평문 JSON만 받는다
+        self.capabilities = result.get('capabilities') or {}
+        encodings = self.capabilities.get('encodings', [])
+        self.encoding = next((name for name, encoder in self.ENCODERS.items()
+                              if encoder and name in encodings), None)
+        self.binary = HAS_MSGPACK and 'msgpack' in self.capabilities.get('formats', [])
+        return self.capabilities
+        
+    def _encode_batch(self, payload: Dict):
+        """배치 요청 본문과 헤더 - 형식은 협상 결과대로, 압축은 compress_min_bytes 이상일 때만"""
+        if self.binary:
+            body = msgpack.packb(payload, use_bin_type=True)
+            headers = {'Content-Type': 'application/msgpack'}
+        else:
+            body = json.dumps(payload).encode('utf-8')
+            headers = {'Content-Type': 'application/json'}
+        if self.encoding and len(body) >= self.compress_min_bytes:
+            body = self.ENCODERS[self.encoding](body)
+            headers['Content-Encoding'] = self.encoding
+        return body, headers
         
     async def send_log(self, source: str, level: str, message: str, 
                       metadata: Dict = None, tags: List[str] = None, 
@@ -106,23 +188,52 @@ class LogClient:
             
     async def send_batch(self, logs: List[Dict]) -> bool:
         """배치 로그 전송"""
+        status, _ = await self.post_batch(logs)
+        return status == 200
+        
+    async def post_batch(self, logs: List[Dict]) -> Tuple[Optional[int], Optional[int]]:
+        """배치 로그 전송 - (HTTP 상태 코드, JSON-RPC 에러 코드) 반환 (연결 실패면 (None, None))"""
         payload = {
             "jsonrpc": "2.0",
             "method": "log_batch",
             "params": {
-                "logs": logs,
-                "compress": len(logs) > 50
+                "logs": logs
             },
             "id": str(uuid.uuid4())
         }
         
         try:
             if self.session:
-                async with self.session.post(self.server_url, json=payload) as resp:
-                    return resp.status == 200
-            return False
+                await self.negotiate()
+                body, headers = self._encode_batch(payload)
+                async with self.session.post(self.server_url, data=body, headers=headers) as resp:
+                    if resp.status != 200 and (self.binary or self.encoding):
+                        # 서버가 바뀌었을 수 있으므로 다음 배치에서 다시 확인
+                        self.capabilities = None
+                        self.encoding = None
+                        self.binary = False
+                    if resp.status == 200:
+                        return resp.status, None
+                    try:
+                        error = (await resp.json(content_type=None)).get('error') or {}
+                        return resp.status, error.get('code')
+                    except Exception:
+                        return resp.status, None
+            return None, None
         except Exception as e:
             print(f"배치 로그 전송 실패: {e}")
+            return None, None
+            
+    async def health(self) -> bool:
+        """서버 /health 확인"""
+        if not self.session:
+            return False
+        parsed = urlparse(self.server_url)
+        try:
+            async with self.session.get(f"{parsed.scheme}://{parsed.netloc}/health",
+                                        timeout=aiohttp.ClientTimeout(total=5)) as resp:
+                return resp.status == 200
+        except Exception:
             return False
             
     async def close(self):
@@ -130,8 +241,177 @@ class LogClient:
             await self.session.close()
 
 
+class DiskSpool:
+    """수집기별 디스크 스풀 - 서버에 보내지 못한 로그를 세그먼트 파일에 쌓고 순서대로 재전송
+    
+    <directory>/<name>/ 아래 번호순 세그먼트(NDJSON, 한 줄에 로그 하나)에 추가만 하고,
+    재전송에 성공한 위치(세그먼트 번호, 오프셋)를 ack 파일에 기록한다. 전체 크기가
+    max_bytes를 넘으면 가장 오래된 세그먼트부터 지운다. 수집기 태스크와 executor
+    스레드에서 함께 쓰므로 모든 파일 작업은 lock 안에서 한다.
+    """
+    
+    def __init__(self, directory: str, name: str, max_bytes: int = 64 * 1024 * 1024,
+                 segment_bytes: int = 4 * 1024 * 1024):
+        self.path = Path(directory) / name
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # 삭제 단위가 세그먼트이므로 최소 두 개는 들어가게
+        self.segment_bytes = max(1, min(segment_bytes, max_bytes // 2))
+        self.lock = threading.Lock()
+        self.sizes = {int(path.stem): path.stat().st_size for path in self.path.glob('*.seg')}
+        self.segments = sorted(self.sizes)
+        self.total_bytes = sum(self.sizes.values())
+        # 이전 실행이 쓰다 끊긴 줄 뒤에 붙이지 않도록 시작할 때마다 새 세그먼트에 쓴다
+        self.write_seq = (self.segments[-1] if self.segments else 0) + 1
+        self.writer = None
+        self.ack_seq, self.ack_offset = self._load_ack()
+        self.stats = {'appended': 0, 'acked': 0, 'quarantined': 0, 'evicted_segments': 0, 'evicted_bytes': 0}
+        
+    def _segment_path(self, seq: int) -> Path:
+        return self.path / f"{seq:012d}.seg"
+        
+    def _load_ack(self) -> Tuple[int, int]:
+        try:
+            with open(self.path / 'ack') as f:
+                ack = json.load(f)
+            position = (int(ack['segment']), int(ack['offset']))
+        except (OSError, ValueError, KeyError, TypeError):
+            position = (0, 0)
+        if self.segments and position[0] < self.segments[0]:
+            position = (self.segments[0], 0)
+        return position
+        
+    def _save_ack(self):
+        temp_path = self.path / 'ack.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'segment': self.ack_seq, 'offset': self.ack_offset}, f)
+        os.replace(temp_path, self.path / 'ack')
+        
+    def append(self, entries: List[Dict]) -> int:
+        """로그 추가 - 기록한 바이트 수 반환"""
+        data = b''.join(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b'\n' for entry in entries)
+        with self.lock:
+            if self.writer is None or self.sizes[self.write_seq] >= self.segment_bytes:
+                self._roll()
+            self.writer.write(data)
+            self.writer.flush()
+            self.sizes[self.write_seq] += len(data)
+            self.total_bytes += len(data)
+            self.stats['appended'] += len(entries)
+            self._evict()
+        return len(data)
+        
+    def _roll(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.write_seq += 1
+        self.writer = open(self._segment_path(self.write_seq), 'ab')
+        self.sizes[self.write_seq] = 0
+        self.segments.append(self.write_seq)
+        
+    def _evict(self):
+        """용량 초과 시 가장 오래된 세그먼트부터 삭제 (쓰는 중인 세그먼트는 남김)"""
+        while self.total_bytes > self.max_bytes and len(self.segments) > 1:
+            oldest = self.segments.pop(0)
+            size = self.sizes.pop(oldest)
+            self.total_bytes -= size
+            self.stats['evicted_segments'] += 1
+            self.stats['evicted_bytes'] += size - (self.ack_offset if oldest == self.ack_seq else 0)
+            try:
+                os.remove(self._segment_path(oldest))
+            except OSError:
+                pass
+            if self.ack_seq <= oldest:
+                self.ack_seq, self.ack_offset = self.segments[0], 0
+                self._save_ack()
+                
+    def has_pending(self) -> bool:
+        with self.lock:
+            return self._pending_bytes() > 0
+            
+    def _pending_bytes(self) -> int:
+        return sum(size for seq, size in self.sizes.items() if seq >= self.ack_seq) - (
+            self.ack_offset if self.ack_seq in self.sizes else 0)
+            
+    def read(self, max_entries: int) -> Tuple[List[Dict], Tuple[int, int]]:
+        """ack 위치부터 최대 max_entries개 읽기 - (로그 목록, 읽은 뒤 위치) 반환
+        
+        위치는 전송에 성공한 뒤 ack()로 넘겨야 기록된다. 쓰는 중인 세그먼트의
+        끝나지 않은 줄은 다음에 읽고, 끝난 세그먼트의 잘린 줄은 건너뛴다.
+        """
+        entries = []
+        with self.lock:
+            seq, offset = self.ack_seq, self.ack_offset
+            for segment in self.segments:
+                if segment < seq:
+                    continue
+                if segment > seq:
+                    seq, offset = segment, 0
+                active = self.writer is not None and segment == self.write_seq
+                with open(self._segment_path(segment), 'rb') as f:
+                    f.seek(offset)
+                    while len(entries) < max_entries:
+                        line = f.readline()
+                        if not line:
+                            break
+                        if not line.endswith(b'\n'):
+                            if not active:
+                                offset += len(line)  # 이전 실행에서 잘린 줄
+                            break
+                        offset += len(line)
+                        try:
+                            entries.append(json.loads(line))
+                        except ValueError:
+                            continue
+                if active or len(entries) >= max_entries:
+                    break
+        return entries, (seq, offset)
+        
+    def ack(self, position: Tuple[int, int], count: int = 0):
+        """position까지 전송 완료 기록 - 다 읽은 세그먼트는 삭제"""
+        with self.lock:
+            self.ack_seq, self.ack_offset = position
+            self.stats['acked'] += count
+            while self.segments and self.segments[0] < self.ack_seq:
+                done = self.segments.pop(0)
+                self.total_bytes -= self.sizes.pop(done)
+                try:
+                    os.remove(self._segment_path(done))
+                except OSError:
+                    pass
+            self._save_ack()
+            
+    def quarantine(self, entries: List[Dict]):
+        """서버가 계속 거부하는 로그를 quarantine.ndjson으로 옮겨 둔다 (재전송 대상 아님)"""
+        data = b''.join(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b'\n' for entry in entries)
+        with self.lock:
+            with open(self.path / 'quarantine.ndjson', 'ab') as f:
+                f.write(data)
+            self.stats['quarantined'] += len(entries)
+            
+    def close(self):
+        with self.lock:
+            if self.writer is not None:
+                self.writer.close()
+                self.writer = None
+                
+    def get_stats(self) -> Dict:
+        with self.lock:
+            return {
+                **self.stats,
+                'segments': len(self.segments),
+                'total_bytes': self.total_bytes,
+                'pending_bytes': self._pending_bytes()
+            }
+
+
 class BaseCollector(ABC):
-    """로그 수집기 베이스 클래스"""
+    """로그 수집기 베이스 클래스
+    
+    전송에 실패한 배치는 디스크 스풀(spool_dir)에 쌓고, 재전송 워커가 /health가
+    살아나면 ack 위치부터 replay_rate 속도로 다시 보낸다. 스풀에 밀린 로그가 있는
+    동안은 새 배치도 스풀 뒤에 붙여 순서를 지킨다. 메모리 버퍼는 max_buffer_size로 제한된다.
+    """
     
     def __init__(self, name: str, config: CollectorConfig):
         self.name = name
@@ -140,6 +420,13 @@ class BaseCollector(ABC):
         self.running = False
         self.buffer = []
         self.last_flush = time.time()
+        self.flush_lock = asyncio.Lock()
+        self.spool = None
+        self.spool_lock = asyncio.Lock()  # executor에서 쓰는 append의 순서 유지
+        if config.spool_dir:
+            self.spool = DiskSpool(config.spool_dir, name, config.spool_max_bytes, config.spool_segment_bytes)
+        self.server_available = True
+        self.dropped = 0  # 스풀 없이 버린 로그 수
         
     @abstractmethod
     async def start_collecting(self):
@@ -156,11 +443,12 @@ class BaseCollector(ABC):
         self.running = True
         
         # 수집 태스크 시작
-        collect_task = asyncio.create_task(self.start_collecting())
-        flush_task = asyncio.create_task(self._flush_worker())
+        tasks = [asyncio.create_task(self.start_collecting()), asyncio.create_task(self._flush_worker())]
+        if self.spool:
+            tasks.append(asyncio.create_task(self._replay_worker()))
         
         try:
-            await asyncio.gather(collect_task, flush_task)
+            await asyncio.gather(*tasks)
         except Exception as e:
             print(f"{self.name} 수집기 오류: {e}")
         finally:
@@ -171,6 +459,8 @@ class BaseCollector(ABC):
         self.running = False
         await self._flush_buffer()
         await self.client.close()
+        if self.spool:
+            self.spool.close()
         print(f"{self.name} 수집기 중지됨")
         
     async def log(self, level: str, message: str, metadata: Dict = None, 
@@ -188,8 +478,18 @@ class BaseCollector(ABC):
         
         self.buffer.append(log_entry)
         
+        # 전송이 밀려 버퍼가 상한에 닿으면 기다리지 않고 스풀로 (스풀이 없으면 오래된 것부터 버림)
+        if len(self.buffer) >= self.config.max_buffer_size:
+            if self.spool:
+                overflow, self.buffer = self.buffer, []
+                await self._spool(overflow)
+            else:
+                excess = len(self.buffer) - self.config.max_buffer_size + 1
+                del self.buffer[:excess]
+                self.dropped += excess
+                
         # 버퍼 크기 확인
-        if len(self.buffer) >= self.config.buffer_size:
+        if len(self.buffer) >= self.config.buffer_size and not self.flush_lock.locked():
             await self._flush_buffer()
             
     async def _flush_worker(self):
@@ -202,22 +502,145 @@ class BaseCollector(ABC):
                 await self._flush_buffer()
                 
     async def _flush_buffer(self):
-        """버퍼 비우기"""
-        if not self.buffer:
-            return
+        """버퍼 비우기 - 한 번에 하나만 전송"""
+        async with self.flush_lock:
+            if not self.buffer:
+                return
+                
+            logs_to_send = self.buffer
+            self.buffer = []
+            self.last_flush = time.time()
             
-        logs_to_send = self.buffer.copy()
-        self.buffer.clear()
-        self.last_flush = time.time()
+            if self.spool:
+                # 스풀에 밀렸거나 기록 중인 로그가 있으면 순서를 지키기 위해 그 뒤에 붙임
+                if self.server_available and not self.spool_lock.locked() and not self.spool.has_pending():
+                    if await self.client.send_batch(logs_to_send):
+                        return
+                    self.server_available = False
+                    print(f"{self.name}: 로그 서버 전송 실패, 디스크 스풀에 저장")
+                await self._spool(logs_to_send)
+                return
+                
+            # 재시도 로직
+            for attempt in range(self.config.retry_count):
+                success = await self.client.send_batch(logs_to_send)
+                if success:
+                    break
+                else:
+                    if attempt < self.config.retry_count - 1:
+                        await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
+            else:
+                self.dropped += len(logs_to_send)
+                
+    async def _spool(self, logs: List[Dict]):
+        """스풀에 추가 - 재전송이 중복되어도 서버가 같은 로그로 덮어쓰도록 ID 부여
         
-        # 재시도 로직
-        for attempt in range(self.config.retry_count):
-            success = await self.client.send_batch(logs_to_send)
-            if success:
-                break
+        쓰기, 세그먼트 교체와 삭제는 executor에서 하고, 호출 순서대로 기록되도록 spool_lock으로 줄 세운다.
+        """
+        for log_entry in logs:
+            log_entry.setdefault('id', str(uuid.uuid4()))
+        loop = asyncio.get_running_loop()
+        try:
+            async with self.spool_lock:
+                await loop.run_in_executor(None, self.spool.append, logs)
+        except OSError as e:
+            self.dropped += len(logs)
+            print(f"{self.name}: 스풀 쓰기 실패 ({len(logs)}개 버림): {e}")
+            
+    # 요청 내용 때문에 다시 보내도 실패하는 JSON-RPC 에러 (Parse error, Invalid Request, Invalid params)
+    PERMANENT_RPC_ERRORS = (-32700, -32600, -32602)
+    
+    @classmethod
+    def _is_rejected(cls, status: Optional[int], rpc_code: Optional[int] = None) -> bool:
+        """서버가 요청 내용을 거부했는지 - 413이나 영구적인 JSON-RPC 에러만
+        
+        서버는 모든 JSON-RPC 에러를 HTTP 400으로 돌려주므로 -32603(Internal error),
+        -32001(Query timeout) 같은 서버측 실패는 연결 실패와 같이 일시적인 것으로 본다.
+        """
+        if status == 413:
+            return True
+        return status == 400 and rpc_code in cls.PERMANENT_RPC_ERRORS
+        
+    async def _replay_worker(self):
+        """스풀 재전송 워커 - 서버가 살아나면 ack 위치부터 replay_rate 속도로 전송
+        
+        전송이 실패하면 /health 결과와 관계없이 지수 백오프한다. 서버가 배치를 거부(_is_rejected)하면
+        배치를 반씩 줄여 거부된 로그를 좁히고, 로그 하나가 replay_max_attempts번 거부되면
+        quarantine으로 옮기고 ack해서 뒤의 로그가 막히지 않게 한다.
+        """
+        loop = asyncio.get_running_loop()
+        delay = self.config.retry_delay
+        batch_size = self.config.replay_batch_size
+        rejected_until = None  # 거부된 배치의 끝 위치 - 지나갈 때까지 줄인 배치 크기 유지
+        attempts = 0
+        while self.running:
+            if not self.spool.has_pending():
+                await asyncio.sleep(self.config.flush_interval)
+                continue
+                
+            if not self.server_available:
+                if not await self.client.health():
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 30.0)
+                    continue
+                self.server_available = True
+                print(f"{self.name}: 로그 서버 복구, 스풀 재전송 시작")
+                
+            entries, position = await loop.run_in_executor(None, self.spool.read, batch_size)
+            if not entries:
+                # 건너뛴 줄만 있었거나 아직 쓰는 중인 줄
+                await loop.run_in_executor(None, self.spool.ack, position)
+                await asyncio.sleep(self.config.flush_interval)
+                continue
+                
+            started = time.monotonic()
+            status, rpc_code = await self.client.post_batch(entries)
+            if status == 200:
+                await loop.run_in_executor(None, self.spool.ack, position, len(entries))
+                delay = self.config.retry_delay
+                attempts = 0
+                if rejected_until is not None and position >= rejected_until:
+                    rejected_until = None
+                    batch_size = self.config.replay_batch_size
+                    
+            elif self._is_rejected(status, rpc_code) and len(entries) > 1:
+                # 같은 배치를 다시 보내지 않고 나눠서 거부된 로그를 찾음 (최대 log2(배치 크기)번)
+                batch_size = max(1, len(entries) // 2)
+                rejected_until = max(rejected_until or position, position)
+                continue
+                
+            elif self._is_rejected(status, rpc_code):
+                attempts += 1
+                if attempts >= self.config.replay_max_attempts:
+                    print(f"{self.name}: 서버가 계속 거부한 로그 격리 (HTTP {status}, 코드 {rpc_code}, {attempts}회)")
+                    await loop.run_in_executor(None, self.spool.quarantine, entries)
+                    await loop.run_in_executor(None, self.spool.ack, position)
+                    attempts = 0
+                    continue
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+                
             else:
-                if attempt < self.config.retry_count - 1:
-                    await asyncio.sleep(self.config.retry_delay * (2 ** attempt))
+                # 연결 실패, 5xx, 서버측 JSON-RPC 에러 - /health가 살아 있어도 바로 다시 보내지 않음
+                self.server_available = False
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+                continue
+                
+            # 재전송 속도 제한 (서버가 막 복구된 직후 몰리지 않도록)
+            wait = len(entries) / self.config.replay_rate - (time.monotonic() - started)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                
+    def get_stats(self) -> Dict:
+        """버퍼/스풀 상태"""
+        return {
+            'buffered': len(self.buffer),
+            'dropped': self.dropped,
+            'server_available': self.server_available,
+            'spool': self.spool.get_stats() if self.spool else None
+        }
 
 
 class ConsoleCollector(BaseCollector):
@@ -293,12 +716,28 @@ class ConsoleCollector(BaseCollector):
 
 
 class HTTPTrafficCollector(BaseCollector):
-    """HTTP 트래픽 수집기"""
+    """HTTP 트래픽 수집기 - 원래 포트 + 1000 에서 받는 리버스 프록시
+    
+    업스트림 연결은 하나의 세션에서 keep-alive로 재사용하고 (포트별 최대
+    max_connections_per_port개), 요청/응답 본문은 버퍼링 없이 청크 단위로 흘려보낸다.
+    응답 헤더까지 걸린 시간(ttfb_ms)과 본문 전송까지 끝난 시간(duration_ms)을 따로 기록한다.
+    """
+    
+    # 프록시가 그대로 넘기면 안 되는 연결 단위 헤더 (RFC 7230 6.1)
+    HOP_BY_HOP_HEADERS = frozenset({
+        'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+        'proxy-connection', 'te', 'trailer', 'transfer-encoding', 'upgrade'
+    })
+    CHUNK_SIZE = 64 * 1024
     
-    def __init__(self, config: CollectorConfig, ports: List[int] = None):
+    def __init__(self, config: CollectorConfig, ports: List[int] = None,
+                 max_connections_per_port: int = 32, keepalive_timeout: float = 30.0):
         super().__init__("http_traffic", config)
         self.ports = ports or [8000, 8080, 3000, 5000]
+        self.max_connections_per_port = max_connections_per_port
+        self.keepalive_timeout = keepalive_timeout
         self.servers = []
+        self.session = None
         
     async def start_collecting(self):
         """HTTP 프록시 서버 시작"""
@@ -306,12 +745,20 @@ class HTTPTrafficCollector(BaseCollector):
             await self.log("ERROR", "aiohttp가 설치되지 않음")
             return
             
-        from aiohttp import web
+        # 업스트림 연결 풀 - 호스트:포트별 제한, 압축 본문은 풀지 않고 그대로 전달
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=0, limit_per_host=self.max_connections_per_port,
+                                           keepalive_timeout=self.keepalive_timeout),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=10),
+            auto_decompress=False,
+            cookie_jar=aiohttp.DummyCookieJar()
+        )
         
         for port in self.ports:
             try:
                 app = web.Application()
-                app.router.add_route('*', '/{path:.*}', self._proxy_handler)
+                app.router.add_route('*', '/{path:.*}',
+                                     lambda request, port=port: self._proxy_handler(request, port))
                 
                 runner = web.AppRunner(app)
                 await runner.setup()
@@ -334,77 +781,158 @@ class HTTPTrafficCollector(BaseCollector):
         while self.running:
             await asyncio.sleep(1)
             
-    async def _proxy_handler(self, request):
-        """프록시 핸들러"""
-        start_time = time.time()
+    async def stop(self):
+        """프록시 서버와 업스트림 연결 풀 정리 후 중지"""
+        for runner in self.servers:
+            await runner.cleanup()
+        self.servers = []
+        if self.session:
+            await self.session.close()
+            self.session = None
+        await super().stop()
+        
+    def _forward_headers(self, headers, request: bool = False) -> List[Tuple[str, str]]:
+        """연결 단위 헤더를 뺀 헤더 목록 (요청이면 Host도 업스트림 기준으로 다시 설정되게 뺌)"""
+        return [(name, value) for name, value in headers.items()
+                if name.lower() not in self.HOP_BY_HOP_HEADERS and not (request and name.lower() == 'host')]
+        
+    async def _proxy_handler(self, request, original_port: int):
+        """프록시 핸들러 - 요청/응답 본문을 스트리밍으로 전달"""
+        start_time = time.perf_counter()
+        target_url = f"http://localhost:{original_port}{request.path_qs}"
+        response = None
+        status = None
+        ttfb_ms = None
+        response_bytes = 0
         
         try:
-            # 원본 서버로 요청 전달
-            original_port = int(request.url.port) - 1000
-            target_url = f"{request.url.scheme}://localhost:{original_port}{request.path_qs}"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.request(
-                    request.method,
-                    target_url,
-                    headers=request.headers,
-                    data=await request.read()
-                ) as resp:
-                    
-                    # 응답 시간 계산
-                    duration_ms = int((time.time() - start_time) * 1000)
-                    
-                    # 로그 기록
-                    await self.log(
-                        level="INFO" if resp.status < 400 else "WARN" if resp.status < 500 else "ERROR",
-                        message=f"{request.method} {request.path} - {resp.status}",
-                        metadata={
-                            "method": request.method,
-                            "path": request.path,
-                            "status": resp.status,
-                            "duration_ms": duration_ms,
-                            "ip": request.remote,
-                            "user_agent": request.headers.get("User-Agent", ""),
-                            "content_length": resp.headers.get("Content-Length", 0)
-                        },
-                        tags=["http", request.method.lower()]
-                    )
-                    
-                    # 응답 반환
-                    body = await resp.read()
-                    return web.Response(
-                        body=body,
-                        status=resp.status,
-                        headers=resp.headers
-                    )
-                    
+            async with self.session.request(
+                request.method,
+                target_url,
+                headers=self._forward_headers(request.headers, request=True),
+                data=request.content if request.body_exists else None,
+                allow_redirects=False
+            ) as resp:
+                # 응답 헤더 도착까지 (업스트림 처리 시간 + 프록시 연결 비용)
+                ttfb_ms = round((time.perf_counter() - start_time) * 1000, 3)
+                status = resp.status
+                
+                response = web.StreamResponse(status=resp.status, reason=resp.reason,
+                                              headers=self._forward_headers(resp.headers))
+                await response.prepare(request)
+                async for chunk in resp.content.iter_chunked(self.CHUNK_SIZE):
+                    await response.write(chunk)
+                    response_bytes += len(chunk)
+                await response.write_eof()
+                
         except Exception as e:
-            duration_ms = int((time.time() - start_time) * 1000)
+            duration_ms = round((time.perf_counter() - start_time) * 1000, 3)
             
             await self.log(
                 level="ERROR",
-                message=f"{request.method} {request.path} - Connection Failed",
+                message=f"{request.method} {request.path} - "
+                        f"{'Connection Failed' if response is None else 'Stream Aborted'}",
                 metadata={
                     "method": request.method,
                     "path": request.path,
-                    "error": str(e),
-                    "duration_ms": duration_ms
+                    "status": status,
+                    "error": str(e) or type(e).__name__,
+                    "ttfb_ms": ttfb_ms,
+                    "duration_ms": duration_ms,
+                    "response_bytes": response_bytes
                 },
                 tags=["http", "error"]
             )
             
-            return web.Response(text="Proxy Error", status=502)
+            if response is None:
+                return web.Response(text="Proxy Error", status=502)
+            # 헤더를 이미 보냈으면 연결을 끊어 클라이언트가 잘린 응답임을 알게 함
+            raise
+            
+        # 응답 시간 계산 (본문 전송 완료까지)
+        duration_ms = round((time.perf_counter() - start_time) * 1000, 3)
+        
+        # 로그 기록
+        await self.log(
+            level="INFO" if status < 400 else "WARN" if status < 500 else "ERROR",
+            message=f"{request.method} {request.path} - {status}",
+            metadata={
+                "method": request.method,
+                "path": request.path,
+                "status": status,
+                "ttfb_ms": ttfb_ms,
+                "duration_ms": duration_ms,
+                "ip": request.remote,
+                "user_agent": request.headers.get("User-Agent", ""),
+                "content_length": resp.headers.get("Content-Length", 0),
+                "response_bytes": response_bytes
+            },
+            tags=["http", request.method.lower()]
+        )
+        return response
+
+
+def compile_ignore_patterns(patterns: List[str]) -> Callable[[str], bool]:
+    """무시 패턴(glob)을 정규식 두 개로 컴파일
+    
+    '/'가 없는 패턴(*.pyc, node_modules, .git)은 경로의 각 구성 요소에,
+    '/'가 있는 패턴(build/*.js)은 경로 끝부분에 맞춰 본다.
+    """
+    name_patterns = [pattern for pattern in patterns if '/' not in pattern]
+    path_patterns = [pattern.strip('/') for pattern in patterns if '/' in pattern]
+    name_regex = re.compile('|'.join(fnmatch.translate(pattern) for pattern in name_patterns)) \
+        if name_patterns else None
+    path_regex = re.compile('|'.join(r'(?:.*/)?' + fnmatch.translate(pattern) for pattern in path_patterns)) \
+        if path_patterns else None
+    
+    def should_ignore(file_path: str) -> bool:
+        normalized = file_path.replace(os.sep, '/')
+        if name_regex and any(name_regex.match(part) for part in normalized.split('/') if part):
+            return True
+        return bool(path_regex and path_regex.match(normalized))
+        
+    return should_ignore
 
 
 class FileWatcherCollector(BaseCollector):
-    """파일 변경 감시 수집기"""
+    """파일 변경 감시 수집기
+    
+    watchdog 스레드의 이벤트는 deque에 쌓고 call_soon_threadsafe로 이벤트 루프에 넘긴다.
+    루프에서는 경로별로 debounce초 동안 이벤트를 합쳐(생성 후 수정 -> 생성, 생성 후 삭제 -> 없음,
+    삭제 후 생성 -> 수정 등) 논리적 변경 하나당 로그 하나를 남기고, 한 번에 burst_threshold개
+    이상 바뀌면(git checkout 등) 요약 로그 하나로 대신한다.
+    """
+    
+    # (이전 동작, 새 동작) -> 합친 동작 (None이면 변경 없음으로 버림), 없는 조합은 새 동작
+    # moved_away는 이동 전 경로의 내부 상태로, 이동 로그에 포함되므로 따로 기록하지 않는다
+    COALESCE = {
+        ("created", "modified"): "created",
+        ("created", "deleted"): None,
+        ("created", "created"): "created",
+        ("deleted", "created"): "modified",
+        ("deleted", "modified"): "modified",
+        ("moved", "modified"): "moved",
+        ("moved_away", "created"): "modified",
+        ("moved_away", "modified"): "modified",
+    }
     
     def __init__(self, config: CollectorConfig, watch_paths: List[str] = None, 
-                 ignore_patterns: List[str] = None):
+                 ignore_patterns: List[str] = None, debounce: float = 0.3,
+                 max_delay: float = 2.0, burst_threshold: int = 200):
         super().__init__("file_watcher", config)
         self.watch_paths = watch_paths or ["./"]
         self.ignore_patterns = ignore_patterns or ["*.pyc", "*.log", "__pycache__", ".git"]
+        self.should_ignore = compile_ignore_patterns(self.ignore_patterns)
+        self.debounce = debounce
+        self.max_delay = max_delay  # 계속 바뀌는 파일도 이 시간 안에는 한 번 기록
+        self.burst_threshold = burst_threshold
         self.observer = None
+        self.loop = None
+        self.events = deque()  # watchdog 스레드 -> 루프 (시각, 동작, 경로, 이동 전 경로)
+        self.events_lock = threading.Lock()
+        self.drain_scheduled = False
+        self.pending = {}  # 경로 -> 합쳐지는 중인 변경
+        self.last_event = 0.0
         
     async def start_collecting(self):
         """파일 감시 시작"""
@@ -412,6 +940,7 @@ class FileWatcherCollector(BaseCollector):
             await self.log("ERROR", "watchdog 라이브러리가 설치되지 않음")
             return
             
+        self.loop = asyncio.get_running_loop()
         self.observer = Observer()
         event_handler = FileChangeHandler(self)
         
@@ -424,66 +953,197 @@ class FileWatcherCollector(BaseCollector):
                 
         self.observer.start()
         
-        # 감시 유지
-        while self.running:
-            await asyncio.sleep(1)
+        # 감시 유지 - 합쳐진 변경을 주기적으로 기록
+        try:
+            while self.running:
+                await asyncio.sleep(self.debounce / 2)
+                await self._flush_changes()
+        finally:
+            self.observer.stop()
+            await self.loop.run_in_executor(None, self.observer.join)
+            self._drain_events()
+            await self._flush_changes(force=True)
             
-        self.observer.stop()
-        self.observer.join()
-        
-    def should_ignore(self, file_path: str) -> bool:
-        """파일 무시 여부 확인"""
-        for pattern in self.ignore_patterns:
-            if pattern.startswith("*."):
-                if file_path.endswith(pattern[1:]):
-                    return True
-            elif pattern in file_path:
-                return True
-        return False
-
-
-class FileChangeHandler(FileSystemEventHandler):
-    """파일 변경 이벤트 핸들러"""
-    
-    def __init__(self, collector: FileWatcherCollector):
-        self.collector = collector
-        
-    def on_modified(self, event):
-        if not event.is_directory and not self.collector.should_ignore(event.src_path):
-            asyncio.create_task(self._log_change("modified", event.src_path))
+    def enqueue_event(self, action: str, file_path: str, src_path: str = None):
+        """watchdog 스레드에서 호출 - 루프가 비울 때까지 한 번만 깨운다"""
+        self.events.append((time.monotonic(), action, file_path, src_path))
+        with self.events_lock:
+            if self.drain_scheduled:
+                return
+            self.drain_scheduled = True
+        try:
+            self.loop.call_soon_threadsafe(self._drain_events)
+        except RuntimeError:
+            pass  # 루프가 이미 닫힘
             
-    def on_created(self, event):
-        if not event.is_directory and not self.collector.should_ignore(event.src_path):
-            asyncio.create_task(self._log_change("created", event.src_path))
+    def _drain_events(self):
+        """루프 스레드 - 쌓인 이벤트를 경로별 대기 변경에 합친다"""
+        with self.events_lock:
+            self.drain_scheduled = False
+        while self.events:
+            self._coalesce(*self.events.popleft())
             
-    def on_deleted(self, event):
-        if not event.is_directory and not self.collector.should_ignore(event.src_path):
-            asyncio.create_task(self._log_change("deleted", event.src_path))
+    def _coalesce(self, now: float, action: str, file_path: str, src_path: str = None):
+        self.last_event = now
+        if action == "moved":
+            source = self.pending.get(src_path) if src_path else None
+            if src_path is None or (source and source["action"] == "created"):
+                # 임시 파일을 써서 이름을 바꾸는 저장 방식 - 대상 파일의 수정
+                self.pending.pop(src_path, None)
+                action, src_path = "modified", None
+            else:
+                if source and source["action"] == "moved":
+                    # a -> b -> c 는 a -> c 이동 하나로
+                    self.pending.pop(src_path)
+                    src_path = source["src_path"]
+                else:
+                    self._coalesce(now, "moved_away", src_path)
+                self.pending.pop(file_path, None)
+                
+        change = self.pending.get(file_path)
+        if change is not None and change["action"] == "moved" and action == "deleted":
+            # 이동 직후 삭제 (백업 파일로 옮겨 두고 지우는 편집기 저장 등) - 원래 경로의 삭제로 본다
+            del self.pending[file_path]
+            source = self.pending.get(change["src_path"])
+            if source and source["action"] == "moved_away":
+                source["action"] = "deleted"
+            return
+        if change is None:
+            self.pending[file_path] = {"action": action, "src_path": src_path, "first": now, "last": now,
+                                       "events": 1}
+            return
+        merged = self.COALESCE.get((change["action"], action), action)
+        if merged is None:
+            del self.pending[file_path]
+            return
+        change["action"] = merged
+        change["last"] = now
+        change["events"] += 1
+        if merged != "moved":
+            change["src_path"] = None
             
-    async def _log_change(self, action: str, file_path: str):
-        """파일 변경 로그"""
+    async def _flush_changes(self, force: bool = False):
+        """debounce 동안 조용했거나 max_delay가 지난 변경 기록"""
+        if not self.pending:
+            return
+        now = time.monotonic()
+        if force:
+            ready = list(self.pending)
+        elif len(self.pending) >= self.burst_threshold:
+            # 대량 변경 중에는 전체가 잠잠해질 때까지 모아서 요약 하나로
+            oldest = min(change["first"] for change in self.pending.values())
+            if now - self.last_event < self.debounce and now - oldest < self.max_delay * 5:
+                return
+            ready = list(self.pending)
+        else:
+            ready = [path for path, change in self.pending.items()
+                     if now - change["last"] >= self.debounce or now - change["first"] >= self.max_delay]
+        if not ready:
+            return
+        changes = [(path, change) for path, change in ((path, self.pending.pop(path)) for path in ready)
+                   if change["action"] != "moved_away"]
+        
+        if not changes:
+            return
+        if len(changes) >= self.burst_threshold:
+            await self._log_burst(changes)
+            return
+            
+        file_stats = await asyncio.get_running_loop().run_in_executor(
+            None, self._stat_files, [path for path, change in changes if change["action"] != "deleted"])
+        for path, change in changes:
+            await self._log_change(path, change, file_stats.get(path, {}))
+            
+    @staticmethod
+    def _stat_files(paths: List[str]) -> Dict[str, Dict]:
         file_stats = {}
-        if action != "deleted" and os.path.exists(file_path):
-            stat = os.stat(file_path)
-            file_stats = {
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            file_stats[path] = {
                 "size": stat.st_size,
                 "modified_time": datetime.fromtimestamp(stat.st_mtime).isoformat()
             }
+        return file_stats
+        
+    async def _log_change(self, file_path: str, change: Dict, file_stats: Dict):
+        """파일 변경 로그"""
+        action = change["action"]
+        metadata = {
+            "action": action,
+            "file_path": file_path,
+            "file_name": os.path.basename(file_path),
+            "directory": os.path.dirname(file_path),
+            "events": change["events"],
+            **file_stats
+        }
+        if change["src_path"]:
+            metadata["src_path"] = change["src_path"]
             
-        await self.collector.log(
+        await self.log(
             level="INFO",
             message=f"파일 {action}: {os.path.basename(file_path)}",
+            metadata=metadata,
+            tags=["file", action, Path(file_path).suffix.lstrip('.')]
+        )
+        
+    async def _log_burst(self, changes: List[Tuple[str, Dict]]):
+        """대량 변경 요약 로그 (동작별/디렉토리별 건수 + 일부 경로)"""
+        actions = {}
+        directories = {}
+        for path, change in changes:
+            actions[change["action"]] = actions.get(change["action"], 0) + 1
+            directory = os.path.dirname(path)
+            directories[directory] = directories.get(directory, 0) + 1
+        top_directories = sorted(directories.items(), key=lambda item: item[1], reverse=True)[:10]
+        
+        await self.log(
+            level="INFO",
+            message=f"파일 {len(changes)}개 변경",
             metadata={
-                "action": action,
-                "file_path": file_path,
-                "file_name": os.path.basename(file_path),
-                "directory": os.path.dirname(file_path),
-                **file_stats
+                "action": "bulk",
+                "file_count": len(changes),
+                "actions": actions,
+                "directories": dict(top_directories),
+                "sample_paths": [path for path, _ in changes[:20]]
             },
-            tags=["file", action, Path(file_path).suffix.lstrip('.')]
+            tags=["file", "bulk"]
         )
 
 
+class FileChangeHandler(FileSystemEventHandler):
+    """파일 변경 이벤트 핸들러 - watchdog 스레드에서 무시 패턴만 거르고 수집기 큐에 넘긴다"""
+    
+    def __init__(self, collector: FileWatcherCollector):
+        self.collector = collector
+        
+    def _enqueue(self, event, action: str):
+        if not event.is_directory and not self.collector.should_ignore(event.src_path):
+            self.collector.enqueue_event(action, event.src_path)
+            
+    def on_modified(self, event):
+        self._enqueue(event, "modified")
+        
+    def on_created(self, event):
+        self._enqueue(event, "created")
+        
+    def on_deleted(self, event):
+        self._enqueue(event, "deleted")
+        
+    def on_moved(self, event):
+        if event.is_directory:
+            return
+        src_ignored = self.collector.should_ignore(event.src_path)
+        dest_ignored = self.collector.should_ignore(event.dest_path)
+        if dest_ignored:
+            if not src_ignored:
+                self.collector.enqueue_event("deleted", event.src_path)
+        else:
+            self.collector.enqueue_event("moved", event.dest_path, None if src_ignored else event.src_path)
+
+
 class ProcessMonitorCollector(BaseCollector):
     """프로세스 모니터링 수집기"""
     
@@ -576,12 +1236,16 @@ class ProcessMonitorCollector(BaseCollector):
 
 
 class DatabaseQueryCollector(BaseCollector):
-    """데이터베이스 쿼리 수집기"""
+    """데이터베이스 쿼리 수집기 - DB 로그 파일들을 FileTailer 하나로 따라 읽는다"""
     
-    def __init__(self, config: CollectorConfig, db_configs: List[Dict] = None):
+    def __init__(self, config: CollectorConfig, db_configs: List[Dict] = None,
+                 checkpoint_path: str = None):
         super().__init__("db_query", config)
         self.db_configs = db_configs or []
+        self.checkpoint_path = checkpoint_path
         self.connections = {}
+        self.db_types = {}  # 로그 파일 절대 경로 -> DB 타입
+        self.tailer = None
         
     async def start_collecting(self):
         """DB 쿼리 모니터링 시작"""
@@ -592,32 +1256,43 @@ class DatabaseQueryCollector(BaseCollector):
             db_type = db_config.get('type', 'postgresql')
             log_path = db_config.get('log_path')
             
-            if log_path and os.path.exists(log_path):
-                asyncio.create_task(self._monitor_db_log(db_type, log_path))
-            else:
+            if not log_path:
+                await self.log("WARN", f"DB 로그 파일 경로가 없음: {db_config.get('name')}")
+                continue
+            if not os.path.exists(log_path):
+                # 나중에 생기면 처음부터 읽는다
                 await self.log("WARN", f"DB 로그 파일을 찾을 수 없음: {log_path}")
-                
-        # 모니터링 유지
-        while self.running:
-            await asyncio.sleep(1)
+            self.db_types[os.path.abspath(log_path)] = db_type
+            
+        if not self.db_types:
+            return
             
-    async def _monitor_db_log(self, db_type: str, log_path: str):
-        """DB 로그 파일 모니터링"""
+        self.tailer = FileTailer(list(self.db_types), self._on_db_lines,
+                                 checkpoint_path=self.checkpoint_path)
         try:
-            with open(log_path, 'r') as f:
-                # 파일 끝으로 이동
-                f.seek(0, 2)
-                
-                while self.running:
-                    line = f.readline()
-                    if line:
-                        await self._parse_db_log(db_type, line.strip())
-                    else:
-                        await asyncio.sleep(0.1)
-                        
+            await self.tailer.run()
         except Exception as e:
             await self.log("ERROR", f"DB 로그 모니터링 오류: {str(e)}")
             
+    async def stop(self):
+        """tail 중지 (체크포인트 저장) 후 수집기 중지"""
+        if self.tailer:
+            self.tailer.stop()
+        await super().stop()
+        
+    async def _on_db_lines(self, path: str, lines: List[str]):
+        db_type = self.db_types[path]
+        for line in lines:
+            line = line.strip()
+            if line:
+                await self._parse_db_log(db_type, line)
+                
+    def get_stats(self) -> Dict:
+        stats = super().get_stats()
+        if self.tailer:
+            stats['tailer'] = self.tailer.get_stats()
+        return stats
+        
     async def _parse_db_log(self, db_type: str, log_line: str):
         """DB 로그 파싱"""
         # PostgreSQL 로그 파싱 예시
@@ -678,7 +1353,15 @@ class CollectorManager:
                 },
                 "db_query": {
                     "enabled": False,
-                    "databases": []
+                    "databases": [],
+                    "checkpoint_file": "./logs/checkpoints/db_query.json"
+                },
+                "spool": {
+                    "enabled": True,
+                    "dir": "./logs/spool",
+                    "max_mb": 64,
+                    "replay_rate": 2000,
+                    "max_attempts": 5
                 }
             }
         }
@@ -697,12 +1380,16 @@ class CollectorManager:
         
     def create_collectors(self):
         """수집기 생성"""
+        collectors_config = self.config["collectors"]
+        spool_config = collectors_config.get("spool", {})
         base_config = CollectorConfig(
-            rpc_server=self.config["server"]["rpc_url"]
+            rpc_server=self.config["server"]["rpc_url"],
+            spool_dir=spool_config.get("dir", "./logs/spool") if spool_config.get("enabled", True) else None,
+            spool_max_bytes=int(spool_config.get("max_mb", 64) * 1024 * 1024),
+            replay_rate=float(spool_config.get("replay_rate", 2000)),
+            replay_max_attempts=int(spool_config.get("max_attempts", 5))
         )
         
-        collectors_config = self.config["collectors"]
-        
         # 콘솔 수집기
         if collectors_config["console"]["enabled"]:
             console_config = CollectorConfig(**base_config.__dict__)
@@ -718,7 +1405,9 @@ class CollectorManager:
             http_config.enabled = True
             self.collectors["http_traffic"] = HTTPTrafficCollector(
                 http_config,
-                collectors_config["http_traffic"]["ports"]
+                collectors_config["http_traffic"]["ports"],
+                max_connections_per_port=collectors_config["http_traffic"].get("max_connections_per_port", 32),
+                keepalive_timeout=collectors_config["http_traffic"].get("keepalive_timeout", 30.0)
             )
             
         # 파일 감시 수집기
@@ -728,7 +1417,9 @@ class CollectorManager:
             self.collectors["file_watcher"] = FileWatcherCollector(
                 file_config,
                 collectors_config["file_watcher"]["watch_paths"],
-                collectors_config["file_watcher"]["ignore_patterns"]
+                collectors_config["file_watcher"]["ignore_patterns"],
+                debounce=collectors_config["file_watcher"].get("debounce_ms", 300) / 1000,
+                burst_threshold=collectors_config["file_watcher"].get("burst_threshold", 200)
             )
             
         # 프로세스 모니터
@@ -746,7 +1437,8 @@ class CollectorManager:
             db_config.enabled = True
             self.collectors["db_query"] = DatabaseQueryCollector(
                 db_config,
-                collectors_config["db_query"]["databases"]
+                collectors_config["db_query"]["databases"],
+                checkpoint_path=collectors_config["db_query"].get("checkpoint_file")
             )
             
     async def start_all(self, collector_names: List[str] = None):
@@ -18,6 +18,7 @@ sys.path.append(os.path.dirname(__file__))
 
 # 로그 시스템 모듈 import
 from server import LogCollectorServer
+from storage import StorageConfig
 
 
 class LogSystemRunner:
@@ -55,7 +56,8 @@ class LogSystemRunner:
         signal.signal(signal.SIGINT, signal_handler)
         signal.signal(signal.SIGTERM, signal_handler)
         
-    async def start_server(self, host: str, port: int, db_path: str):
+    async def start_server(self, host: str, port: int, db_path: str, storage_config: dict = None,
+                           alerts_config: dict = None):
         """서버 시작"""
         try:
             # 데이터베이스 디렉토리 생성
@@ -73,7 +75,9 @@ class LogSystemRunner:
             self.logger.info(f"[RPC] JSON-RPC: http://{host}:{port}/rpc")
             
             # 서버 인스턴스 생성
-            self.server = LogCollectorServer(host, port, db_path)
+            config = StorageConfig.from_dict({**(storage_config or {}), 'db_path': db_path})
+            self.server = LogCollectorServer(host, port, db_path, storage_config=config,
+                                             alerts_config=alerts_config)
             
             # 서버 시작
             await self.server.start()
@@ -106,8 +110,11 @@ class LogSystemRunner:
                             pass
                     self.server.websockets.clear()
                 
-                # 추가 정리 작업이 필요하면 여기에
                 self.logger.info("[WS] WebSocket connections closed")
+                
+                # 대기 중인 배치를 플러시하고 저장소 종료
+                self.server.storage.close()
+                self.logger.info("[DB] Storage flushed and closed")
             
             self.logger.info("[COMPLETE] Log system shutdown complete")
             
@@ -236,7 +243,7 @@ async def main():
         runner.setup_signal_handlers()
         
         try:
-            await runner.start_server(host, port, db_path)
+            await runner.start_server(host, port, db_path, config.get('storage'), config.get('alerts'))
         except KeyboardInterrupt:
             print("\n")  # 깔끔한 줄바꿈
         finally:
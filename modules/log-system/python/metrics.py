@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+수집 서버 계측 (Prometheus 텍스트 형식)
+카운터/게이지/히스토그램은 값이 바뀔 때 누적만 하고, /metrics 요청 시에만 텍스트로 변환
+"""
+
+import bisect
+import math
+import threading
+from typing import Callable, List, Sequence, Tuple
+
+
+# 지연 시간 (초) 기본 버킷
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# 배치 크기 기본 버킷
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, int) or (isinstance(value, float) and value.is_integer() and abs(value) < 1e15):
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple = ()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{value}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """메트릭 기본 클래스 - labelnames가 있으면 labels(...)로 라벨 조합별 자식을 만든다"""
+    
+    type = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children = {}  # 라벨 값 튜플 -> 자식 메트릭
+        self.lock = threading.Lock()
+        
+    def labels(self, *values, **kwargs) -> 'Metric':
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self.children.get(key)
+        if child is None:
+            with self.lock:
+                child = self.children.get(key)
+                if child is None:
+                    child = self.children[key] = self._new_child()
+        return child
+        
+    def _new_child(self) -> 'Metric':
+        return type(self)(self.name, self.documentation)
+        
+    def _samples(self) -> List[Tuple[str, Tuple, float]]:
+        """(접미사, 추가 라벨, 값) 목록"""
+        raise NotImplementedError
+        
+    def collect(self) -> List[str]:
+        lines = [f'# HELP {self.name} {_escape(self.documentation)}', f'# TYPE {self.name} {self.type}']
+        if self.labelnames:
+            items = list(self.children.items())
+        else:
+            items = [((), self)]
+        for values, metric in items:
+            for suffix, extra, value in metric._samples():
+                lines.append(f'{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} '
+                             f'{_format_value(value)}')
+        return lines
+
+
+class Counter(Metric):
+    """단조 증가 카운터 - func를 주면 수집 시점에 func()를 값으로 사용"""
+    
+    type = 'counter'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 func: Callable[[], float] = None):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0
+        self.func = func
+        
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+            
+    def _samples(self):
+        return [('', (), self.func() if self.func else self.value)]
+
+
+class Gauge(Metric):
+    """현재 값 - func를 주면 수집 시점에 func()를 값으로 사용"""
+    
+    type = 'gauge'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 func: Callable[[], float] = None):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0
+        self.func = func
+        
+    def set(self, value: float):
+        self.value = value
+        
+    def inc(self, amount: float = 1):
+        with self.lock:
+            self.value += amount
+            
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+        
+    def _samples(self):
+        return [('', (), self.func() if self.func else self.value)]
+
+
+class Histogram(Metric):
+    """누적 버킷 히스토그램 - observe는 버킷 하나와 합계/건수만 갱신"""
+    
+    type = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.sum = 0.0
+        self.count = 0
+        
+    def _new_child(self) -> 'Histogram':
+        return Histogram(self.name, self.documentation, buckets=self.buckets)
+        
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+            
+    def _samples(self):
+        with self.lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            samples.append(('_bucket', (('le', _format_value(bound)),), cumulative))
+        samples.append(('_sum', (), total))
+        samples.append(('_count', (), count))
+        return samples
+
+
+class Registry:
+    """메트릭 모음 - render()가 Prometheus 텍스트 형식(0.0.4)을 만든다"""
+    
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+    
+    def __init__(self):
+        self.metrics = {}  # 이름 -> Metric
+        
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics and self.metrics[metric.name] is not metric:
+            raise ValueError(f"Duplicate metric: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+        
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                func: Callable[[], float] = None) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, func))
+        
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              func: Callable[[], float] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, func))
+        
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+        
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            try:
+                lines.extend(metric.collect())
+            except Exception as e:
+                # 콜백 하나가 실패해도 나머지는 내보낸다
+                lines.append(f'# ERROR {metric.name} {_escape(repr(e))}')
+        return '\n'.join(lines) + '\n'
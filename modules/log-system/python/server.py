@@ -6,15 +6,19 @@
 
 import asyncio
 import json
+import os
+import re
 import time
 import uuid
+import random
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from collections import defaultdict, deque
-import sqlite3
 import threading
+import itertools
 import gzip
+import zlib
 import base64
 from pathlib import Path
 
@@ -22,6 +26,43 @@ from aiohttp import web, WSMsgType
 from aiohttp.web import Request, Response, WebSocketResponse
 import aiohttp_cors
 
+from storage import LogEntry, LogStorage, StorageConfig
+from alert_rules import RuleEngine
+from metrics import Registry, Histogram, Counter
+import analysis
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+# msgpack 본문으로 받는 Content-Type
+MSGPACK_CONTENT_TYPES = ('application/msgpack', 'application/x-msgpack')
+
+
+def _request_encodings() -> List[str]:
+    """aiohttp가 요청 본문에서 자동으로 풀 수 있는 Content-Encoding (선호 순)"""
+    encodings = ['gzip', 'deflate']
+    try:
+        from aiohttp import compression_utils
+    except ImportError:
+        return encodings
+    if getattr(compression_utils, 'HAS_ZSTD', False):
+        encodings.insert(0, 'zstd')
+    if getattr(compression_utils, 'HAS_BROTLI', False):
+        encodings.append('br')
+    return encodings
+
+
+REQUEST_ENCODINGS = _request_encodings()
+
 # UI 분석 모듈 import
 try:
     from ui_analyzer import analyze_ui_screenshot
@@ -32,286 +73,419 @@ except ImportError as e:
     print(f"[UI-ANALYZER] Module not available: {e}")
 
 
-@dataclass
-class LogEntry:
-    """표준 로그 엔트리 구조"""
-    id: str
-    source: str
-    level: str
-    timestamp: str
-    message: str
-    metadata: Dict[str, Any]
-    tags: List[str]
-    trace_id: Optional[str] = None
+class RealTimeAnalyzer:
+    """실시간 로그 분석기
+    
+    alerts 설정의 규칙(alert_rules)과 시간대별 기준선 이상 탐지를 함께 적용한다.
+    """
+    
+    ANOMALY_OPTIONS = ('z_threshold', 'alpha', 'min_samples', 'max_gap_minutes', 'history')
+    
+    def __init__(self, config: Dict = None):
+        config = config or {}
+        self.rules = RuleEngine.from_config(config)
+        self.alerts = []
+        # 시간대별 기준선 이상 탐지 (alerts.anomaly 설정)
+        anomaly_config = config.get('anomaly') or {}
+        self.anomaly_enabled = config.get('enabled', True) and anomaly_config.get('enabled', True)
+        self.anomalies = analysis.AnomalyDetector(
+            **{key: anomaly_config[key] for key in self.ANOMALY_OPTIONS if key in anomaly_config})
+        
+    def tick(self, now: float = None) -> List[Dict]:
+        """로그가 없는 동안에도 지난 분을 닫아 이상 징후 판정"""
+        if not self.anomaly_enabled:
+            return []
+        return self.anomalies.tick(now or time.time())
+        
+    def analyze_log(self, log_entry: LogEntry) -> List[Dict]:
+        """로그 분석 및 알림 생성"""
+        current_time = time.time()
+        alerts = self.rules.evaluate(log_entry, current_time)
+        
+        if self.anomaly_enabled:
+            metadata = log_entry.metadata if isinstance(log_entry.metadata, dict) else {}
+            alerts.extend(self.anomalies.observe(log_entry.source, log_entry.level,
+                                                 metadata.get('duration_ms'), current_time))
+            
+        return alerts
 
 
-class LogStorage:
-    """SQLite 기반 로그 저장소"""
+class EventLoopMonitor:
+    """이벤트 루프 지연 측정기
     
-    def __init__(self, db_path: str = "./dev_logs.db"):
-        self.db_path = db_path
-        self.init_db()
-        
-    def init_db(self):
-        """데이터베이스 초기화"""
-        print(f"[DB] 데이터베이스 초기화: {self.db_path}")
-        conn = sqlite3.connect(self.db_path)
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS logs (
-                id TEXT PRIMARY KEY,
-                source TEXT NOT NULL,
-                level TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                message TEXT NOT NULL,
-                metadata TEXT,
-                tags TEXT,
-                trace_id TEXT,
-                created_at REAL NOT NULL
-            )
-        ''')
-        print("[DB] logs 테이블 생성 완료")
-        
-        # 인덱스 생성
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_timestamp ON logs(timestamp)')
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_source_level ON logs(source, level)')
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_trace_id ON logs(trace_id)')
-        conn.execute('CREATE INDEX IF NOT EXISTS idx_created_at ON logs(created_at)')
-        
-        # FTS 전문검색 테이블
-        conn.execute('''
-            CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
-                id UNINDEXED,
-                message,
-                metadata,
-                content=''
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        print("[DB] 데이터베이스 초기화 완료")
+    interval마다 sleep 후 실제로 깨어난 시각과의 차이를 기록한다.
+    루프를 막는 동기 작업이 있으면 지연(ms)이 그만큼 커진다.
+    """
+    
+    def __init__(self, interval: float = 0.25, window: int = 240):
+        self.interval = interval
+        self.samples = deque(maxlen=window)  # 최근 지연 (ms)
+        self.max_lag_ms = 0.0
+        self.task = None
         
-    def store_log(self, log_entry: LogEntry):
-        """로그 저장"""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            conn.execute('''
-                INSERT INTO logs (id, source, level, timestamp, message, metadata, tags, trace_id, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                log_entry.id,
-                log_entry.source,
-                log_entry.level,
-                log_entry.timestamp,
-                log_entry.message,
-                json.dumps(log_entry.metadata),
-                json.dumps(log_entry.tags),
-                log_entry.trace_id,
-                time.time()
-            ))
-            
-            # FTS 인덱스 업데이트
-            conn.execute('''
-                INSERT INTO logs_fts (id, message, metadata) VALUES (?, ?, ?)
-            ''', (log_entry.id, log_entry.message, json.dumps(log_entry.metadata)))
-            
-            conn.commit()
-        finally:
-            conn.close()
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self._run())
             
-    def store_logs_batch(self, log_entries: List[LogEntry]):
-        """배치 로그 저장"""
-        conn = sqlite3.connect(self.db_path)
-        try:
-            logs_data = []
-            fts_data = []
-            current_time = time.time()
-            
-            for log_entry in log_entries:
-                logs_data.append((
-                    log_entry.id,
-                    log_entry.source,
-                    log_entry.level,
-                    log_entry.timestamp,
-                    log_entry.message,
-                    json.dumps(log_entry.metadata),
-                    json.dumps(log_entry.tags),
-                    log_entry.trace_id,
-                    current_time
-                ))
-                fts_data.append((log_entry.id, log_entry.message, json.dumps(log_entry.metadata)))
-            
-            conn.executemany('''
-                INSERT INTO logs (id, source, level, timestamp, message, metadata, tags, trace_id, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', logs_data)
-            
-            conn.executemany('''
-                INSERT INTO logs_fts (id, message, metadata) VALUES (?, ?, ?)
-            ''', fts_data)
-            
-            conn.commit()
-        finally:
-            conn.close()
+    def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
             
-    def query_logs(self, sources: List[str] = None, levels: List[str] = None, 
-                   since: str = None, limit: int = 100, search: str = None) -> List[Dict]:
-        """로그 조회"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        
-        try:
-            # 기본 쿼리 구성
-            if search:
-                # FTS 검색을 사용하는 경우
-                query = '''
-                    SELECT logs.* FROM logs 
-                    JOIN logs_fts ON logs.id = logs_fts.id 
-                    WHERE logs_fts MATCH ?
-                '''
-                params = [search]
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, loop.time() - started - self.interval) * 1000
+            self.samples.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            
+    def get_stats(self) -> Dict:
+        """최근 지연 통계 (ms)"""
+        samples = sorted(self.samples)
+        if not samples:
+            return {'last_ms': 0.0, 'avg_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0, 'samples': 0}
+        return {
+            'last_ms': round(self.samples[-1], 3),
+            'avg_ms': round(sum(samples) / len(samples), 3),
+            'p99_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+            'max_ms': round(self.max_lag_ms, 3),
+            'samples': len(samples)
+        }
+
+
+class SubscriptionFilter:
+    """미리 컴파일한 스트림 필터
+    
+    levels/sources/tags는 frozenset(문자열 하나도 허용), pattern은 부분 문자열 또는
+    (regex: true일 때) 컴파일된 정규식으로 판정한다. 비어 있는 항목은 조건 없음.
+    """
+    
+    def __init__(self, filters: Dict):
+        filters = filters or {}
+        if not isinstance(filters, dict):
+            raise ValueError("filters must be an object")
+        self.levels = self._value_set(filters, 'levels')
+        self.sources = self._value_set(filters, 'sources')
+        self.tags = self._value_set(filters, 'tags')
+        self.pattern = filters.get('pattern') or None
+        if self.pattern is not None and not isinstance(self.pattern, str):
+            raise ValueError("pattern must be a string")
+        self.regex = None
+        if self.pattern and filters.get('regex'):
+            try:
+                self.regex = re.compile(self.pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern: {e}")
                 
-                # 추가 필터 조건 적용
-                if sources:
-                    placeholders = ','.join('?' * len(sources))
-                    query += f" AND logs.source IN ({placeholders})"
-                    params.extend(sources)
-                    
-                if levels:
-                    placeholders = ','.join('?' * len(levels))
-                    query += f" AND logs.level IN ({placeholders})"
-                    params.extend(levels)
-                    
-                if since:
-                    since_timestamp = self._parse_time_since(since)
-                    query += " AND logs.created_at >= ?"
-                    params.append(since_timestamp)
+    @staticmethod
+    def _value_set(filters: Dict, key: str) -> frozenset:
+        """목록 조건 정규화 - 문자열 하나는 한 항목짜리 목록으로, 그 밖의 형식은 ValueError"""
+        values = filters.get(key) or ()
+        if isinstance(values, str):
+            return frozenset((values,))
+        if not isinstance(values, (list, tuple)) or not all(isinstance(value, str) for value in values):
+            raise ValueError(f"{key} must be a string or a list of strings")
+        return frozenset(values)
+        
+    def matches(self, log_entry: LogEntry) -> bool:
+        if self.levels and log_entry.level not in self.levels:
+            return False
+        if self.sources and log_entry.source not in self.sources:
+            return False
+        if self.pattern:
+            if self.regex is not None:
+                if not self.regex.search(log_entry.message):
+                    return False
+            elif self.pattern not in log_entry.message:
+                return False
+        if self.tags and self.tags.isdisjoint(log_entry.tags or ()):
+            return False
+        return True
+
+
+class SubscriptionIndex:
+    """스트림 구독 색인
+    
+    같은 필터를 가진 스트림은 그룹 하나로 묶고, 그룹마다 가장 선택적인 조건
+    하나(source > tag > level 순)를 기준으로 역색인에 등록한다. 로그가 들어오면
+    로그의 source/tags/level로 후보 그룹만 찾고 나머지 조건을 확인하므로
+    전체 스트림 수가 아니라 후보 수에 비례해 동작한다.
+    """
+    
+    def __init__(self):
+        self.groups = {}  # filter_key -> {'filter', 'streams', 'anchor'}
+        self.stream_keys = {}  # stream_id -> filter_key
+        self.by_source = defaultdict(set)  # source -> filter_key 집합
+        self.by_tag = defaultdict(set)
+        self.by_level = defaultdict(set)
+        self.unanchored = set()  # source/tag/level 조건이 없는 그룹 (pattern만 있거나 전체)
+        
+    def add(self, stream_id: str, filters: Dict):
+        """스트림 등록 - 필터 형식이 잘못되었거나 잘못된 정규식이면 ValueError"""
+        filter_key = json.dumps(filters or {}, sort_keys=True)
+        group = self.groups.get(filter_key)
+        if group is None:
+            group = {'filter': SubscriptionFilter(filters), 'streams': set()}
+            group['anchor'] = self._anchor(group['filter'])
+            self.groups[filter_key] = group
+            self._link(filter_key, group['anchor'], add=True)
+        self.remove(stream_id)
+        group['streams'].add(stream_id)
+        self.stream_keys[stream_id] = filter_key
+        
+    def remove(self, stream_id: str):
+        filter_key = self.stream_keys.pop(stream_id, None)
+        if filter_key is None:
+            return
+        group = self.groups[filter_key]
+        group['streams'].discard(stream_id)
+        if not group['streams']:
+            del self.groups[filter_key]
+            self._link(filter_key, group['anchor'], add=False)
+            
+    def _anchor(self, subscription: SubscriptionFilter) -> tuple:
+        if subscription.sources:
+            return self.by_source, subscription.sources
+        if subscription.tags:
+            return self.by_tag, subscription.tags
+        if subscription.levels:
+            return self.by_level, subscription.levels
+        return None, ()
+        
+    def _link(self, filter_key: str, anchor: tuple, add: bool):
+        index, values = anchor
+        if index is None:
+            if add:
+                self.unanchored.add(filter_key)
             else:
-                # 일반 검색
-                query = "SELECT * FROM logs WHERE 1=1"
-                params = []
-                
-                if sources:
-                    placeholders = ','.join('?' * len(sources))
-                    query += f" AND source IN ({placeholders})"
-                    params.extend(sources)
-                    
-                if levels:
-                    placeholders = ','.join('?' * len(levels))
-                    query += f" AND level IN ({placeholders})"
-                    params.extend(levels)
-                    
-                if since:
-                    since_timestamp = self._parse_time_since(since)
-                    query += " AND created_at >= ?"
-                    params.append(since_timestamp)
-            
-            # 정렬 및 제한
-            query += " ORDER BY created_at DESC LIMIT ?"
-            params.append(limit)
-            
-            print(f"[DB] 쿼리 실행: {query}")
-            print(f"[DB] 파라미터: {params}")
-            
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
-            
-            results = []
-            for row in rows:
-                result = dict(row)
-                result['metadata'] = json.loads(result['metadata']) if result['metadata'] else {}
-                result['tags'] = json.loads(result['tags']) if result['tags'] else []
-                results.append(result)
+                self.unanchored.discard(filter_key)
+            return
+        for value in values:
+            if add:
+                index[value].add(filter_key)
+            else:
+                keys = index.get(value)
+                if keys is not None:
+                    keys.discard(filter_key)
+                    if not keys:
+                        del index[value]
+                        
+    def match(self, log_entry: LogEntry) -> List[set]:
+        """로그와 일치하는 그룹들의 stream_id 집합 목록"""
+        candidates = set(self.unanchored)
+        keys = self.by_source.get(log_entry.source)
+        if keys:
+            candidates |= keys
+        keys = self.by_level.get(log_entry.level)
+        if keys:
+            candidates |= keys
+        for tag in log_entry.tags or ():
+            keys = self.by_tag.get(tag)
+            if keys:
+                candidates |= keys
                 
-            print(f"[DB] 결과: {len(results)}개 로그 반환")
-            return results
-            
-        except Exception as e:
-            print(f"[DB] 쿼리 오류: {e}")
-            print(f"[DB] 쿼리: {query}")
-            print(f"[DB] 파라미터: {params}")
-            # 오류 발생 시 빈 결과 반환
-            return []
-        finally:
-            conn.close()
-            
-    def _parse_time_since(self, since: str) -> float:
-        """시간 문자열을 timestamp로 변환 (예: "5m" -> 5분 전)"""
-        now = time.time()
-        
-        if since.endswith('s'):
-            return now - int(since[:-1])
-        elif since.endswith('m'):
-            return now - int(since[:-1]) * 60
-        elif since.endswith('h'):
-            return now - int(since[:-1]) * 3600
-        elif since.endswith('d'):
-            return now - int(since[:-1]) * 86400
-        else:
-            # 기본값: 분 단위
-            return now - int(since) * 60
+        matched = []
+        for filter_key in candidates:
+            group = self.groups[filter_key]
+            if group['filter'].matches(log_entry):
+                matched.append(group['streams'])
+        return matched
+        
+    def __len__(self) -> int:
+        return len(self.stream_keys)
 
 
-class RealTimeAnalyzer:
-    """실시간 로그 분석기"""
+class StreamBatch:
+    """start_stream batch 모드의 스트림별 로그 묶음
     
-    def __init__(self):
-        self.error_counts = defaultdict(lambda: deque(maxlen=60))  # 1분간 에러 수
-        self.response_times = defaultdict(lambda: deque(maxlen=100))  # 최근 응답시간들
+    로그를 interval_ms 동안 또는 max_entries 개까지 모아 log_batch 프레임
+    하나로 보낸다. format이 compact이면 로그를 columns 순서의 배열로 보낸다.
+    """
+    
+    COMPACT_COLUMNS = ['id', 'source', 'level', 'timestamp', 'message', 'metadata', 'tags', 'trace_id']
+    
+    def __init__(self, options: Dict):
+        self.interval = max(10, min(int(options.get('interval_ms', 100)), 10000)) / 1000
+        self.max_entries = max(1, min(int(options.get('max_entries', 200)), 5000))
+        self.compact = options.get('format') == 'compact'
+        self.items = []  # 인코딩된 로그 (JSON 문자열)
         self.alerts = []
+        self.handle = None  # 예약된 플러시 (loop.call_later)
         
-    def analyze_log(self, log_entry: LogEntry) -> List[Dict]:
-        """로그 분석 및 알림 생성"""
-        alerts = []
-        current_time = time.time()
+    def describe(self) -> Dict:
+        return {
+            'interval_ms': int(self.interval * 1000),
+            'max_entries': self.max_entries,
+            'format': 'compact' if self.compact else 'full'
+        }
         
-        # 에러율 급증 감지
-        if log_entry.level in ['ERROR', 'FATAL']:
-            source_errors = self.error_counts[log_entry.source]
-            source_errors.append(current_time)
-            
-            # 1분간 에러가 10개 이상이면 알림
-            recent_errors = [t for t in source_errors if current_time - t <= 60]
-            if len(recent_errors) >= 10:
-                alerts.append({
-                    'type': 'error_spike',
-                    'source': log_entry.source,
-                    'count': len(recent_errors),
-                    'message': f'{log_entry.source}에서 1분간 {len(recent_errors)}개 에러 발생'
-                })
-                
-        # 응답시간 지연 감지 (HTTP, DB 쿼리)
-        if log_entry.source in ['http_traffic', 'db_query']:
-            duration = log_entry.metadata.get('duration_ms', 0)
-            if duration > 0:
-                source_times = self.response_times[log_entry.source]
-                source_times.append(duration)
+    def add(self, item: str, alerts: Optional[List[Dict]]) -> bool:
+        """로그 추가 - max_entries에 도달하면 True"""
+        self.items.append(item)
+        if alerts:
+            self.alerts.extend(alerts)
+        return len(self.items) >= self.max_entries
+        
+    def take(self, prefix: str) -> tuple:
+        """모인 로그로 log_batch 프레임 생성 후 비움 - (frame, 로그 수)"""
+        self.cancel()
+        count = len(self.items)
+        if self.compact:
+            data = '{"columns": %s, "rows": [%s]}' % (json.dumps(self.COMPACT_COLUMNS), ', '.join(self.items))
+        else:
+            data = '{"logs": [%s]}' % ', '.join(self.items)
+        frame = '%s"data": %s, "count": %d, "alerts": %s, "timestamp": %s}' % (
+            prefix, data, count, json.dumps(self.alerts), json.dumps(datetime.now().isoformat()))
+        self.items = []
+        self.alerts = []
+        return frame, count
+        
+    def cancel(self):
+        if self.handle:
+            self.handle.cancel()
+            self.handle = None
+
+
+class WebSocketSender:
+    """WebSocket 연결별 송신 큐와 writer 태스크
+    
+    브로드캐스트는 인코딩된 프레임을 큐에 넣기만 하고 실제 전송은 연결마다
+    하나인 writer 태스크가 맡는다. 느린 클라이언트는 자기 큐만 채우며,
+    로그 큐가 가득 차면 가장 오래된 로그를 버리고 다음 전송 전에 스트림별
+    lagged 알림으로 버린 건수를 알린다. 제어 메시지는 버리지 않는다.
+    """
+    
+    def __init__(self, ws: WebSocketResponse, max_queue: int = 1000, send_timeout: float = 10.0,
+                 send_lag: Histogram = None, sent_counter: Counter = None, dropped_counter: Counter = None):
+        self.ws = ws
+        self.max_queue = max(1, max_queue)
+        self.send_timeout = send_timeout
+        # 서버 전체 계측 (/metrics) - 없으면 연결별 통계만 유지
+        self.send_lag = send_lag
+        self.sent_counter = sent_counter
+        self.dropped_counter = dropped_counter
+        self.control = deque()  # 제어/응답 프레임 (버리지 않음)
+        self.logs = deque()  # (stream_id, frame, 로그 수, 넣은 시각) 실시간 로그 프레임
+        self.lagged = defaultdict(int)  # stream_id -> 알리지 않은 삭제 건수
+        self.wakeup = asyncio.Event()
+        self.closed = False
+        self.sent = 0
+        self.dropped = 0
+        self.task = asyncio.create_task(self._run())
+        
+    def send(self, message: Dict):
+        """제어 메시지 전송 예약"""
+        self.push(json.dumps(message))
+        
+    def push(self, frame: str):
+        """인코딩된 제어 프레임 전송 예약"""
+        if self.closed:
+            return
+        self.control.append(frame)
+        self.wakeup.set()
+        
+    def push_log(self, stream_id: str, frame: str, count: int = 1) -> bool:
+        """실시간 로그 프레임 전송 예약 - 큐가 가득 차면 가장 오래된 프레임을 버림
+        
+        count는 프레임에 담긴 로그 수 (log_batch 프레임은 여러 개)
+        """
+        if self.closed:
+            return False
+        if len(self.logs) >= self.max_queue:
+            dropped_stream, _, dropped_count, _ = self.logs.popleft()
+            self.lagged[dropped_stream] += dropped_count
+            self.dropped += dropped_count
+            if self.dropped_counter:
+                self.dropped_counter.inc(dropped_count)
+        self.logs.append((stream_id, frame, count, time.monotonic()))
+        self.wakeup.set()
+        return True
+        
+    def _next_frame(self) -> Optional[str]:
+        if self.control:
+            return self.control.popleft()
+        if self.lagged:
+            stream_id, dropped = self.lagged.popitem()
+            return json.dumps({
+                'type': 'lagged',
+                'stream_id': stream_id,
+                'data': {'dropped': dropped},
+                'timestamp': datetime.now().isoformat()
+            })
+        if self.logs:
+            _, frame, _, queued_at = self.logs.popleft()
+            if self.send_lag:
+                # 브로드캐스트부터 전송 시작까지 큐에서 기다린 시간
+                self.send_lag.observe(time.monotonic() - queued_at)
+            return frame
+        return None
+        
+    async def _run(self):
+        try:
+            while True:
+                frame = self._next_frame()
+                if frame is None:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                    continue
+                await asyncio.wait_for(self.ws.send_str(frame), self.send_timeout)
+                self.sent += 1
+                if self.sent_counter:
+                    self.sent_counter.inc()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # 전송 실패/지연 초과 - 연결을 닫으면 handle_websocket이 정리한다
+            print(f"[WebSocket] 전송 실패, 연결 종료: {e!r}")
+            self.closed = True
+            self.control.clear()
+            self.logs.clear()
+            if not self.ws.closed:
+                await self.ws.close()
                 
-                if len(source_times) >= 10:
-                    avg_time = sum(source_times) / len(source_times)
-                    if duration > avg_time * 3:  # 평균의 3배 이상 느림
-                        alerts.append({
-                            'type': 'slow_response',
-                            'source': log_entry.source,
-                            'duration': duration,
-                            'average': avg_time,
-                            'message': f'{log_entry.source} 응답시간 지연: {duration}ms (평균 {avg_time:.1f}ms)'
-                        })
-                        
-        return alerts
+    def stop(self):
+        self.closed = True
+        self.task.cancel()
+        
+    def get_stats(self) -> Dict:
+        return {
+            'queued': len(self.control) + len(self.logs),
+            'sent': self.sent,
+            'dropped': self.dropped
+        }
 
 
 class LogCollectorServer:
     """메인 로그 수집 서버"""
     
-    def __init__(self, host: str = "0.0.0.0", port: int = 8888, db_path: str = "./dev_logs.db"):
+    def __init__(self, host: str = "0.0.0.0", port: int = 8888, db_path: str = "./dev_logs.db",
+                 storage_config: StorageConfig = None, ws_queue_size: int = 1000,
+                 rpc_log_sample_rate: float = 0.01, rpc_log_max_chars: int = 300,
+                 alerts_config: Dict = None, max_request_bytes: int = 64 * 1024 * 1024):
         self.host = host
         self.port = port
-        self.storage = LogStorage(db_path)
-        self.analyzer = RealTimeAnalyzer()
+        # 수집 경로 전체가 배치 커밋 저장소 하나를 공유
+        self.storage = LogStorage(storage_config or StorageConfig(db_path=db_path))
+        self.analyzer = RealTimeAnalyzer(alerts_config)
+        self.analyzer_task = None
+        self.loop_monitor = EventLoopMonitor()
         self.websockets = set()
+        self.ws_senders = {}  # WebSocket -> WebSocketSender
+        self.ws_queue_size = ws_queue_size
         self.stream_filters = {}  # stream_id -> filters 매핑
-        self.app = web.Application()
+        self.subscriptions = SubscriptionIndex()  # 필터 -> 스트림 역색인
+        self.query_streams = {}  # stream_id -> 스트리밍 조회 상태 (query_stream)
+        self.rpc_log_sample_rate = rpc_log_sample_rate
+        self.rpc_log_max_chars = rpc_log_max_chars
+        self.rpc_methods = self._build_rpc_registry()
+        self.start_time = time.time()
+        self.metrics = Registry()
+        self._build_metrics()
+        # 압축 요청은 aiohttp가 풀면서 이 크기(해제 후 기준)를 넘으면 413으로 거절
+        self.max_request_bytes = max_request_bytes
+        self.app = web.Application(client_max_size=max_request_bytes)
         self.setup_routes()
         
     def setup_routes(self):
@@ -333,6 +507,11 @@ class LogCollectorServer:
         # WebSocket 엔드포인트 (실시간 스트리밍)
         self.app.router.add_get('/ws', self.handle_websocket)
         
+        # 스트리밍 내보내기 엔드포인트 (NDJSON)
+        export_resource = self.app.router.add_resource('/api/export')
+        cors.add(export_resource.add_route('GET', self.handle_export))
+        cors.add(export_resource.add_route('POST', self.handle_export))
+        
         # 클라이언트 로그 수신 엔드포인트
         client_logs_resource = self.app.router.add_post('/api/client-logs', self.handle_client_logs)
         cors.add(client_logs_resource)
@@ -345,14 +524,71 @@ class LogCollectorServer:
         health_resource = self.app.router.add_get('/health', self.handle_health)
         cors.add(health_resource)
         
+        # Prometheus 텍스트 형식 계측
+        self.app.router.add_get('/metrics', self.handle_metrics)
+        
     async def handle_health(self, request: Request) -> Response:
         """헬스체크 엔드포인트"""
-        return web.json_response({'status': 'ok', 'timestamp': datetime.now().isoformat()})
+        return web.json_response({'status': 'ok', 'timestamp': datetime.now().isoformat(),
+                                  'event_loop_lag_ms': self.loop_monitor.get_stats()['last_ms']})
     
+    async def handle_metrics(self, request: Request) -> Response:
+        """Prometheus 스크레이프 엔드포인트 - 누적된 값을 텍스트로 변환만 한다"""
+        return web.Response(body=self.metrics.render().encode('utf-8'),
+                            headers={'Content-Type': Registry.CONTENT_TYPE})
+        
+    def _build_metrics(self):
+        """계측 항목 등록 - 카운터는 값이 바뀌는 곳에서 누적하고 나머지는 수집 시점에 읽는다"""
+        registry = self.metrics
+        processor = self.storage.batch_processor
+        ingest = processor.metrics
+        
+        for key, documentation in (('enqueued', '수집 큐에 들어간 로그 수'),
+                                   ('stored', 'DB에 저장된 로그 수'),
+                                   ('dropped', '큐 초과로 버린 로그 수'),
+                                   ('spilled', '큐 초과로 스필 파일에 쓴 로그 수'),
+                                   ('replayed', '스필 파일에서 다시 넣은 로그 수'),
+                                   ('write_errors', '저장에 실패한 배치 수')):
+            registry.counter(f'log_ingest_{key}_total', documentation, func=lambda key=key: ingest[key])
+        registry.gauge('log_ingest_queue_depth', '저장 대기 중인 로그 수', func=lambda: len(processor.pending))
+        registry.gauge('log_ingest_queue_capacity', '수집 큐 최대 크기', func=lambda: processor.max_queue)
+        registry.register(processor.batch_sizes)
+        registry.register(processor.flush_seconds)
+        
+        self.request_bytes = registry.counter('log_ingest_request_bytes_total', '수신한 요청 본문 크기 (압축 상태 기준)',
+                                              ['encoding', 'format'])
+        self.rpc_duration = registry.histogram('log_rpc_duration_seconds', 'JSON-RPC 메서드 처리 시간', ['method'])
+        self.rpc_errors = registry.counter('log_rpc_errors_total', 'JSON-RPC 에러 응답 수', ['method', 'code'])
+        
+        registry.gauge('log_websocket_connections', 'WebSocket 연결 수', func=lambda: len(self.ws_senders))
+        registry.gauge('log_websocket_streams', '실시간 스트림 구독 수', func=lambda: len(self.stream_filters))
+        registry.gauge('log_websocket_queued_frames', '송신 큐에 쌓인 프레임 수',
+                       func=lambda: sum(len(sender.control) + len(sender.logs) for sender in self.ws_senders.values()))
+        self.ws_send_lag = registry.histogram('log_websocket_send_lag_seconds', '로그 프레임이 송신 큐에서 기다린 시간')
+        self.ws_sent = registry.counter('log_websocket_sent_frames_total', 'WebSocket으로 보낸 프레임 수')
+        self.ws_dropped = registry.counter('log_websocket_dropped_logs_total', '느린 구독자 큐에서 버린 로그 수')
+        
+        registry.gauge('log_db_size_bytes', 'SQLite DB 파일 크기 (WAL 포함)', func=self._db_size_bytes)
+        registry.gauge('log_event_loop_lag_seconds', '최근 이벤트 루프 지연',
+                       func=lambda: self.loop_monitor.get_stats()['last_ms'] / 1000)
+        registry.gauge('log_server_uptime_seconds', '서버 가동 시간', func=lambda: time.time() - self.start_time)
+        if HAS_PSUTIL:
+            process = psutil.Process()
+            registry.gauge('process_resident_memory_bytes', '프로세스 상주 메모리', func=lambda: process.memory_info().rss)
+            
+    def _db_size_bytes(self) -> int:
+        total = 0
+        for suffix in ('', '-wal'):
+            try:
+                total += os.path.getsize(self.storage.db_path + suffix)
+            except OSError:
+                pass
+        return total
+        
     async def handle_client_logs(self, request: Request) -> Response:
         """클라이언트에서 전송된 로그 배치 처리"""
         try:
-            data = await request.json()
+            data, _ = await self._read_payload(request)
             logs_data = data.get('logs', [])
             print(f"[CLIENT-LOGS] 클라이언트 로그 수신: {len(logs_data)} 개")
             
@@ -380,7 +616,7 @@ class LogCollectorServer:
             
             # 데이터베이스에 저장
             if log_entries:
-                self.storage.store_logs_batch(log_entries)
+                await self.storage.store_logs_batch_async(log_entries)
                 print(f"[CLIENT-LOGS] {len(log_entries)}개 로그 저장 완료")
                 
                 # 실시간 분석 및 브로드캐스트
@@ -394,7 +630,7 @@ class LogCollectorServer:
                 'timestamp': datetime.now().isoformat()
             })
             
-        except json.JSONDecodeError as e:
+        except ValueError as e:
             print(f"[CLIENT-LOGS] JSON 파싱 에러: {e}")
             return web.json_response({
                 'status': 'error',
@@ -408,6 +644,103 @@ class LogCollectorServer:
                 'message': str(e)
             }, status=500)
     
+    async def handle_export(self, request: Request) -> web.StreamResponse:
+        """조회 결과 스트리밍 내보내기 - NDJSON 청크 단위 전송 (선택적 gzip)
+        
+        GET은 쿼리스트링(sources/levels는 쉼표 구분), POST는 JSON 본문으로 조건을 받는다.
+        SQLite 커서를 fetchmany로 읽어 생성되는 대로 전송하므로 결과 크기와 무관하게
+        메모리 사용량이 일정하고 첫 바이트가 바로 나간다.
+        """
+        try:
+            if request.method == 'POST':
+                params = await request.json()
+                if not isinstance(params, dict):
+                    raise ValueError("Request body must be a JSON object")
+            else:
+                params = dict(request.query)
+                for key in ('sources', 'levels'):
+                    if params.get(key):
+                        params[key] = params[key].split(',')
+                        
+            filters = {key: params.get(key) for key in
+                       ('sources', 'levels', 'since', 'until', 'search', 'trace_id', 'cursor')}
+            filters['include_archived'] = str(params.get('include_archived', '')).lower() in ('1', 'true')
+            chunk_size, limit = self._chunk_params(params)
+            if filters['cursor']:
+                self.storage.decode_cursor(filters['cursor'])
+        except ValueError as e:
+            return web.json_response({'status': 'error', 'message': str(e)}, status=400)
+            
+        use_gzip = (str(params.get('gzip', '')).lower() in ('1', 'true') or
+                    'gzip' in request.headers.get('Accept-Encoding', ''))
+        
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson; charset=utf-8'})
+        compressor = None
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # gzip 컨테이너
+        response.enable_chunked_encoding()
+        await response.prepare(request)
+        
+        loop = asyncio.get_event_loop()
+        rows = self.storage.iter_logs(chunk_size=chunk_size, limit=limit, **filters)
+        total = 0
+        try:
+            while True:
+                # 조회, 직렬화, 압축은 모두 이벤트 루프 밖에서 수행
+                chunk = await loop.run_in_executor(
+                    self.storage.executor, self._encode_export_chunk, rows, compressor)
+                if chunk is None:
+                    break
+                data, count = chunk
+                total += count
+                if data:
+                    await response.write(data)  # 클라이언트 수신 속도에 맞춰 대기
+                    
+            if compressor:
+                await response.write(compressor.flush())
+            await response.write_eof()
+            print(f"[EXPORT] {total}개 로그 스트리밍 완료")
+            
+        except ConnectionResetError:
+            print(f"[EXPORT] 클라이언트 연결 종료 ({total}개 전송)")
+        finally:
+            self._close_rows(rows)
+            
+        return response
+        
+    @staticmethod
+    def _chunk_params(params: Dict) -> Tuple[int, Optional[int]]:
+        """스트리밍 조회의 chunk_size / limit 파싱 - 정수가 아니면 ValueError"""
+        try:
+            chunk_size = max(1, min(int(params.get('chunk_size') or 500), 5000))
+            limit = int(params['limit']) if params.get('limit') is not None else None
+        except (TypeError, ValueError):
+            raise ValueError("chunk_size and limit must be integers")
+        if limit is not None and limit < 1:
+            raise ValueError("limit must be positive")
+        return chunk_size, limit
+        
+    @staticmethod
+    def _encode_export_chunk(rows, compressor=None):
+        """다음 청크를 NDJSON 바이트로 변환 (executor에서 실행) - 끝이면 None"""
+        chunk = next(rows, None)
+        if chunk is None:
+            return None
+        data = ''.join(json.dumps(log, ensure_ascii=False) + '\n' for log in chunk).encode('utf-8')
+        if compressor:
+            data = compressor.compress(data)
+        return data, len(chunk)
+        
+    @staticmethod
+    def _close_rows(rows):
+        """스트리밍 조회 생성기 종료"""
+        try:
+            rows.close()
+        except ValueError:
+            # executor에서 아직 실행 중 - 생성기 GC 시점에 정리됨
+            pass
+            
     async def handle_ui_analysis(self, request: Request) -> Response:
         """UI 스크린샷 분석 엔드포인트"""
         try:
@@ -441,7 +774,7 @@ class LogCollectorServer:
                 trace_id=data.get('trace_id')
             )
             
-            self.storage.store_log(log_entry)
+            await self.storage.store_log_async(log_entry)
             
             # 실시간 브로드캐스트
             await self.broadcast_log(log_entry)
@@ -467,11 +800,18 @@ class LogCollectorServer:
             }, status=500)
         
     async def handle_websocket(self, request: Request) -> WebSocketResponse:
-        """WebSocket 연결 처리"""
-        ws = web.WebSocketResponse()
+        """WebSocket 연결 처리
+        
+        permessage-deflate는 클라이언트가 지원하면 연결 전체에 적용된다.
+        작은 프레임이 많아 압축 비용이 더 큰 경우 /ws?compress=0 으로 끌 수 있다.
+        """
+        ws = web.WebSocketResponse(compress=request.query.get('compress', '1') != '0')
         await ws.prepare(request)
         
         self.websockets.add(ws)
+        sender = WebSocketSender(ws, max_queue=self.ws_queue_size, send_lag=self.ws_send_lag,
+                                 sent_counter=self.ws_sent, dropped_counter=self.ws_dropped)
+        self.ws_senders[ws] = sender
         print(f"[WebSocket] 새 연결: {len(self.websockets)}개 활성")
         
         try:
@@ -482,23 +822,29 @@ class LogCollectorServer:
                         await self.handle_websocket_message(ws, data)
                     except json.JSONDecodeError as e:
                         print(f"[WebSocket] JSON 파싱 에러: {e}")
-                        await ws.send_str(json.dumps({
+                        sender.send({
                             'type': 'error',
                             'data': {'message': 'Invalid JSON format'}
-                        }))
+                        })
                 elif msg.type == WSMsgType.ERROR:
                     print(f'[WebSocket] 에러: {ws.exception()}')
         except Exception as e:
             print(f"[WebSocket] 연결 처리 중 에러: {e}")
         finally:
             self.websockets.discard(ws)
+            self.ws_senders.pop(ws, None)
+            sender.stop()
             # 연결이 끊어진 스트림의 필터 정리
             stream_ids_to_remove = []
             for stream_id, stream_data in self.stream_filters.items():
                 if stream_data.get('websocket') == ws:
                     stream_ids_to_remove.append(stream_id)
             for stream_id in stream_ids_to_remove:
-                del self.stream_filters[stream_id]
+                self._remove_stream(stream_id)
+            # 진행 중인 스트리밍 조회 취소
+            for state in list(self.query_streams.values()):
+                if state['websocket'] is ws:
+                    state['task'].cancel()
             print(f"[WebSocket] 연결 종료: {len(self.websockets)}개 활성")
             
         return ws
@@ -507,269 +853,458 @@ class LogCollectorServer:
         """WebSocket 메시지 처리"""
         message_type = data.get('type')
         stream_id = data.get('stream_id')
+        sender = self.ws_senders[ws]
         
         if message_type == 'start_stream':
             filters = data.get('data', {}).get('filters', {})
+            batch_options = data.get('data', {}).get('batch')
+            batch = None
+            if batch_options:
+                batch = StreamBatch(batch_options if isinstance(batch_options, dict) else {})
+            if stream_id in self.stream_filters:
+                self._remove_stream(stream_id)
+            try:
+                self.subscriptions.add(stream_id, filters)
+            except ValueError as e:
+                sender.send({
+                    'type': 'error',
+                    'stream_id': stream_id,
+                    'data': {'message': str(e)}
+                })
+                return
             self.stream_filters[stream_id] = {
                 'websocket': ws,
+                'sender': sender,
                 'filters': filters,
+                'batch': batch,
+                # 프레임 앞부분 - 본문은 로그마다 한 번만 인코딩해 이어 붙임
+                'prefix': '{"type": "%s", "stream_id": %s, ' % (
+                    'log_batch' if batch else 'log_entry', json.dumps(stream_id)),
                 'started_at': datetime.now().isoformat()
             }
             print(f"[WebSocket] 스트림 시작: {stream_id}, 필터: {filters}")
             
-            # 스트림 시작 확인 응답
-            await ws.send_str(json.dumps({
+            # 스트림 시작 확인 응답 (batch 모드면 적용된 설정 포함)
+            response = {
                 'type': 'stream_started',
                 'stream_id': stream_id,
                 'timestamp': datetime.now().isoformat()
-            }))
+            }
+            if batch:
+                response['batch'] = {**batch.describe(), 'compressed': bool(ws.compress)}
+            sender.send(response)
             
         elif message_type == 'stop_stream':
             if stream_id in self.stream_filters:
-                del self.stream_filters[stream_id]
+                self._flush_stream_batch(stream_id)
+                self._remove_stream(stream_id)
                 print(f"[WebSocket] 스트림 중지: {stream_id}")
                 
                 # 스트림 중지 확인 응답
-                await ws.send_str(json.dumps({
+                sender.send({
                     'type': 'stream_stopped',
                     'stream_id': stream_id,
                     'timestamp': datetime.now().isoformat()
-                }))
+                })
                 
         elif message_type == 'update_filters':
             if stream_id in self.stream_filters:
                 new_filters = data.get('data', {}).get('filters', {})
+                try:
+                    self.subscriptions.add(stream_id, new_filters)
+                except ValueError as e:
+                    sender.send({
+                        'type': 'error',
+                        'stream_id': stream_id,
+                        'data': {'message': str(e)}
+                    })
+                    return
                 self.stream_filters[stream_id]['filters'] = new_filters
                 print(f"[WebSocket] 스트림 필터 업데이트: {stream_id}, 새 필터: {new_filters}")
                 
                 # 필터 업데이트 확인 응답
-                await ws.send_str(json.dumps({
+                sender.send({
                     'type': 'filters_updated',
                     'stream_id': stream_id,
                     'timestamp': datetime.now().isoformat()
-                }))
+                })
+                
+        elif message_type == 'query_stream':
+            # 스트리밍 조회 - query_chunk 프레임을 window 개까지 ack 없이 전송
+            if stream_id in self.query_streams:
+                self.query_streams[stream_id]['task'].cancel()
+            state = {
+                'websocket': ws,
+                'acked': 0,
+                'ack_event': asyncio.Event(),
+            }
+            state['task'] = asyncio.create_task(
+                self._run_query_stream(ws, stream_id, data.get('data', {}), state))
+            self.query_streams[stream_id] = state
+            
+        elif message_type == 'query_stream_ack':
+            state = self.query_streams.get(stream_id)
+            if state:
+                try:
+                    seq = int((data.get('data') or {}).get('seq', 0))
+                except (AttributeError, TypeError, ValueError):
+                    sender.send({
+                        'type': 'error',
+                        'stream_id': stream_id,
+                        'data': {'message': 'query_stream_ack requires an integer seq'}
+                    })
+                    return
+                state['acked'] = max(state['acked'], seq)
+                state['ack_event'].set()
+                
+        elif message_type == 'query_stream_cancel':
+            state = self.query_streams.get(stream_id)
+            if state:
+                state['task'].cancel()
                 
         elif message_type == 'ping':
             # 하트비트 응답
-            await ws.send_str(json.dumps({
+            sender.send({
                 'type': 'pong',
                 'timestamp': datetime.now().isoformat()
-            }))
+            })
             
         else:
             print(f"[WebSocket] 알 수 없는 메시지 타입: {message_type}")
-            await ws.send_str(json.dumps({
+            sender.send({
                 'type': 'error',
                 'data': {'message': f'Unknown message type: {message_type}'}
-            }))
+            })
+        
+    async def _run_query_stream(self, ws: web.WebSocketResponse, stream_id: str, params: Dict, state: Dict):
+        """WebSocket 스트리밍 조회 실행 (ack 기반 흐름 제어)
         
+        클라이언트는 query_chunk의 seq를 query_stream_ack로 돌려보내며,
+        ack되지 않은 청크가 window 개에 도달하면 다음 청크 조회를 멈춘다.
+        """
+        filters = params.get('filters', {})
+        sender = self.ws_senders[ws]
+        try:
+            chunk_size, limit = self._chunk_params(params)
+            window = max(1, int(params.get('window', 4)))
+        except (TypeError, ValueError) as e:
+            sender.send({
+                'type': 'error',
+                'stream_id': stream_id,
+                'data': {'message': str(e)}
+            })
+            if self.query_streams.get(stream_id) is state:
+                del self.query_streams[stream_id]
+            return
+        loop = asyncio.get_event_loop()
+        rows = self.storage.iter_logs(
+            chunk_size=chunk_size,
+            limit=limit,
+            **{key: filters.get(key) for key in
+               ('sources', 'levels', 'since', 'until', 'search', 'trace_id', 'cursor')}
+        )
+        seq = 0
+        total = 0
+        
+        try:
+            while True:
+                # 백프레셔: 미확인 청크가 window 이상이면 ack 대기
+                while seq - state['acked'] >= window:
+                    state['ack_event'].clear()
+                    await state['ack_event'].wait()
+                    
+                chunk = await loop.run_in_executor(self.storage.executor, next, rows, None)
+                if chunk is None:
+                    break
+                seq += 1
+                total += len(chunk)
+                sender.send({
+                    'type': 'query_chunk',
+                    'stream_id': stream_id,
+                    'seq': seq,
+                    'data': {'logs': chunk}
+                })
+                
+            sender.send({
+                'type': 'query_complete',
+                'stream_id': stream_id,
+                'data': {'count': total, 'chunks': seq},
+                'timestamp': datetime.now().isoformat()
+            })
+            
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[WebSocket] 스트리밍 조회 실패: {e}")
+            sender.send({
+                'type': 'error',
+                'stream_id': stream_id,
+                'data': {'message': str(e)}
+            })
+        finally:
+            self._close_rows(rows)
+            if self.query_streams.get(stream_id) is state:
+                del self.query_streams[stream_id]
+                
     async def broadcast_log(self, log_entry: LogEntry, alerts: List[Dict] = None):
-        """WebSocket으로 실시간 로그 브로드캐스트 (필터 적용)"""
+        """WebSocket으로 실시간 로그 브로드캐스트 (필터 적용)
+        
+        일치하는 스트림은 구독 색인으로 찾고, 로그 본문 인코딩은 로그당
+        한 번만 하고 각 연결의 송신 큐에 넣는다. 전송은 연결별 writer
+        태스크가 하므로 느린 구독자가 수집 경로를 지연시키지 않는다.
+        """
         if not self.stream_filters:
             return
             
-        # 연결이 끊어진 WebSocket 제거
-        dead_ws = set()
+        data_json = None
+        body = None
+        row_json = None
         
-        for stream_id, stream_data in self.stream_filters.items():
-            ws = stream_data['websocket']
-            filters = stream_data['filters']
-            
-            # 필터 적용
-            if self.should_include_log(log_entry, filters):
-                message = {
-                    'type': 'log_entry',
-                    'stream_id': stream_id,
-                    'data': asdict(log_entry),
-                    'alerts': alerts or [],
-                    'timestamp': datetime.now().isoformat()
-                }
+        for stream_id in itertools.chain.from_iterable(self.subscriptions.match(log_entry)):
+            stream_data = self.stream_filters[stream_id]
+            if data_json is None:
+                data_json = json.dumps(asdict(log_entry))
                 
-                try:
-                    await ws.send_str(json.dumps(message))
-                except Exception as e:
-                    print(f"[WebSocket] 브로드캐스트 실패: {e}")
-                    dead_ws.add(ws)
-                    
-        # 끊어진 연결 정리
-        if dead_ws:
-            self.websockets -= dead_ws
-            stream_ids_to_remove = []
-            for stream_id, stream_data in self.stream_filters.items():
-                if stream_data['websocket'] in dead_ws:
-                    stream_ids_to_remove.append(stream_id)
-            for stream_id in stream_ids_to_remove:
-                del self.stream_filters[stream_id]
+            batch = stream_data['batch']
+            if batch is None:
+                if body is None:
+                    # '{' 를 뺀 나머지 - 스트림별 prefix 뒤에 이어 붙인다
+                    body = '"data": %s, "alerts": %s, "timestamp": %s}' % (
+                        data_json, json.dumps(alerts or []), json.dumps(datetime.now().isoformat()))
+                stream_data['sender'].push_log(stream_id, stream_data['prefix'] + body)
+                continue
                 
+            if batch.compact:
+                if row_json is None:
+                    row_json = json.dumps([getattr(log_entry, column) for column in StreamBatch.COMPACT_COLUMNS])
+                full = batch.add(row_json, alerts)
+            else:
+                full = batch.add(data_json, alerts)
+            if full:
+                self._flush_stream_batch(stream_id)
+            elif batch.handle is None:
+                batch.handle = asyncio.get_running_loop().call_later(
+                    batch.interval, self._flush_stream_batch, stream_id)
+            
+    def _flush_stream_batch(self, stream_id: str):
+        """batch 모드 스트림에 모인 로그를 log_batch 프레임으로 전송 예약"""
+        stream_data = self.stream_filters.get(stream_id)
+        if not stream_data or not stream_data['batch'] or not stream_data['batch'].items:
+            return
+        frame, count = stream_data['batch'].take(stream_data['prefix'])
+        stream_data['sender'].push_log(stream_id, frame, count)
+        
+    def _remove_stream(self, stream_id: str):
+        """스트림 등록 해제 (예약된 batch 플러시 취소)"""
+        stream_data = self.stream_filters.pop(stream_id, None)
+        self.subscriptions.remove(stream_id)
+        if stream_data and stream_data['batch']:
+            stream_data['batch'].cancel()
+            
+    def get_websocket_stats(self) -> Dict:
+        """WebSocket 연결/송신 큐 통계"""
+        senders = [sender.get_stats() for sender in self.ws_senders.values()]
+        return {
+            'connections': len(senders),
+            'streams': len(self.stream_filters),
+            'queued': sum(stats['queued'] for stats in senders),
+            'max_queued': max((stats['queued'] for stats in senders), default=0),
+            'sent': sum(stats['sent'] for stats in senders),
+            'dropped': sum(stats['dropped'] for stats in senders)
+        }
+        
+    def broadcast_alerts(self, alerts: List[Dict]):
+        """로그와 무관하게 생긴 알림을 모든 WebSocket 연결에 전송"""
+        if not alerts or not self.ws_senders:
+            return
+        message = {
+            'type': 'alerts',
+            'data': alerts,
+            'timestamp': datetime.now().isoformat()
+        }
+        for sender in self.ws_senders.values():
+            sender.send(message)
+            
+    async def _run_analyzer_ticks(self, interval: float = 1.0):
+        """로그가 뜸해도 분 단위 이상 탐지가 진행되도록 주기적으로 판정"""
+        while True:
+            await asyncio.sleep(interval)
+            self.broadcast_alerts(self.analyzer.tick())
+            
+    async def _seed_anomaly_baselines(self):
+        """보존 중인 분 롤업으로 이상 탐지 기준선 초기화"""
+        if not self.analyzer.anomaly_enabled:
+            return
+        try:
+            # 분 롤업 보존 기간 경계에서 시간 롤업으로 바뀌지 않도록 1분 여유
+            since = time.time() - self.storage.config.minute_rollup_hours * 3600 + 60
+            columns = await self.storage.run(self.storage.get_analysis_columns, since)
+            self.analyzer.anomalies.seed(columns)
+            print(f"[ANALYZER] 이상 탐지 기준선 초기화: {len(self.analyzer.anomalies.counts)}개 시계열")
+        except Exception as e:
+            print(f"[WARNING] 이상 탐지 기준선 초기화 실패: {e}")
+            
     def should_include_log(self, log_entry: LogEntry, filters: Dict) -> bool:
         """로그 엔트리가 필터 조건을 만족하는지 확인"""
-        # 레벨 필터
-        if 'levels' in filters and filters['levels']:
-            if log_entry.level not in filters['levels']:
-                return False
-                
-        # 소스 필터
-        if 'sources' in filters and filters['sources']:
-            if log_entry.source not in filters['sources']:
-                return False
-                
-        # 패턴 필터 (메시지 내용)
-        if 'pattern' in filters and filters['pattern']:
-            pattern = filters['pattern']
-            if pattern not in log_entry.message:
-                return False
-                
-        # 태그 필터
-        if 'tags' in filters and filters['tags']:
-            if not any(tag in log_entry.tags for tag in filters['tags']):
-                return False
-                
-        return True
+        return SubscriptionFilter(filters).matches(log_entry)
         
+    # JSON-RPC 메서드 등록표: 이름 -> (핸들러 이름, 동시 실행 제한)
+    # 제한이 'readers'이면 읽기 연결 풀 크기, None이면 제한 없음
+    RPC_METHODS = {
+        'ping': ('method_ping', None),
+        'log': ('method_log', None),
+        'log_batch': ('method_log_batch', None),
+        'query': ('method_query', 'readers'),
+        'search': ('method_search', 'readers'),
+        'get_stats': ('method_get_stats', 'readers'),
+        'get_system_status': ('method_get_system_status', 'readers'),
+        'run_analysis': ('method_run_analysis', 2),
+        'get_error_patterns': ('method_get_error_patterns', 2),
+        'get_performance_analysis': ('method_get_performance_analysis', 2),
+        'get_trend_analysis': ('method_get_trend_analysis', 2),
+        'detect_anomalies': ('method_detect_anomalies', None),
+    }
+    
+    def _build_rpc_registry(self) -> Dict:
+        """RPC_METHODS로부터 메서드 이름 -> (핸들러, 세마포어) 매핑 생성"""
+        registry = {}
+        for name, (handler_name, limit) in self.RPC_METHODS.items():
+            if limit == 'readers':
+                limit = self.storage.pool.max_readers
+            semaphore = asyncio.Semaphore(limit) if limit else None
+            registry[name] = (getattr(self, handler_name), semaphore)
+        return registry
+        
+    def _log_rpc_request(self, body: bytes, count: int = 1, binary: bool = False):
+        """요청 로그 - rpc_log_sample_rate 비율만, rpc_log_max_chars 까지 출력"""
+        if self.rpc_log_sample_rate <= 0 or random.random() >= self.rpc_log_sample_rate:
+            return
+        if binary:
+            preview = f"<msgpack {len(body)} bytes>"
+        else:
+            preview = body[:self.rpc_log_max_chars].decode('utf-8', 'replace')
+            if len(body) > self.rpc_log_max_chars:
+                preview += f"... ({len(body)} bytes)"
+        label = f"배치 {count}개" if count > 1 else "요청"
+        print(f"[RPC] {label} 수신 (샘플): {preview}")
+        
+    async def _read_payload(self, request: Request):
+        """요청 본문 디코딩 - (객체, 원문 bytes) 반환, 형식이 잘못되면 ValueError
+        
+        Content-Encoding(gzip/deflate, 가능하면 zstd/br)은 aiohttp가 읽으면서 풀고,
+        Content-Type이 msgpack이면 msgpack으로, 아니면 JSON으로 파싱한다.
+        """
+        body = await request.read()
+        binary = request.content_type in MSGPACK_CONTENT_TYPES
+        self.request_bytes.labels(request.headers.get('Content-Encoding', 'identity'),
+                                  'msgpack' if binary else 'json').inc(request.content_length or len(body))
+        if not binary:
+            return json.loads(body), body
+        if not HAS_MSGPACK:
+            raise ValueError("msgpack is not installed on the server")
+        try:
+            return msgpack.unpackb(body, raw=False), body
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack body: {e}")
+            
     async def handle_rpc(self, request: Request) -> Response:
         """JSON-RPC 2.0 요청 처리"""
         try:
-            data = await request.json()
-            print(f"[RPC] 요청 수신: {data}")
+            data, body = await self._read_payload(request)
+        except ValueError:
+            return self.rpc_error(-32700, "Parse error")
             
-            # 배치 요청 처리
-            if isinstance(data, list):
-                return await self.handle_batch_rpc(data)
+        # 배치 요청 처리
+        binary = request.content_type in MSGPACK_CONTENT_TYPES
+        if isinstance(data, list):
+            self._log_rpc_request(body, len(data), binary)
+            return await self.handle_batch_rpc(data)
             
-            # JSON-RPC 2.0 검증
-            if data.get('jsonrpc') != '2.0':
-                print(f"[RPC] JSON-RPC 버전 오류: {data.get('jsonrpc')}")
-                return self.rpc_error(-32600, "Invalid Request", data.get('id'))
-                
-            method = data.get('method')
-            params = data.get('params', {})
-            request_id = data.get('id')
-            
-            # 메서드 라우팅
-            if method == 'ping':
-                result = await self.method_ping(params)
-            elif method == 'log':
-                result = await self.method_log(params)
-            elif method == 'log_batch':
-                result = await self.method_log_batch(params)
-            elif method == 'query':
-                result = await self.method_query(params)
-            elif method == 'search':
-                result = await self.method_search(params)
-            elif method == 'get_stats':
-                result = await self.method_get_stats(params)
-            elif method == 'get_system_status':
-                result = await self.method_get_system_status(params)
-            elif method == 'run_analysis':
-                result = await self.method_run_analysis(params)
-            elif method == 'get_error_patterns':
-                result = await self.method_get_error_patterns(params)
-            elif method == 'get_performance_analysis':
-                result = await self.method_get_performance_analysis(params)
-            elif method == 'get_trend_analysis':
-                result = await self.method_get_trend_analysis(params)
-            elif method == 'detect_anomalies':
-                result = await self.method_detect_anomalies(params)
+        self._log_rpc_request(body, binary=binary)
+        response = await self.dispatch_rpc(data)
+        return web.json_response(response, status=400 if 'error' in response else 200)
+        
+    async def handle_batch_rpc(self, batch_data: List[Dict]) -> Response:
+        """JSON-RPC 2.0 배치 요청 처리
+        
+        각 요청은 서로 독립적이므로 동시에 실행하고, 응답은 요청 순서대로 돌려준다.
+        전체 지연은 요청별 지연의 합이 아니라 가장 느린 요청 수준이 된다.
+        """
+        if not batch_data:
+            return self.rpc_error(-32600, "Invalid Request")
+        results = await asyncio.gather(*(self.dispatch_rpc(data) for data in batch_data))
+        return web.json_response(results)
+        
+    async def dispatch_rpc(self, data: Dict) -> Dict:
+        """JSON-RPC 요청 하나를 실행해 응답 객체 반환"""
+        request_id = data.get('id') if isinstance(data, dict) else None
+        
+        # JSON-RPC 2.0 검증
+        if not isinstance(data, dict) or data.get('jsonrpc') != '2.0':
+            self.rpc_errors.labels('', -32600).inc()
+            return self._rpc_error_body(-32600, "Invalid Request", request_id)
+            
+        method = data.get('method')
+        entry = self.rpc_methods.get(method)
+        if entry is None:
+            # 등록되지 않은 이름은 라벨로 쓰지 않음 (라벨 수 폭증 방지)
+            self.rpc_errors.labels('', -32601).inc()
+            return self._rpc_error_body(-32601, "Method not found", request_id)
+        handler, semaphore = entry
+        params = data.get('params', {})
+        
+        started = time.perf_counter()
+        try:
+            if semaphore is None:
+                result = await handler(params)
             else:
-                return self.rpc_error(-32601, "Method not found", request_id)
-                
-            return web.json_response({
-                'jsonrpc': '2.0',
-                'result': result,
-                'id': request_id
-            })
-            
-        except json.JSONDecodeError:
-            return self.rpc_error(-32700, "Parse error")
+                async with semaphore:
+                    result = await handler(params)
+        except asyncio.TimeoutError:
+            return self._rpc_failed(method, started, -32001, "Query timeout", request_id)
+        except ValueError as e:
+            return self._rpc_failed(method, started, -32602, f"Invalid params: {e}", request_id)
         except Exception as e:
-            print(f"[RPC] 내부 에러: {e}")
+            print(f"[RPC] 내부 에러 ({method}): {e}")
             import traceback
             traceback.print_exc()
-            return self.rpc_error(-32603, "Internal error", data.get('id') if 'data' in locals() else None)
-    
-    async def handle_batch_rpc(self, batch_data: List[Dict]) -> Response:
-        """JSON-RPC 2.0 배치 요청 처리"""
-        print(f"[RPC] 배치 요청 처리: {len(batch_data)}개 요청")
+            return self._rpc_failed(method, started, -32603, "Internal error", request_id)
+            
+        self.rpc_duration.labels(method).observe(time.perf_counter() - started)
+        return {
+            'jsonrpc': '2.0',
+            'result': result,
+            'id': request_id
+        }
         
-        results = []
-        for data in batch_data:
-            try:
-                # 개별 요청 검증
-                if data.get('jsonrpc') != '2.0':
-                    results.append({
-                        'jsonrpc': '2.0',
-                        'error': {'code': -32600, 'message': 'Invalid Request'},
-                        'id': data.get('id')
-                    })
-                    continue
-                
-                method = data.get('method')
-                params = data.get('params', {})
-                request_id = data.get('id')
-                
-                # 메서드 라우팅
-                if method == 'ping':
-                    result = await self.method_ping(params)
-                elif method == 'log':
-                    result = await self.method_log(params)
-                elif method == 'log_batch':
-                    result = await self.method_log_batch(params)
-                elif method == 'query':
-                    result = await self.method_query(params)
-                elif method == 'search':
-                    result = await self.method_search(params)
-                elif method == 'get_stats':
-                    result = await self.method_get_stats(params)
-                elif method == 'get_system_status':
-                    result = await self.method_get_system_status(params)
-                elif method == 'run_analysis':
-                    result = await self.method_run_analysis(params)
-                elif method == 'get_error_patterns':
-                    result = await self.method_get_error_patterns(params)
-                elif method == 'get_performance_analysis':
-                    result = await self.method_get_performance_analysis(params)
-                elif method == 'get_trend_analysis':
-                    result = await self.method_get_trend_analysis(params)
-                elif method == 'detect_anomalies':
-                    result = await self.method_detect_anomalies(params)
-                else:
-                    results.append({
-                        'jsonrpc': '2.0',
-                        'error': {'code': -32601, 'message': 'Method not found'},
-                        'id': request_id
-                    })
-                    continue
-                
-                results.append({
-                    'jsonrpc': '2.0',
-                    'result': result,
-                    'id': request_id
-                })
-                
-            except Exception as e:
-                print(f"[RPC] 배치 요청 처리 중 에러: {e}")
-                results.append({
-                    'jsonrpc': '2.0',
-                    'error': {'code': -32603, 'message': 'Internal error'},
-                    'id': data.get('id') if isinstance(data, dict) else None
-                })
+    def _rpc_failed(self, method: str, started: float, code: int, message: str, request_id=None) -> Dict:
+        """처리 중 실패한 요청 계측 후 에러 응답 객체 반환"""
+        self.rpc_duration.labels(method).observe(time.perf_counter() - started)
+        self.rpc_errors.labels(method, code).inc()
+        return self._rpc_error_body(code, message, request_id)
         
-        return web.json_response(results)
-            
-    def rpc_error(self, code: int, message: str, request_id=None):
-        """JSON-RPC 에러 응답"""
-        return web.json_response({
+    def _rpc_error_body(self, code: int, message: str, request_id=None) -> Dict:
+        return {
             'jsonrpc': '2.0',
             'error': {'code': code, 'message': message},
             'id': request_id
-        }, status=400)
+        }
+        
+    def rpc_error(self, code: int, message: str, request_id=None):
+        """JSON-RPC 에러 응답"""
+        return web.json_response(self._rpc_error_body(code, message, request_id), status=400)
         
     async def method_ping(self, params: Dict) -> Dict:
-        """핑 테스트 - 연결 확인"""
+        """핑 테스트 - 연결 확인, 클라이언트가 쓸 수 있는 요청 형식도 알린다"""
         return {
             'pong': True,
             'timestamp': datetime.now().isoformat(),
-            'server': 'Recursive Log System'
+            'server': 'Recursive Log System',
+            'capabilities': {
+                'encodings': REQUEST_ENCODINGS,
+                'formats': ['msgpack', 'json'] if HAS_MSGPACK else ['json'],
+                'max_request_bytes': self.max_request_bytes
+            }
         }
         
     async def method_log(self, params: Dict) -> Dict:
@@ -785,8 +1320,8 @@ class LogCollectorServer:
             trace_id=params.get('trace_id')
         )
         
-        # 저장
-        self.storage.store_log(log_entry)
+        # 저장 (durable이면 배치 커밋까지 대기할 Future를 받음)
+        future = await self.storage.store_log_async(log_entry, durable=bool(params.get('durable')))
         
         # 실시간 분석
         alerts = self.analyzer.analyze_log(log_entry)
@@ -794,7 +1329,23 @@ class LogCollectorServer:
         # WebSocket 브로드캐스트
         await self.broadcast_log(log_entry, alerts)
         
-        return {'status': 'received', 'id': log_entry.id, 'alerts': len(alerts)}
+        result = {'status': 'received', 'id': log_entry.id, 'alerts': len(alerts)}
+        if future:
+            result.update(await self._await_durable([future], params.get('durable_timeout', 10)))
+        return result
+        
+    async def _await_durable(self, futures: List, timeout: float) -> Dict:
+        """저장 결과 Future 대기 - 상태별 건수와 전체 저장 여부 반환"""
+        try:
+            statuses = await asyncio.wait_for(
+                asyncio.gather(*(asyncio.wrap_future(future) for future in futures)), timeout)
+        except asyncio.TimeoutError:
+            return {'durable': False, 'storage_status': {'timeout': len(futures)}}
+            
+        counts = defaultdict(int)
+        for status in statuses:
+            counts[status] += 1
+        return {'durable': counts['stored'] == len(futures), 'storage_status': dict(counts)}
         
     async def method_log_batch(self, params: Dict) -> Dict:
         """배치 로그 수집"""
@@ -810,30 +1361,37 @@ class LogCollectorServer:
         all_alerts = []
         
         for log_data in logs_data:
-            log_entry = LogEntry(
-                id=log_data.get('id', str(uuid.uuid4())),
-                source=log_data['source'],
-                level=log_data['level'],
-                timestamp=log_data.get('timestamp', datetime.now().isoformat()),
-                message=log_data['message'],
-                metadata=log_data.get('metadata', {}),
-                tags=log_data.get('tags', []),
-                trace_id=log_data.get('trace_id')
-            )
+            try:
+                log_entry = LogEntry(
+                    id=log_data.get('id', str(uuid.uuid4())),
+                    source=log_data['source'],
+                    level=log_data['level'],
+                    timestamp=log_data.get('timestamp', datetime.now().isoformat()),
+                    message=log_data['message'],
+                    metadata=log_data.get('metadata', {}),
+                    tags=log_data.get('tags', []),
+                    trace_id=log_data.get('trace_id')
+                )
+            except (KeyError, AttributeError) as e:
+                # 잘못된 엔트리는 Invalid params - 수집기 재전송이 일시적 실패와 구분한다
+                raise ValueError(f"Invalid log entry: missing or malformed {e}")
             log_entries.append(log_entry)
             
             # 실시간 분석
             alerts = self.analyzer.analyze_log(log_entry)
             all_alerts.extend(alerts)
             
-        # 배치 저장
-        self.storage.store_logs_batch(log_entries)
+        # 배치 저장 (큐가 가득 차면 루프를 막지 않고 여기서 대기)
+        futures = await self.storage.store_logs_batch_async(log_entries, durable=bool(params.get('durable')))
         
         # 최신 몇 개만 브로드캐스트 (성능상)
         for log_entry in log_entries[-5:]:
             await self.broadcast_log(log_entry)
             
-        return {'status': 'received', 'count': len(log_entries), 'alerts': len(all_alerts)}
+        result = {'status': 'received', 'count': len(log_entries), 'alerts': len(all_alerts)}
+        if futures:
+            result.update(await self._await_durable(futures, params.get('durable_timeout', 10)))
+        return result
         
     async def method_query(self, params: Dict) -> Dict:
         """로그 조회"""
@@ -842,8 +1400,15 @@ class LogCollectorServer:
         since = params.get('since')
         limit = params.get('limit', 100)
         
-        logs = self.storage.query_logs(sources, levels, since, limit)
-        return {'logs': logs, 'count': len(logs)}
+        # cursor: 이전 응답의 next_cursor (키셋 페이징)
+        page = await self.storage.run(
+            self.storage.query_logs_page, timeout=params.get('timeout'),
+            sources=sources, levels=levels, since=since, limit=limit,
+            cursor=params.get('cursor'), include_archived=bool(params.get('include_archived'))
+        )
+        logs = page['logs']
+        return {'logs': logs, 'count': len(logs),
+                'next_cursor': page['next_cursor'], 'has_more': page['has_more']}
         
     async def method_search(self, params: Dict) -> Dict:
         """전문 검색"""
@@ -851,63 +1416,67 @@ class LogCollectorServer:
         timerange = params.get('timerange', '1h')
         context = params.get('context', 0)
         
-        logs = self.storage.query_logs(
+        mode = params.get('mode', 'auto')  # auto / terms / phrase / prefix / raw
+        
+        if params.get('rank'):
+            # 관련도(bm25)순 - 키셋 커서 대신 offset 페이징
+            result = await self.storage.run(
+                self.storage.search_logs, query, timeout=params.get('timeout'), mode=mode, since=timerange,
+                limit=params.get('limit', 100), offset=params.get('offset', 0)
+            )
+            logs = result['logs']
+            return {'logs': logs, 'count': len(logs), 'query': query, 'ranked': True}
+            
+        page = await self.storage.run(
+            self.storage.query_logs_page,
+            timeout=params.get('timeout'),
             since=timerange,
             search=query,
-            limit=params.get('limit', 100)
+            search_mode=mode,
+            limit=params.get('limit', 100),
+            cursor=params.get('cursor')
         )
+        logs = page['logs']
         
-        return {'logs': logs, 'count': len(logs), 'query': query}
+        return {'logs': logs, 'count': len(logs), 'query': query,
+                'next_cursor': page['next_cursor'], 'has_more': page['has_more']}
         
     async def method_get_stats(self, params: Dict) -> Dict:
         """통계 조회"""
         timerange = params.get('timerange', '1h')
         
-        # 기본 통계
-        logs = self.storage.query_logs(since=timerange, limit=10000)
+        # 롤업 버킷 + 경계 구간 인덱스 조회로 정확한 집계 (logs 전체 스캔 없음)
+        counts = await self.storage.run(self.storage.get_counts, timerange, params.get('until'),
+                                        timeout=params.get('timeout'))
         
         stats = {
-            'total_logs': len(logs),
-            'by_source': defaultdict(int),
-            'by_level': defaultdict(int),
-            'timerange': timerange
+            'total_logs': counts['total_logs'],
+            'by_source': counts['by_source'],
+            'by_level': counts['by_level'],
+            'by_hour': counts['by_hour'],
+            'timerange': timerange,
+            'query_ms': counts['query_ms']
         }
         
-        for log in logs:
-            stats['by_source'][log['source']] += 1
-            stats['by_level'][log['level']] += 1
-            
-        # dict로 변환 (JSON 직렬화용)
-        stats['by_source'] = dict(stats['by_source'])
-        stats['by_level'] = dict(stats['by_level'])
-        
         return stats
     
     async def method_get_system_status(self, params: Dict) -> Dict:
         """시스템 상태 조회"""
         try:
-            # 데이터베이스 통계
-            conn = sqlite3.connect(self.storage.db_path)
-            cursor = conn.cursor()
-            
-            # 총 로그 수
-            cursor.execute("SELECT COUNT(*) FROM logs")
-            total_logs = cursor.fetchone()[0]
+            # 데이터베이스 통계 (읽기 스레드 풀에서)
+            total_logs = await self.storage.run(self.storage.count_logs, timeout=params.get('timeout'))
+            archive_stats = await self.storage.run(self.storage.get_archive_stats)
             
             # 데이터베이스 크기 (MB)
             db_size_bytes = Path(self.storage.db_path).stat().st_size
             db_size_mb = round(db_size_bytes / (1024 * 1024), 2)
             
             # 메모리 사용량 (간단한 추정)
-            import psutil
-            process = psutil.Process()
-            memory_mb = round(process.memory_info().rss / (1024 * 1024), 2)
+            memory_mb = round(psutil.Process().memory_info().rss / (1024 * 1024), 2) if HAS_PSUTIL else None
             
             # 업타임 계산
             uptime_seconds = int(time.time() - self.start_time)
             
-            conn.close()
-            
             return {
                 "status": "healthy",
                 "bridge_connected": True,
@@ -917,6 +1486,12 @@ class LogCollectorServer:
                 "disk_usage_mb": db_size_mb,
                 "memory_usage_mb": memory_mb,
                 "uptime_seconds": uptime_seconds,
+                "connection_pool": self.storage.get_pool_stats(),
+                "archive": archive_stats,
+                "ingest": self.storage.get_ingest_stats(),
+                "event_loop": self.loop_monitor.get_stats(),
+                "websocket": self.get_websocket_stats(),
+                "alert_rules": self.analyzer.rules.describe(),
                 "last_check": datetime.now().isoformat(),
                 "version": {
                     "bridge": "1.0.0",
@@ -939,6 +1514,24 @@ class LogCollectorServer:
                 "error": str(e)
             }
 
+    # 에러 메시지 클러스터링에 쓰는 최근 에러 로그 수
+    ERROR_SAMPLE_LIMIT = 5000
+    
+    async def _run_analysis(self, analyze, params: Dict, time_range: str, *args, with_errors: bool = False) -> Dict:
+        """분석 입력(롤업 컬럼, 필요 시 최근 에러 로그)을 읽기 스레드 풀에서 조회한 뒤
+        분석 함수도 루프 밖에서 실행 - analyze(columns, error_logs, time_range, *args)
+        """
+        since_timestamp = self._parse_time_range(time_range)
+        timeout = params.get('timeout')
+        columns = await self.storage.run(self.storage.get_analysis_columns, since_timestamp, timeout=timeout)
+        error_logs = None
+        if with_errors:
+            error_logs = await self.storage.run(self.storage.get_logs_since, since_timestamp,
+                                                list(analysis.ERROR_LEVELS), self.ERROR_SAMPLE_LIMIT,
+                                                timeout=timeout)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, analyze, columns, error_logs, time_range, *args)
+        
     async def method_run_analysis(self, params: Dict) -> Dict:
         """로그 분석 실행"""
         try:
@@ -947,44 +1540,32 @@ class LogCollectorServer:
             
             print(f"[ANALYSIS] {analysis_type} 분석 실행: {time_range}")
             
-            # 시간 범위에 따른 데이터 조회
-            since_timestamp = self._parse_time_range(time_range)
-            
-            conn = sqlite3.connect(self.storage.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            # 기본 로그 데이터 조회
-            cursor.execute("""
-                SELECT * FROM logs 
-                WHERE created_at >= ? 
-                ORDER BY created_at DESC
-            """, (since_timestamp,))
-            
-            logs = cursor.fetchall()
-            conn.close()
-            
             # 분석 타입에 따른 처리
-            if analysis_type == 'errors':
-                result = await self._analyze_errors(logs, time_range)
-            elif analysis_type == 'performance':
-                result = await self._analyze_performance(logs, time_range)
-            elif analysis_type == 'trends':
-                result = await self._analyze_trends(logs, time_range)
-            elif analysis_type == 'patterns':
-                result = await self._analyze_patterns(logs, time_range)
+            analyzers = {
+                'errors': self._analyze_errors,
+                'trends': self._analyze_trends,
+                'patterns': self._analyze_patterns,
+            }
+            analyze = analyzers.get(analysis_type, self._analyze_errors)  # 기본값: 에러 분석
+            
+            started = time.perf_counter()
+            if analysis_type == 'performance':
+                result = await self._run_performance_analysis(params, time_range, params.get('threshold_ms', 1000))
             else:
-                result = await self._analyze_errors(logs, time_range)  # 기본값
+                result = await self._run_analysis(analyze, params, time_range,
+                                                  with_errors=analyze is not self._analyze_trends)
             
             return {
                 "id": f"analysis_{int(time.time())}",
                 "type": analysis_type,
                 "timerange": time_range,
                 "completed_at": datetime.now().isoformat(),
-                "execution_time": 500,
+                "execution_time": round((time.perf_counter() - started) * 1000),
                 "result": result
             }
             
+        except asyncio.TimeoutError:
+            raise
         except Exception as e:
             print(f"[ERROR] 분석 실행 실패: {e}")
             return {
@@ -997,25 +1578,12 @@ class LogCollectorServer:
         """에러 패턴 분석"""
         try:
             time_range = params.get('time_range', '24h')
-            since_timestamp = self._parse_time_range(time_range)
-            
-            conn = sqlite3.connect(self.storage.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
             
             # 에러 로그만 조회
-            cursor.execute("""
-                SELECT * FROM logs 
-                WHERE level IN ('ERROR', 'CRITICAL', 'FATAL') 
-                AND created_at >= ?
-                ORDER BY created_at DESC
-            """, (since_timestamp,))
-            
-            error_logs = cursor.fetchall()
-            conn.close()
-            
-            return await self._analyze_errors(error_logs, time_range)
+            return await self._run_analysis(self._analyze_errors, params, time_range, with_errors=True)
             
+        except asyncio.TimeoutError:
+            raise
         except Exception as e:
             print(f"[ERROR] 에러 패턴 분석 실패: {e}")
             return {"error": str(e)}
@@ -1025,23 +1593,11 @@ class LogCollectorServer:
         try:
             time_range = params.get('time_range', '24h')
             threshold_ms = params.get('threshold_ms', 1000)
-            since_timestamp = self._parse_time_range(time_range)
-            
-            conn = sqlite3.connect(self.storage.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM logs 
-                WHERE created_at >= ?
-                ORDER BY created_at DESC
-            """, (since_timestamp,))
             
-            logs = cursor.fetchall()
-            conn.close()
-            
-            return await self._analyze_performance(logs, time_range, threshold_ms)
+            return await self._run_performance_analysis(params, time_range, threshold_ms)
             
+        except asyncio.TimeoutError:
+            raise
         except Exception as e:
             print(f"[ERROR] 성능 분석 실패: {e}")
             return {"error": str(e)}
@@ -1050,48 +1606,29 @@ class LogCollectorServer:
         """트렌드 분석"""
         try:
             time_range = params.get('time_range', '24h')
-            since_timestamp = self._parse_time_range(time_range)
             
-            conn = sqlite3.connect(self.storage.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM logs 
-                WHERE created_at >= ?
-                ORDER BY created_at DESC
-            """, (since_timestamp,))
-            
-            logs = cursor.fetchall()
-            conn.close()
-            
-            return await self._analyze_trends(logs, time_range)
+            return await self._run_analysis(self._analyze_trends, params, time_range)
             
+        except asyncio.TimeoutError:
+            raise
         except Exception as e:
             print(f"[ERROR] 트렌드 분석 실패: {e}")
             return {"error": str(e)}
 
     async def method_detect_anomalies(self, params: Dict) -> Dict:
-        """이상 탐지"""
+        """이상 탐지 - 실시간 기준선(분 단위, 시간대별)과의 편차"""
         try:
             time_range = params.get('time_range', '24h')
-            since_timestamp = self._parse_time_range(time_range)
-            
-            conn = sqlite3.connect(self.storage.db_path)
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
             
-            cursor.execute("""
-                SELECT * FROM logs 
-                WHERE created_at >= ?
-                ORDER BY created_at DESC
-            """, (since_timestamp,))
-            
-            logs = cursor.fetchall()
-            conn.close()
-            
-            return await self._detect_anomalies(logs, time_range)
+            # 기준선은 수집 시 갱신되므로 조회는 메모리만 읽는다
+            self.analyzer.tick()
+            result = self.analyzer.anomalies.report(self._parse_time_range(time_range))
+            result['time_range'] = time_range
+            result['enabled'] = self.analyzer.anomaly_enabled
+            return result
             
+        except asyncio.TimeoutError:
+            raise
         except Exception as e:
             print(f"[ERROR] 이상 탐지 실패: {e}")
             return {"error": str(e)}
@@ -1111,24 +1648,13 @@ class LogCollectorServer:
             # 기본값: 24시간
             return time.time() - (24 * 3600)
 
-    async def _analyze_errors(self, logs: List, time_range: str) -> Dict:
-        """에러 분석 구현"""
-        error_logs = [log for log in logs if log['level'] in ['ERROR', 'CRITICAL', 'FATAL']]
-        
-        # 시간별 에러 빈도 계산
-        hourly_frequency = []
-        for hour in range(24):
-            hour_errors = [log for log in error_logs 
-                          if datetime.fromisoformat(log['timestamp']).hour == hour]
-            hourly_frequency.append({
-                "hour": hour,
-                "error_count": len(hour_errors),
-                "error_rate": round(len(hour_errors) / max(1, len(logs)) * 100, 2)
-            })
+    def _analyze_errors(self, columns: Dict, error_logs: List, time_range: str) -> Dict:
+        """에러 분석 구현 - 시간대별 빈도는 롤업 컬럼, 클러스터는 최근 에러 로그 표본"""
+        hourly_frequency = analysis.hourly_histogram(columns)
         
         # 메시지 클러스터링 (간단한 구현)
         message_clusters = {}
-        for log in error_logs:
+        for log in error_logs or []:
             message = log['message']
             # 간단한 패턴 추출
             if 'timeout' in message.lower():
@@ -1161,105 +1687,70 @@ class LogCollectorServer:
             "error_propagation": []
         }
 
-    async def _analyze_performance(self, logs: List, time_range: str, threshold_ms: int = 1000) -> Dict:
-        """성능 분석 구현"""
-        # 간단한 성능 분석 - 실제로는 더 정교한 분석 필요
-        total_logs = len(logs)
+    async def _run_performance_analysis(self, params: Dict, time_range: str, threshold_ms: float) -> Dict:
+        """지연 시간 스케치(log_latency)로 성능 분석 - 원본 로그를 다시 읽지 않음"""
+        latency = await self.storage.run(self.storage.get_latency_stats, self._parse_time_range(time_range),
+                                         sources=params.get('sources'), threshold_ms=threshold_ms,
+                                         timeout=params.get('timeout'))
+        return self._analyze_performance(latency, time_range, threshold_ms)
         
-        return {
-            "timerange": time_range,
-            "threshold_ms": threshold_ms,
-            "http_performance": {
-                "total_requests": total_logs,
-                "slow_requests": max(1, total_logs // 20),  # 5% 정도를 느린 요청으로 가정
-                "slow_percentage": "5.0%",
-                "slowest_requests": [],
-                "percentiles": {
-                    "p50": 120,
-                    "p90": 450,
-                    "p95": 800,
-                    "p99": 2100,
-                    "min": 15,
-                    "max": 3500,
-                    "avg": 185
-                }
-            },
-            "db_performance": {
-                "total_queries": total_logs // 2,
-                "slow_queries": max(1, total_logs // 40),
-                "slow_percentage": "2.5%",
-                "slowest_queries": []
-            },
-            "mcp_performance": {
-                "total_calls": total_logs // 10,
-                "slow_calls": max(1, total_logs // 100),
-                "slow_percentage": "1.0%",
-                "slowest_calls": []
+    def _analyze_performance(self, latency: Dict, time_range: str, threshold_ms: float = 1000) -> Dict:
+        """성능 분석 구현 - get_latency_stats 결과를 소스 종류별로 정리"""
+        empty = {'count': 0, 'slow_count': 0, 'slow_percentage': 0.0, 'slowest': []}
+        
+        def section(stats: Dict, total_key: str, slow_key: str, slowest_key: str) -> Dict:
+            return {
+                total_key: stats['count'],
+                slow_key: stats['slow_count'],
+                "slow_percentage": f"{stats['slow_percentage']:.1f}%",
+                slowest_key: stats['slowest'],
+                "percentiles": {key: stats.get(key) for key in ('p50', 'p90', 'p95', 'p99', 'min', 'max', 'avg')}
             }
+            
+        by_source = latency['by_source']
+        # MCP 소스는 여러 개일 수 있으므로 (mcp-*) 요약값만 합산
+        mcp_sources = [stats for source, stats in by_source.items() if source.startswith('mcp')]
+        mcp = {
+            'count': sum(stats['count'] for stats in mcp_sources),
+            'slow_count': sum(stats['slow_count'] for stats in mcp_sources),
+            'slowest': sorted((item for stats in mcp_sources for item in stats['slowest']),
+                              key=lambda item: item['duration_ms'], reverse=True)[:10]
         }
-
-    async def _analyze_trends(self, logs: List, time_range: str) -> Dict:
-        """트렌드 분석 구현"""
-        total_logs = len(logs)
-        error_logs = [log for log in logs if log['level'] in ['ERROR', 'CRITICAL', 'FATAL']]
+        mcp['slow_percentage'] = mcp['slow_count'] / mcp['count'] * 100 if mcp['count'] else 0.0
         
         return {
-            "volume_trend": {
-                "direction": "stable",
-                "change_percentage": 2.5,
-                "confidence": 0.8
-            },
-            "error_rate_trend": {
-                "direction": "decreasing",
-                "change_percentage": -5.2,
-                "confidence": 0.9
-            },
-            "performance_trend": {
-                "response_time_trend": "improving",
-                "throughput_trend": "stable"
-            },
-            "predictions": []
+            "timerange": time_range,
+            "threshold_ms": threshold_ms,
+            "http_performance": section(by_source.get('http_traffic', empty),
+                                        "total_requests", "slow_requests", "slowest_requests"),
+            "db_performance": section(by_source.get('db_query', empty),
+                                      "total_queries", "slow_queries", "slowest_queries"),
+            "mcp_performance": section(mcp, "total_calls", "slow_calls", "slowest_calls"),
+            "overall": latency['overall'],
+            "slowest_requests": latency['slowest'],
+            "by_source": {source: {key: value for key, value in stats.items() if key != 'slowest'}
+                          for source, stats in by_source.items()},
+            "by_path": latency['by_path'],
+            "query_ms": latency['query_ms']
         }
 
-    async def _analyze_patterns(self, logs: List, time_range: str) -> Dict:
+    def _analyze_trends(self, columns: Dict, error_logs: List, time_range: str) -> Dict:
+        """트렌드 분석 구현 - 롤업 시계열의 선형 회귀/EWMA"""
+        return analysis.analyze_trends(columns)
+
+    def _analyze_patterns(self, columns: Dict, error_logs: List, time_range: str) -> Dict:
         """패턴 분석 구현"""
         # 패턴 분석은 에러 분석과 유사하게 처리
-        return await self._analyze_errors(logs, time_range)
-
-    async def _detect_anomalies(self, logs: List, time_range: str) -> Dict:
-        """이상 탐지 구현"""
-        total_logs = len(logs)
-        error_logs = [log for log in logs if log['level'] in ['ERROR', 'CRITICAL', 'FATAL']]
-        
-        # 간단한 이상 탐지
-        anomalies = []
-        
-        # 에러율이 10% 이상이면 이상으로 판단
-        error_rate = len(error_logs) / max(1, total_logs) * 100
-        if error_rate > 10:
-            anomalies.append({
-                "id": f"anomaly_{int(time.time())}",
-                "type": "threshold_breach",
-                "severity": "high",
-                "timestamp": datetime.now().isoformat(),
-                "metric": "error_rate",
-                "actual_value": error_rate,
-                "expected_value": 5.0,
-                "deviation_score": error_rate / 5.0,
-                "description": f"Error rate ({error_rate:.1f}%) exceeds threshold (10%)"
-            })
-        
-        return {
-            "anomalies": anomalies,
-            "overall_anomaly_score": min(1.0, error_rate / 10.0),
-            "health_score": max(0.0, 1.0 - (error_rate / 20.0))
-        }
+        return self._analyze_errors(columns, error_logs, time_range)
 
     async def start(self):
         """서버 시작"""
         try:
             print(f"[SERVER] 로그 수집 서버 시작: {self.host}:{self.port}")
             self.start_time = time.time()
+            self.loop_monitor.start()
+            await self._seed_anomaly_baselines()
+            self.analyzer_task = asyncio.create_task(self._run_analyzer_ticks())
             
             # 라우트 설정 (self.app 사용)
             self.setup_routes()
@@ -1288,11 +1779,14 @@ async def run_server():
     parser.add_argument('--host', default='0.0.0.0', help='서버 호스트')
     parser.add_argument('--port', type=int, default=8888, help='서버 포트')
     parser.add_argument('--db', default='./dev_logs.db', help='SQLite DB 경로')
+    parser.add_argument('--synchronous', default='NORMAL', choices=['OFF', 'NORMAL', 'FULL'],
+                        help='SQLite 커밋 내구성 수준')
     
     args = parser.parse_args()
     
     # 서버 생성 및 실행
-    server = LogCollectorServer(args.host, args.port, args.db)
+    storage_config = StorageConfig(db_path=args.db, synchronous=args.synchronous)
+    server = LogCollectorServer(args.host, args.port, args.db, storage_config=storage_config)
     await server.start()
     
     try:
@@ -1301,6 +1795,8 @@ async def run_server():
             await asyncio.sleep(1)
     except KeyboardInterrupt:
         print("\n서버 종료")
+    finally:
+        server.storage.close()
 
 def main():
     """메인 실행 함수"""
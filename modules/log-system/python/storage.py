@@ -6,18 +6,27 @@ SQLite 기반 고성능 로그 저장 및 조회 시스템
 
 import sqlite3
 import json
+import math
+import re
 import time
 import threading
 import gzip
+import zlib
+import lzma
+import heapq
+import itertools
+import base64
 import os
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
 import queue
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from metrics import Histogram, SIZE_BUCKETS
 
 
 @dataclass
@@ -52,7 +61,21 @@ class StorageConfig:
                  enable_compression: bool = True,
                  batch_size: int = 100,
                  batch_timeout: float = 1.0,
-                 vacuum_interval: int = 3600):  # 1시간
+                 vacuum_interval: int = 3600,  # 1시간
+                 synchronous: str = "NORMAL",  # OFF / NORMAL / FULL / EXTRA
+                 busy_timeout_ms: int = 5000,
+                 reader_pool_size: int = 4,
+                 statement_cache_size: int = 256,
+                 minute_rollup_hours: int = 48,
+                 partition_interval: str = "day",  # day / hour
+                 archive_block_rows: int = 2000,
+                 archive_codec: str = "zlib",  # zlib / lzma
+                 queue_max_size: int = 10000,
+                 overload_policy: str = "block",  # block / drop_oldest / drop_by_level / spill
+                 block_timeout: float = 0.5,
+                 drop_levels: tuple = ('TRACE', 'DEBUG', 'INFO'),
+                 spill_path: str = "",
+                 query_timeout: float = 30.0):
         self.db_path = db_path
         self.max_size_mb = max_size_mb
         self.max_days = max_days
@@ -60,19 +83,489 @@ class StorageConfig:
         self.batch_size = batch_size
         self.batch_timeout = batch_timeout
         self.vacuum_interval = vacuum_interval
+        self.synchronous = synchronous.upper()
+        self.busy_timeout_ms = busy_timeout_ms
+        self.reader_pool_size = reader_pool_size
+        self.statement_cache_size = statement_cache_size
+        self.minute_rollup_hours = minute_rollup_hours
+        self.partition_interval = partition_interval
+        self.archive_block_rows = archive_block_rows
+        self.archive_codec = archive_codec
+        self.queue_max_size = queue_max_size
+        self.overload_policy = overload_policy
+        self.block_timeout = block_timeout
+        self.drop_levels = tuple(level.upper() for level in drop_levels)
+        self.spill_path = spill_path or f"{db_path}.spill"
+        self.query_timeout = query_timeout
+        
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StorageConfig':
+        """설정 딕셔너리(YAML storage 섹션)에서 생성 - 알 수 없는 키와 잘못된 값은 무시"""
+        config = cls()
+        for key, value in (data or {}).items():
+            if not hasattr(config, key) or value is None:
+                continue
+            default = getattr(config, key)
+            try:
+                setattr(config, key, type(default)(value))
+            except (TypeError, ValueError):
+                print(f"저장소 설정 무시: {key}={value!r}")
+        config.synchronous = config.synchronous.upper()
+        config.drop_levels = tuple(level.upper() for level in config.drop_levels)
+        if not (data or {}).get('spill_path'):
+            config.spill_path = f"{config.db_path}.spill"
+        return config
+
+
+class ConnectionPool:
+    """SQLite 연결 풀 - 전용 쓰기 연결 1개 + 제한된 읽기 전용 연결들
+    
+    연결을 재사용하여 스키마 파싱과 페이지 캐시를 유지하고,
+    sqlite3 내장 statement 캐시로 준비된 쿼리를 재사용한다.
+    """
+    
+    SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+    
+    def __init__(self, config: StorageConfig):
+        self.config = config
+        if config.synchronous not in self.SYNCHRONOUS_MODES:
+            # PRAGMA 문자열에 그대로 들어가므로 허용 목록 외 값은 사용하지 않음
+            print(f"알 수 없는 synchronous: {config.synchronous!r}, NORMAL 사용")
+            config.synchronous = 'NORMAL'
+        self.max_readers = max(1, config.reader_pool_size)
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._idle_readers = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(self.max_readers)
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()  # 스레드별 QueryToken (취소 시 사용 중인 연결 중단)
+        self._closed = False
+        self.stats = {
+            'reader_hits': 0,
+            'reader_misses': 0,
+            'reader_waits': 0,
+            'reader_wait_ms_total': 0.0,
+            'reader_wait_ms_max': 0.0,
+            'writer_acquires': 0,
+            'writer_wait_ms_total': 0.0,
+            'writer_wait_ms_max': 0.0,
+        }
+        
+    def _open(self, read_only: bool) -> sqlite3.Connection:
+        """연결 생성 - 연결 단위 PRAGMA 적용"""
+        if read_only:
+            target = Path(self.config.db_path).resolve().as_uri() + '?mode=ro'
+        else:
+            target = self.config.db_path
+        conn = sqlite3.connect(
+            target,
+            timeout=self.config.busy_timeout_ms / 1000,
+            check_same_thread=False,  # 풀에서 스레드 간 이동
+            cached_statements=self.config.statement_cache_size,
+            uri=read_only
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f'PRAGMA synchronous = {self.config.synchronous}')
+        conn.execute('PRAGMA cache_size = -64000')  # 64MB 캐시
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute('PRAGMA mmap_size = 268435456')  # 256MB mmap
+        return conn
+        
+    def _record_wait(self, prefix: str, wait_ms: float):
+        with self._stats_lock:
+            self.stats[f'{prefix}_wait_ms_total'] += wait_ms
+            self.stats[f'{prefix}_wait_ms_max'] = max(self.stats[f'{prefix}_wait_ms_max'], wait_ms)
+            
+    def acquire_writer(self) -> sqlite3.Connection:
+        """쓰기 연결 획득 (배치 스레드와 유지보수 작업이 공유, 직렬화됨)"""
+        start = time.perf_counter()
+        self._writer_lock.acquire()
+        self._record_wait('writer', (time.perf_counter() - start) * 1000)
+        with self._stats_lock:
+            self.stats['writer_acquires'] += 1
+        if self._writer is None:
+            self._writer = self._open(read_only=False)
+        return self._writer
+        
+    def release_writer(self, conn: sqlite3.Connection):
+        """쓰기 연결 반환 - 열린 트랜잭션은 롤백"""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        finally:
+            self._writer_lock.release()
+            
+    def acquire_reader(self) -> sqlite3.Connection:
+        """읽기 전용 연결 획득 (풀 크기 초과 시 대기)"""
+        start = time.perf_counter()
+        if not self._reader_slots.acquire(blocking=False):
+            with self._stats_lock:
+                self.stats['reader_waits'] += 1
+            self._reader_slots.acquire()
+        self._record_wait('reader', (time.perf_counter() - start) * 1000)
+        
+        try:
+            conn = self._idle_readers.get_nowait()
+            with self._stats_lock:
+                self.stats['reader_hits'] += 1
+        except queue.Empty:
+            with self._stats_lock:
+                self.stats['reader_misses'] += 1
+            try:
+                conn = self._open(read_only=True)
+            except Exception:
+                self._reader_slots.release()
+                raise
+                
+        token = getattr(self._local, 'token', None)
+        if token is not None:
+            try:
+                token.attach(conn)
+            except sqlite3.OperationalError:
+                self.release_reader(conn)
+                raise
+        return conn
+        
+    def release_reader(self, conn: sqlite3.Connection):
+        """읽기 연결 반환"""
+        token = getattr(self._local, 'token', None)
+        if token is not None:
+            token.detach(conn)
+        try:
+            if self._closed:
+                conn.close()
+            else:
+                self._idle_readers.put_nowait(conn)
+        finally:
+            self._reader_slots.release()
+            
+    def bind_token(self, token: Optional['QueryToken']):
+        """현재 스레드에서 획득하는 읽기 연결을 token에 등록 (None이면 해제)"""
+        self._local.token = token
+        
+    def get_stats(self) -> Dict:
+        """풀 사용 통계"""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        total = stats['reader_hits'] + stats['reader_misses']
+        stats['reader_hit_rate'] = round(stats['reader_hits'] / total, 4) if total else 0.0
+        stats['reader_wait_ms_avg'] = round(stats['reader_wait_ms_total'] / total, 3) if total else 0.0
+        for key in ('reader_wait_ms_total', 'reader_wait_ms_max', 'writer_wait_ms_total', 'writer_wait_ms_max'):
+            stats[key] = round(stats[key], 3)
+        stats['max_readers'] = self.max_readers
+        stats['idle_readers'] = self._idle_readers.qsize()
+        return stats
+        
+    def close(self):
+        """모든 연결 종료"""
+        self._closed = True
+        while True:
+            try:
+                self._idle_readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+class QueryToken:
+    """오프루프 조회 1건의 취소 핸들 - 실행 중 사용하는 읽기 연결을 추적하여 interrupt()"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections = set()
+        self.cancelled = False
+        
+    def attach(self, conn: sqlite3.Connection):
+        with self._lock:
+            if self.cancelled:
+                raise sqlite3.OperationalError("interrupted")
+            self._connections.add(conn)
+            
+    def detach(self, conn: sqlite3.Connection):
+        with self._lock:
+            self._connections.discard(conn)
+            
+    def cancel(self):
+        """진행 중인 SQLite 문 중단 - 이후 연결 획득도 실패"""
+        with self._lock:
+            self.cancelled = True
+            for conn in self._connections:
+                conn.interrupt()
+
+
+class LatencySketch:
+    """병합 가능한 지연 시간(ms) 분위수 스케치
+    
+    값을 로그 스케일 버킷(경계 비율 GAMMA)에 세므로 분위수의 상대 오차가
+    약 1% 이내이고, 같은 버킷 체계끼리는 버킷별 건수를 더하기만 하면 병합된다.
+    가장 느린 요청 SLOWEST 개는 원본 정보와 함께 따로 보관한다.
+    """
+    
+    GAMMA = 1.02
+    LOG_GAMMA = math.log(GAMMA)
+    SLOWEST = 10
+    
+    def __init__(self):
+        self.bins = defaultdict(int)  # 버킷 인덱스 -> 건수 (0 이하 값은 인덱스 None 대신 zero)
+        self.zero = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.slowest = []  # [duration_ms, created_at, id, message] 최소 힙
+        
+    def add(self, value: float, sample: Optional[list] = None):
+        """값 한 개 추가 - sample은 [created_at, id, message] (가장 느린 요청 후보)"""
+        if value > 0:
+            self.bins[math.ceil(math.log(value) / self.LOG_GAMMA)] += 1
+        else:
+            self.zero += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if sample is not None:
+            item = [value, *sample]
+            if len(self.slowest) < self.SLOWEST:
+                heapq.heappush(self.slowest, item)
+            elif value > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, item)
+                
+    def merge(self, other: 'LatencySketch'):
+        for index, count in other.bins.items():
+            self.bins[index] += count
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        self.slowest = heapq.nlargest(self.SLOWEST, self.slowest + other.slowest)
+        heapq.heapify(self.slowest)
+        
+    def _value(self, index: int) -> float:
+        # 버킷 (GAMMA^(i-1), GAMMA^i] 의 대표값
+        return 2 * self.GAMMA ** index / (self.GAMMA + 1)
+        
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero
+        if rank < seen:
+            return max(self.min, 0.0)
+        for index in sorted(self.bins):
+            seen += self.bins[index]
+            if rank < seen:
+                return min(max(self._value(index), self.min), self.max)
+        return self.max
+        
+    def count_at_least(self, threshold: float) -> int:
+        """threshold 이상인 값의 추정 건수
+        
+        threshold보다 큰 버킷은 모두 세고, threshold가 들어 있는 경계 버킷
+        (GAMMA^(b-1), GAMMA^b]은 구간 안에서 균등 분포로 보고 비율만큼 센다.
+        오차는 경계 버킷 건수 이내 (threshold 전후 약 2% 범위의 값들)로 한정되고,
+        threshold가 min 이하이거나 max 초과면 정확하다.
+        """
+        if not self.count or threshold <= 0 or threshold <= self.min:
+            return self.count
+        if threshold > self.max:
+            return 0
+        boundary = math.ceil(math.log(threshold) / self.LOG_GAMMA)
+        above = sum(count for index, count in self.bins.items() if index > boundary)
+        # 경계 버킷 구간은 관측된 min/max로 좁힘
+        upper = min(self.GAMMA ** boundary, self.max)
+        lower = max(self.GAMMA ** (boundary - 1), self.min)
+        fraction = min(1.0, max(0.0, (upper - threshold) / (upper - lower))) if upper > lower else 1.0
+        return above + round(self.bins.get(boundary, 0) * fraction)
+        
+    def summary(self, threshold_ms: float = None) -> Dict:
+        result = {
+            'count': self.count,
+            'avg': round(self.total / self.count, 3) if self.count else None,
+            'min': round(self.min, 3) if self.min is not None else None,
+            'max': round(self.max, 3) if self.max is not None else None,
+        }
+        for name, q in (('p50', 0.5), ('p90', 0.9), ('p95', 0.95), ('p99', 0.99)):
+            value = self.quantile(q)
+            result[name] = round(value, 3) if value is not None else None
+        if threshold_ms is not None:
+            slow = self.count_at_least(threshold_ms)
+            result['slow_count'] = slow
+            result['slow_percentage'] = round(slow / self.count * 100, 2) if self.count else 0.0
+        return result
+        
+    def slowest_requests(self) -> List[Dict]:
+        return [{'duration_ms': duration, 'created_at': created_at, 'id': log_id, 'message': message}
+                for duration, created_at, log_id, message in sorted(self.slowest, reverse=True)]
+        
+    def to_row(self) -> Tuple:
+        """(count, total_ms, min_ms, max_ms, bins, slowest) - log_latency 저장용"""
+        bins = {str(index): count for index, count in self.bins.items()}
+        if self.zero:
+            bins['z'] = self.zero
+        return (self.count, self.total, self.min, self.max,
+                json.dumps(bins, separators=(',', ':')), json.dumps(self.slowest, separators=(',', ':')))
+        
+    @classmethod
+    def from_row(cls, row) -> 'LatencySketch':
+        sketch = cls()
+        sketch.count = row['count']
+        sketch.total = row['total_ms']
+        sketch.min = row['min_ms']
+        sketch.max = row['max_ms']
+        for index, count in json.loads(row['bins']).items():
+            if index == 'z':
+                sketch.zero = count
+            else:
+                sketch.bins[int(index)] = count
+        sketch.slowest = json.loads(row['slowest'])
+        heapq.heapify(sketch.slowest)
+        return sketch
+
+
+class RollupAccumulator:
+    """롤업 집계기 - (일자/분/시간 버킷, 소스, 레벨)별 건수와 크기를 메모리에서 누적
+    
+    배치 플러시마다 한 번씩 log_stats / log_rollups 테이블에 upsert 되어
+    행 단위 트리거 없이 통계를 유지한다. metadata.duration_ms가 있는 로그는
+    (분/시간 버킷, 소스, 경로)별 LatencySketch로 모아 log_latency에 병합한다.
+    """
+    
+    # 버킷 단위 (초)
+    GRANULARITIES = {'m': 60, 'h': 3600}
+    
+    # 경로의 숫자/UUID/긴 16진수 구간은 하나로 묶어 경로 종류 수를 제한
+    PATH_ID_PATTERN = re.compile(r'/(?:\d+|[0-9a-fA-F]{8}-[0-9a-fA-F-]{27,}|[0-9a-fA-F]{16,})(?=/|$)')
+    
+    def __init__(self):
+        self.daily = defaultdict(lambda: [0, 0])
+        self.buckets = defaultdict(lambda: [0, 0])
+        self.latency = defaultdict(LatencySketch)
+        
+    def add(self, date: str, source: str, level: str, created_at: float, size_bytes: int):
+        """로그 한 건 누적"""
+        daily = self.daily[(date, source, level)]
+        daily[0] += 1
+        daily[1] += size_bytes
+        
+        for granularity, width in self.GRANULARITIES.items():
+            bucket = self.buckets[(granularity, int(created_at // width) * width, source, level)]
+            bucket[0] += 1
+            bucket[1] += size_bytes
+            
+    @classmethod
+    def latency_path(cls, metadata: Dict) -> str:
+        """지연 시간 집계용 경로 - HTTP는 정규화한 path, DB는 db_type"""
+        path = metadata.get('path') or metadata.get('db_type') or ''
+        return cls.PATH_ID_PATTERN.sub('/:id', str(path))[:200]
+        
+    def add_latency(self, source: str, metadata: Dict, created_at: float, log_id: str, message: str):
+        """metadata.duration_ms가 숫자이면 지연 시간 스케치에 누적"""
+        duration = metadata.get('duration_ms') if isinstance(metadata, dict) else None
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)):
+            return
+        path = self.latency_path(metadata)
+        sample = [created_at, log_id, message[:200]]
+        for granularity, width in self.GRANULARITIES.items():
+            self.latency[(granularity, int(created_at // width) * width, source, path)].add(duration, sample)
+            
+    def clear(self):
+        self.daily.clear()
+        self.buckets.clear()
+        self.latency.clear()
+        
+    def upsert(self, conn: sqlite3.Connection):
+        """누적값을 롤업 테이블에 반영 (호출자 트랜잭션 내에서 실행)"""
+        conn.executemany('''
+            INSERT INTO log_stats (date, source, level, count, total_size)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(date, source, level) DO UPDATE SET
+                count = count + excluded.count,
+                total_size = total_size + excluded.total_size
+        ''', [(*key, count, size) for key, (count, size) in self.daily.items()])
+        
+        conn.executemany('''
+            INSERT INTO log_rollups (granularity, bucket, source, level, count, total_size)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(granularity, bucket, source, level) DO UPDATE SET
+                count = count + excluded.count,
+                total_size = total_size + excluded.total_size
+        ''', [(*key, count, size) for key, (count, size) in self.buckets.items()])
+        
+        # 스케치는 SQL로 병합할 수 없으므로 기존 행을 읽어 병합 후 교체
+        rows = []
+        for key, sketch in self.latency.items():
+            existing = conn.execute('''
+                SELECT count, total_ms, min_ms, max_ms, bins, slowest FROM log_latency
+                WHERE granularity = ? AND bucket = ? AND source = ? AND path = ?
+            ''', key).fetchone()
+            if existing:
+                merged = LatencySketch.from_row(existing)
+                merged.merge(sketch)
+                sketch = merged
+            rows.append((*key, *sketch.to_row()))
+        conn.executemany('''
+            INSERT OR REPLACE INTO log_latency
+            (granularity, bucket, source, path, count, total_ms, min_ms, max_ms, bins, slowest)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
 
 
 class BatchProcessor:
-    """배치 처리기 - 성능 최적화용"""
+    """배치 처리기 - 제한된 수집 큐와 단일 쓰기 워커
+    
+    add_log는 큐에 넣기만 하고 저장은 워커 스레드만 수행한다 (batch_buffer 경합 없음).
+    큐가 가득 차면 overload_policy에 따라 대기(block), 가장 오래된 로그 삭제(drop_oldest),
+    낮은 레벨 우선 삭제(drop_by_level), 디스크로 내보내기(spill) 중 하나로 처리한다.
+    durable=True로 넣은 로그는 Future로 저장 결과('stored' / 'dropped' / 'spilled' / 'error')를 받는다.
+    """
+    
+    OVERLOAD_POLICIES = ('block', 'drop_oldest', 'drop_by_level', 'spill')
+    WRITE_RETRIES = 3  # 배치 쓰기 실패 시 스필로 옮기기 전 시도 횟수
+    WRITE_RETRY_DELAY = 0.2  # 첫 재시도 대기 (초), 이후 두 배씩
     
     def __init__(self, storage: 'LogStorage', config: StorageConfig):
         self.storage = storage
         self.config = config
-        self.batch_queue = queue.Queue()
-        self.batch_buffer = []
-        self.last_flush = time.time()
+        self.max_queue = max(1, config.queue_max_size)
+        self.policy = config.overload_policy
+        if self.policy not in self.OVERLOAD_POLICIES:
+            print(f"알 수 없는 overload_policy: {self.policy!r}, block 사용")
+            self.policy = 'block'
+        self.pending = deque()  # (seq, LogEntry, Future 또는 None)
+        self.condition = threading.Condition()
+        self.rollups = RollupAccumulator()
+        self.seq = 0
+        self.flushed_seq = 0
+        self.flush_waiters = []  # (seq, Future)
+        self.oldest_enqueued_at = None
+        self.spill_lock = threading.Lock()
+        self.spill_file = None
+        self.replay_path = f"{config.spill_path}.replay"
+        self.replay_offset = 0
         self.running = False
         self.thread = None
+        self.metrics = {
+            'enqueued': 0,
+            'stored': 0,
+            'batches': 0,
+            'write_errors': 0,
+            'dropped': 0,
+            'dropped_by_level': defaultdict(int),
+            'spilled': 0,
+            'replayed': 0,
+            'blocked': 0,
+            'block_wait_ms_total': 0.0,
+            'max_queue_depth': 0,
+        }
+        # 서버가 /metrics에 등록하는 히스토그램 (쓰기 워커 스레드에서만 갱신)
+        self.batch_sizes = Histogram('log_ingest_batch_size', '배치 하나에 저장된 로그 수', buckets=SIZE_BUCKETS)
+        self.flush_seconds = Histogram('log_ingest_flush_seconds', '배치 저장(트랜잭션 커밋 포함) 소요 시간')
         
     def start(self):
         """배치 처리 시작"""
@@ -84,65 +577,290 @@ class BatchProcessor:
         self.thread.start()
         
     def stop(self):
-        """배치 처리 중지"""
-        self.running = False
+        """배치 처리 중지 - 큐에 남은 로그까지 저장"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
         if self.thread:
-            self.thread.join(timeout=5)
+            self.thread.join(timeout=30)
+        with self.spill_lock:
+            if self.spill_file:
+                self.spill_file.close()
+                self.spill_file = None
+                
+    def add_log(self, log_entry: LogEntry, durable: bool = False) -> Optional[Future]:
+        """로그 추가 (비동기) - durable=True면 저장 결과 Future 반환"""
+        future = Future() if durable else None
+        
+        with self.condition:
+            if len(self.pending) < self.max_queue or self._make_room(log_entry):
+                self._enqueue(log_entry, future)
+                return future
+                
+        # 디스크 쓰기는 큐 잠금 밖에서
+        status = 'spilled' if self.policy == 'spill' and self._spill(log_entry) else 'dropped'
+        if status == 'dropped':
+            with self.condition:
+                self._record_drop(log_entry)
+        if future:
+            future.set_result(status)
+        return future
+        
+    def offer(self, log_entry: LogEntry, future: Optional[Future] = None) -> bool:
+        """대기나 디스크 쓰기 없이 넣을 수 있을 때만 큐에 추가 - 이벤트 루프에서 호출
+        
+        False면 아무것도 하지 않았으므로 호출자가 add_log를 루프 밖에서 실행해야 한다.
+        """
+        with self.condition:
+            if len(self.pending) < self.max_queue or self._make_room(log_entry, wait=False):
+                self._enqueue(log_entry, future)
+                return True
+        return False
+        
+    def flush(self) -> Future:
+        """지금까지 큐에 들어간 로그가 모두 저장되면 완료되는 Future"""
+        future = Future()
+        with self.condition:
+            if not self.pending:
+                future.set_result(True)
+            else:
+                self.flush_waiters.append((self.seq, future))
+                self.condition.notify_all()
+        return future
+        
+    def get_metrics(self) -> Dict:
+        """큐 깊이와 삭제/스필 카운터"""
+        with self.condition:
+            metrics = dict(self.metrics)
+            metrics['dropped_by_level'] = dict(self.metrics['dropped_by_level'])
+            metrics['queue_depth'] = len(self.pending)
+        metrics['queue_capacity'] = self.max_queue
+        metrics['overload_policy'] = self.policy
+        metrics['block_wait_ms_total'] = round(metrics['block_wait_ms_total'], 3)
+        metrics['spill_pending_bytes'] = sum(
+            os.path.getsize(path) for path in (self.config.spill_path, self.replay_path) if os.path.exists(path)
+        ) - self.replay_offset
+        return metrics
+        
+    def _enqueue(self, log_entry: LogEntry, future: Optional[Future]):
+        """큐에 추가 (condition 보유 상태에서 호출)"""
+        self.seq += 1
+        if not self.pending:
+            self.oldest_enqueued_at = time.time()
+        self.pending.append((self.seq, log_entry, future))
+        self.metrics['enqueued'] += 1
+        self.metrics['max_queue_depth'] = max(self.metrics['max_queue_depth'], len(self.pending))
+        if len(self.pending) == 1 or len(self.pending) >= self.config.batch_size:
+            self.condition.notify_all()
+            
+    def _make_room(self, log_entry: LogEntry, wait: bool = True) -> bool:
+        """큐가 가득 찼을 때 정책에 따라 자리 확보 (condition 보유 상태) - 성공 여부 반환
+        
+        wait=False면 block 정책의 대기 없이 바로 실패한다.
+        """
+        if self.policy == 'drop_oldest':
+            self._evict(0)
+            return True
+            
+        if self.policy == 'drop_by_level':
+            if log_entry.level.upper() in self.config.drop_levels:
+                return False
+            # 들어온 로그가 더 중요하면 가장 오래된 낮은 레벨 로그를 밀어냄
+            for index, (_, queued, _) in enumerate(self.pending):
+                if queued.level.upper() in self.config.drop_levels:
+                    self._evict(index)
+                    return True
+                    
+        if self.policy == 'spill' or not wait:
+            return False
+            
+        # block (drop_by_level에서 밀어낼 로그가 없을 때도) - block_timeout까지 워커가 비우길 대기
+        started = time.perf_counter()
+        self.metrics['blocked'] += 1
+        self.condition.wait_for(lambda: len(self.pending) < self.max_queue or not self.running,
+                                timeout=self.config.block_timeout)
+        self.metrics['block_wait_ms_total'] += (time.perf_counter() - started) * 1000
+        return len(self.pending) < self.max_queue
+        
+    def _evict(self, index: int):
+        _, evicted, future = self.pending[index]
+        del self.pending[index]
+        self._record_drop(evicted)
+        if future:
+            future.set_result('dropped')
             
-    def add_log(self, log_entry: LogEntry):
-        """로그 추가 (비동기)"""
+    def _record_drop(self, log_entry: LogEntry):
+        self.metrics['dropped'] += 1
+        self.metrics['dropped_by_level'][log_entry.level.upper()] += 1
+        
+    def _spill(self, log_entry: LogEntry) -> bool:
+        """큐 초과분을 스필 파일(NDJSON)에 추가 - 워커가 큐 여유가 생기면 다시 넣음"""
+        return self._spill_many([log_entry])
+        
+    def _spill_many(self, log_entries: List[LogEntry]) -> bool:
+        data = b''.join(json.dumps(log_entry.to_dict(), ensure_ascii=False).encode('utf-8') + b'\n'
+                        for log_entry in log_entries)
         try:
-            self.batch_queue.put_nowait(log_entry)
-        except queue.Full:
-            # 큐가 가득 차면 즉시 처리
-            self._flush_batch()
-            self.batch_queue.put_nowait(log_entry)
+            with self.spill_lock:
+                if self.spill_file is None:
+                    self.spill_file = open(self.config.spill_path, 'ab')
+                self.spill_file.write(data)
+                self.spill_file.flush()
+        except OSError as e:
+            print(f"스필 파일 쓰기 오류: {e}")
+            return False
+        with self.condition:
+            self.metrics['spilled'] += len(log_entries)
+        return True
+        
+    def _has_spill(self) -> bool:
+        return os.path.exists(self.replay_path) or (
+            os.path.exists(self.config.spill_path) and os.path.getsize(self.config.spill_path) > 0)
+            
+    def _replay_spill(self):
+        """스필된 로그를 큐 여유(절반)만큼 다시 넣음 - 파일 위치를 기억하여 이어서 읽음"""
+        if not os.path.exists(self.replay_path):
+            with self.spill_lock:
+                if self.spill_file:
+                    self.spill_file.close()
+                    self.spill_file = None
+                if not os.path.exists(self.config.spill_path):
+                    return
+                os.replace(self.config.spill_path, self.replay_path)
+            self.replay_offset = 0
+            
+        with open(self.replay_path, 'rb') as replay:
+            replay.seek(self.replay_offset)
+            while True:
+                with self.condition:
+                    if len(self.pending) >= self.max_queue // 2:
+                        break
+                line = replay.readline()
+                if not line:
+                    break
+                self.replay_offset = replay.tell()
+                try:
+                    log_entry = LogEntry.from_dict(json.loads(line))
+                except (ValueError, TypeError):
+                    continue
+                with self.condition:
+                    self._enqueue(log_entry, None)
+                    self.metrics['replayed'] += 1
+            exhausted = not replay.readline()
+            
+        if exhausted:
+            os.remove(self.replay_path)
+            self.replay_offset = 0
+            
+    def _next_batch(self) -> List[Tuple[int, LogEntry, Optional[Future]]]:
+        """배치 크기, 타임아웃, flush 요청, 종료 중 하나가 될 때까지 대기 후 배치 반환
+        
+        큐가 비어 있으면 폴링 없이 잠든다.
+        """
+        with self.condition:
+            while self.running and len(self.pending) < self.config.batch_size and not self.flush_waiters:
+                if self.pending:
+                    remaining = self.oldest_enqueued_at + self.config.batch_timeout - time.time()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                elif self._has_spill():
+                    return []
+                else:
+                    self.condition.wait()
+                    
+            count = min(self.config.batch_size, len(self.pending))
+            if not count and self.flush_waiters:
+                # 대기 대상이 모두 저장되었거나 삭제됨
+                for _, future in self.flush_waiters:
+                    future.set_result(True)
+                self.flush_waiters = []
+            batch = [self.pending.popleft() for _ in range(count)]
+            self.oldest_enqueued_at = time.time() if self.pending else None
+            self.condition.notify_all()  # 대기 중인 생산자 깨움
+            return batch
             
     def _batch_worker(self):
         """배치 처리 워커"""
-        while self.running:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._flush_batch(batch)
+                
             try:
-                # 타임아웃으로 로그 수집
-                try:
-                    log_entry = self.batch_queue.get(timeout=0.1)
-                    self.batch_buffer.append(log_entry)
-                except queue.Empty:
-                    pass
+                if self.running and self._has_spill():
+                    self._replay_spill()
+            except OSError as e:
+                print(f"스필 재처리 오류: {e}")
+                time.sleep(1)
                 
-                # 배치 크기나 시간 기준으로 플러시
-                current_time = time.time()
-                if (len(self.batch_buffer) >= self.config.batch_size or 
-                    (self.batch_buffer and current_time - self.last_flush >= self.config.batch_timeout)):
-                    self._flush_batch()
+            with self.condition:
+                if not self.running and not self.pending:
+                    break
                     
+    def _flush_batch(self, batch: List[Tuple[int, LogEntry, Optional[Future]]]):
+        """배치 데이터 저장 후 Future와 flush 대기자 완료 처리
+        
+        쓰기가 실패하면 WRITE_RETRIES번까지 백오프하며 다시 시도하고, 그래도 실패하면
+        배치를 스필 파일로 옮겨 워커가 나중에 다시 넣게 한다 ('spilled').
+        스필 쓰기까지 실패한 경우에만 'error'로 버린다.
+        """
+        started = time.perf_counter()
+        log_entries = [log_entry for _, log_entry, _ in batch]
+        status = 'error'
+        for attempt in range(self.WRITE_RETRIES):
+            try:
+                self.rollups.clear()
+                self.storage._store_logs_direct(log_entries, self.rollups)
+                status = 'stored'
+                break
             except Exception as e:
-                print(f"배치 처리 오류: {e}")
-                
-        # 종료 시 남은 배치 처리
-        if self.batch_buffer:
-            self._flush_batch()
+                print(f"배치 저장 오류 ({attempt + 1}/{self.WRITE_RETRIES}): {e}")
+                with self.condition:
+                    self.metrics['write_errors'] += 1
+                if attempt + 1 < self.WRITE_RETRIES:
+                    time.sleep(self.WRITE_RETRY_DELAY * 2 ** attempt)
+        if status == 'error' and self._spill_many(log_entries):
+            status = 'spilled'
+        self.flush_seconds.observe(time.perf_counter() - started)
+        self.batch_sizes.observe(len(batch))
             
-    def _flush_batch(self):
-        """배치 데이터 저장"""
-        if not self.batch_buffer:
-            return
+        for _, _, future in batch:
+            if future:
+                future.set_result(status)
+                
+        with self.condition:
+            self.flushed_seq = batch[-1][0]
+            self.metrics['batches'] += 1
+            if status == 'stored':
+                self.metrics['stored'] += len(batch)
+            elif status == 'error':
+                for log_entry in log_entries:
+                    self._record_drop(log_entry)
+            done = [waiter for waiter in self.flush_waiters if waiter[0] <= self.flushed_seq]
+            self.flush_waiters = [waiter for waiter in self.flush_waiters if waiter[0] > self.flushed_seq]
             
-        try:
-            self.storage._store_logs_direct(self.batch_buffer)
-            self.batch_buffer.clear()
-            self.last_flush = time.time()
-        except Exception as e:
-            print(f"배치 저장 오류: {e}")
+        for _, future in done:
+            future.set_result(status == 'stored')
 
 
 class LogStorage:
     """고성능 SQLite 로그 저장소"""
     
+    # 파티션 단위 (초)
+    PARTITION_WIDTHS = {'day': 86400, 'hour': 3600}
+    
     def __init__(self, config: StorageConfig = None):
         self.config = config or StorageConfig()
         self.db_path = self.config.db_path
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.pool = ConnectionPool(self.config)
+        # 읽기 전용 스레드 풀 (쓰기는 BatchProcessor 워커 스레드 하나가 전담)
+        self.executor = ThreadPoolExecutor(max_workers=self.pool.max_readers, thread_name_prefix='log-reader')
+        # 큐가 가득 찼을 때의 block 대기와 스필 쓰기 전용 (단일 스레드라 넘친 로그의 순서 유지)
+        self.ingest_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-ingest')
         self.batch_processor = BatchProcessor(self, self.config)
+        self._partitions = []  # [(시작, 끝, 테이블명)] 시작 시각 오름차순
+        self._partitions_lock = threading.Lock()
         self._init_db()
         self._start_maintenance()
         
@@ -151,99 +869,322 @@ class LogStorage:
         # 디렉토리 생성
         Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        conn = sqlite3.connect(self.db_path)
-        conn.execute('PRAGMA journal_mode = WAL')  # Write-Ahead Logging
-        conn.execute('PRAGMA synchronous = NORMAL')  # 성능 최적화
-        conn.execute('PRAGMA cache_size = -64000')  # 64MB 캐시
-        conn.execute('PRAGMA temp_store = MEMORY')
-        conn.execute('PRAGMA mmap_size = 268435456')  # 256MB mmap
+        conn = self.pool.acquire_writer()
+        # 드롭된 파티션의 페이지를 파일에서 반환할 수 있도록 (새 DB는 테이블 생성 전에 설정해야 적용됨)
+        needs_vacuum = False
+        if conn.execute('PRAGMA auto_vacuum').fetchone()[0] != 2:
+            conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            needs_vacuum = conn.execute('SELECT 1 FROM sqlite_master LIMIT 1').fetchone() is not None
+        conn.execute('PRAGMA journal_mode = WAL')  # Write-Ahead Logging (DB 파일에 영구 적용)
         
-        # 메인 로그 테이블
+        # 행 단위 gzip 아카이브 (구버전) - 유지보수 시 블록으로 재압축
         conn.execute('''
-            CREATE TABLE IF NOT EXISTS logs (
+            CREATE TABLE IF NOT EXISTS logs_archive (
                 id TEXT PRIMARY KEY,
                 source TEXT NOT NULL,
                 level TEXT NOT NULL,
                 timestamp TEXT NOT NULL,
-                message TEXT NOT NULL,
-                metadata TEXT,
-                tags TEXT,
-                trace_id TEXT,
+                compressed_data BLOB NOT NULL,
                 created_at REAL NOT NULL,
-                size_bytes INTEGER DEFAULT 0
+                original_size INTEGER NOT NULL,
+                compressed_size INTEGER NOT NULL
             )
         ''')
         
-        # 압축된 로그 테이블 (아카이브용)
+        # 블록 압축 아카이브 - 수천 행을 컬럼별로 묶어 한 번에 압축 (조회 시 필요한 블록만 해제)
         conn.execute('''
-            CREATE TABLE IF NOT EXISTS logs_archive (
+            CREATE TABLE IF NOT EXISTS logs_archive_blocks (
+                id INTEGER PRIMARY KEY,
+                min_created_at REAL NOT NULL,
+                max_created_at REAL NOT NULL,
+                row_count INTEGER NOT NULL,
+                sources TEXT NOT NULL,
+                levels TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL,
+                original_size INTEGER NOT NULL,
+                compressed_size INTEGER NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_archive_blocks_time
+            ON logs_archive_blocks(max_created_at DESC, min_created_at)
+        ''')
+        
+        # 파티션 목록 - 로그는 created_at 구간별 테이블(logs_pYYYYMMDD_HHMMSS)에 저장
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS log_partitions (
+                name TEXT PRIMARY KEY,
+                start_at REAL NOT NULL,
+                end_at REAL NOT NULL
+            )
+        ''')
+        
+        # 구버전 스키마로 생성된 DB 호환
+        self._migrate_schema(conn)
+        
+        # 통계 테이블 (일자별) - 배치 플러시마다 RollupAccumulator가 갱신
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS log_stats (
+                date TEXT NOT NULL,
+                source TEXT NOT NULL,
+                level TEXT NOT NULL,
+                count INTEGER DEFAULT 0,
+                total_size INTEGER DEFAULT 0,
+                PRIMARY KEY (date, source, level)
+            ) WITHOUT ROWID
+        ''')
+        
+        # 분/시간 단위 롤업 (bucket = 버킷 시작 epoch 초, created_at 기준)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS log_rollups (
+                granularity TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                level TEXT NOT NULL,
+                count INTEGER DEFAULT 0,
+                total_size INTEGER DEFAULT 0,
+                PRIMARY KEY (granularity, bucket, source, level)
+            ) WITHOUT ROWID
+        ''')
+        
+        # 지연 시간 스케치 (metadata.duration_ms) - 분/시간 버킷, 소스, 경로별 LatencySketch
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS log_latency (
+                granularity TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                source TEXT NOT NULL,
+                path TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                total_ms REAL NOT NULL,
+                min_ms REAL,
+                max_ms REAL,
+                bins TEXT NOT NULL,
+                slowest TEXT NOT NULL,
+                PRIMARY KEY (granularity, bucket, source, path)
+            ) WITHOUT ROWID
+        ''')
+        conn.commit()
+        
+        # 현재 파티션 생성 - logs 뷰가 항상 하나 이상의 파티션을 가리키도록
+        self._partitions = self._load_partitions(conn)
+        conn.execute('BEGIN')
+        partition, created = self._partition_for_write(conn, time.time())
+        conn.execute('COMMIT')
+        if created:
+            self._register_partition(partition)
+        
+        self._backfill_rollups(conn)
+        self._backfill_latency(conn)
+        conn.commit()
+        
+        if needs_vacuum:
+            print("auto_vacuum 설정 적용 중 (1회 VACUUM)...")
+            conn.execute('VACUUM')
+        self.pool.release_writer(conn)
+        
+    def _migrate_schema(self, conn: sqlite3.Connection):
+        """기존 DB 스키마 보정"""
+        # 행 단위 통계 트리거 제거 (RollupAccumulator로 대체)
+        conn.execute('DROP TRIGGER IF EXISTS update_stats_insert')
+        
+        # 구버전 log_stats는 date 단일 PK라 소스/레벨별 행이 덮어써짐 - 재생성 후 백필
+        stats_pk = [row[1] for row in conn.execute('PRAGMA table_info(log_stats)') if row[5]]
+        if stats_pk == ['date']:
+            conn.execute('DROP TABLE log_stats')
+            
+        # 단일 logs 테이블은 파티션으로 이전
+        legacy = conn.execute("SELECT type FROM sqlite_master WHERE name = 'logs'").fetchone()
+        if legacy and legacy[0] == 'table':
+            self._migrate_to_partitions(conn)
+            
+    def _migrate_to_partitions(self, conn: sqlite3.Connection):
+        """단일 logs 테이블의 행을 created_at 구간별 파티션으로 옮기고 원본 삭제"""
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(logs)')}
+        if 'size_bytes' not in columns:
+            conn.execute('ALTER TABLE logs ADD COLUMN size_bytes INTEGER DEFAULT 0')
+            
+        width = self._partition_width()
+        starts = [row[0] for row in conn.execute(
+            'SELECT DISTINCT CAST(created_at / ? AS INTEGER) * ? FROM logs ORDER BY 1', (width, width)
+        )]
+        print(f"logs 테이블을 {len(starts)}개 파티션으로 이전 중...")
+        
+        column_list = ', '.join(self.LOG_COLUMNS)
+        partitions = self._load_partitions(conn)
+        conn.execute('BEGIN')
+        for start in starts:
+            partition = self._create_partition(conn, start, partitions)
+            partitions.append(partition)
+            partitions.sort()
+            conn.execute(f'''
+                INSERT OR REPLACE INTO {partition[2]} ({column_list})
+                SELECT {column_list} FROM logs WHERE created_at >= ? AND created_at < ?
+            ''', (partition[0], partition[1]))
+            conn.execute(f"INSERT INTO {partition[2]}_fts({partition[2]}_fts) VALUES('rebuild')")
+            
+        conn.execute('DROP TABLE IF EXISTS logs_fts')
+        conn.execute('DROP TABLE logs')
+        self._refresh_logs_view(conn, partitions)
+        conn.execute('COMMIT')
+        
+    def _backfill_rollups(self, conn: sqlite3.Connection):
+        """롤업 테이블이 비어 있으면 기존 logs에서 한 번 채움"""
+        if conn.execute('SELECT 1 FROM log_rollups LIMIT 1').fetchone():
+            return
+        if not conn.execute('SELECT 1 FROM logs LIMIT 1').fetchone():
+            return
+            
+        print("로그 통계 롤업 백필 중...")
+        conn.execute('''
+            INSERT OR IGNORE INTO log_stats (date, source, level, count, total_size)
+            SELECT substr(timestamp, 1, 10), source, level, COUNT(*), COALESCE(SUM(size_bytes), 0)
+            FROM logs GROUP BY 1, 2, 3
+        ''')
+        for granularity, width in RollupAccumulator.GRANULARITIES.items():
+            conn.execute('''
+                INSERT INTO log_rollups (granularity, bucket, source, level, count, total_size)
+                SELECT ?, CAST(created_at / ? AS INTEGER) * ?, source, level, COUNT(*), COALESCE(SUM(size_bytes), 0)
+                FROM logs GROUP BY 2, 3, 4
+            ''', (granularity, width, width))
+            
+    def _backfill_latency(self, conn: sqlite3.Connection):
+        """지연 시간 스케치가 비어 있으면 duration_ms가 있는 기존 logs에서 한 번 채움"""
+        if conn.execute('SELECT 1 FROM log_latency LIMIT 1').fetchone():
+            return
+        rows = conn.execute('''
+            SELECT id, source, message, metadata, created_at FROM logs
+            WHERE json_valid(metadata) AND json_type(metadata, '$.duration_ms') IN ('integer', 'real')
+        ''')
+        rollups = RollupAccumulator()
+        for row in rows:
+            rollups.add_latency(row['source'], json.loads(row['metadata']), row['created_at'],
+                                row['id'], row['message'])
+        if rollups.latency:
+            print(f"지연 시간 스케치 백필: {len(rollups.latency)}개 버킷")
+            rollups.upsert(conn)
+            
+    def _partition_width(self) -> int:
+        """파티션 구간 길이 (초) - 알 수 없는 단위는 day"""
+        width = self.PARTITION_WIDTHS.get(self.config.partition_interval)
+        if width is None:
+            print(f"알 수 없는 partition_interval: {self.config.partition_interval!r}, day 사용")
+            self.config.partition_interval = 'day'
+            width = self.PARTITION_WIDTHS['day']
+        return width
+        
+    def _load_partitions(self, conn: sqlite3.Connection) -> List[Tuple[float, float, str]]:
+        """파티션 목록 조회 (시작 시각 오름차순)"""
+        return [tuple(row) for row in conn.execute(
+            'SELECT start_at, end_at, name FROM log_partitions ORDER BY start_at'
+        )]
+        
+    def _create_partition(self, conn: sqlite3.Connection, created_at: float,
+                          partitions: List[Tuple[float, float, str]]) -> Tuple[float, float, str]:
+        """created_at을 포함하는 파티션 테이블, 인덱스, FTS 색인 생성 (호출자 트랜잭션 내)
+        
+        구간은 partition_interval 경계에 맞추되, 단위가 바뀐 경우에도
+        기존 파티션과 겹치지 않도록 잘라낸다.
+        """
+        width = self._partition_width()
+        start = created_at // width * width
+        end = start + width
+        for other_start, other_end, _ in partitions:
+            if other_end <= created_at:
+                start = max(start, other_end)
+            elif other_start > created_at:
+                end = min(end, other_start)
+                
+        name = 'logs_p' + time.strftime('%Y%m%d_%H%M%S', time.gmtime(start))
+        conn.execute(f'''
+            CREATE TABLE IF NOT EXISTS {name} (
                 id TEXT PRIMARY KEY,
                 source TEXT NOT NULL,
                 level TEXT NOT NULL,
                 timestamp TEXT NOT NULL,
-                compressed_data BLOB NOT NULL,
+                message TEXT NOT NULL,
+                metadata TEXT,
+                tags TEXT,
+                trace_id TEXT,
                 created_at REAL NOT NULL,
-                original_size INTEGER NOT NULL,
-                compressed_size INTEGER NOT NULL
+                size_bytes INTEGER DEFAULT 0
             )
         ''')
         
-        # 인덱스 생성
         indexes = [
-            'CREATE INDEX IF NOT EXISTS idx_timestamp ON logs(timestamp DESC)',
-            'CREATE INDEX IF NOT EXISTS idx_source_level ON logs(source, level)',
-            'CREATE INDEX IF NOT EXISTS idx_trace_id ON logs(trace_id)',
-            'CREATE INDEX IF NOT EXISTS idx_created_at ON logs(created_at DESC)',
-            'CREATE INDEX IF NOT EXISTS idx_level_time ON logs(level, created_at DESC)',
-            'CREATE INDEX IF NOT EXISTS idx_source_time ON logs(source, created_at DESC)',
+            f'CREATE INDEX IF NOT EXISTS {name}_created_id ON {name}(created_at DESC, id DESC)',  # 키셋 페이징
+            f'CREATE INDEX IF NOT EXISTS {name}_trace_id ON {name}(trace_id)',
+            f'CREATE INDEX IF NOT EXISTS {name}_level_time ON {name}(level, created_at DESC)',
+            f'CREATE INDEX IF NOT EXISTS {name}_source_time ON {name}(source, created_at DESC)',
+            # 통계 경계 구간용 커버링 인덱스 (테이블 접근 없이 GROUP BY)
+            f'CREATE INDEX IF NOT EXISTS {name}_stats_cover ON {name}(created_at, source, level, size_bytes)',
         ]
-        
         for index in indexes:
             conn.execute(index)
             
-        # FTS5 전문검색 테이블
-        conn.execute('''
-            CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
-                id UNINDEXED,
+        # FTS5 전문검색 - 파티션을 외부 콘텐츠로 참조 (rowid 기준, 배치 저장 시 동기화)
+        conn.execute(f'''
+            CREATE VIRTUAL TABLE IF NOT EXISTS {name}_fts USING fts5(
                 source,
                 message,
                 metadata,
-                content=''
+                content='{name}',
+                content_rowid='rowid',
+                prefix='2 3'
             )
         ''')
         
-        # 통계 테이블
-        conn.execute('''
-            CREATE TABLE IF NOT EXISTS log_stats (
-                date TEXT PRIMARY KEY,
-                source TEXT,
-                level TEXT,
-                count INTEGER DEFAULT 0,
-                total_size INTEGER DEFAULT 0,
-                UNIQUE(date, source, level)
-            )
-        ''')
+        conn.execute('INSERT OR REPLACE INTO log_partitions (name, start_at, end_at) VALUES (?, ?, ?)',
+                     (name, start, end))
+        return (start, end, name)
         
-        # 트리거: 통계 자동 업데이트
-        conn.execute('''
-            CREATE TRIGGER IF NOT EXISTS update_stats_insert
-            AFTER INSERT ON logs
-            BEGIN
-                INSERT OR REPLACE INTO log_stats (date, source, level, count, total_size)
-                VALUES (
-                    date(NEW.timestamp),
-                    NEW.source,
-                    NEW.level,
-                    COALESCE((SELECT count FROM log_stats 
-                             WHERE date = date(NEW.timestamp) AND source = NEW.source AND level = NEW.level), 0) + 1,
-                    COALESCE((SELECT total_size FROM log_stats 
-                             WHERE date = date(NEW.timestamp) AND source = NEW.source AND level = NEW.level), 0) + NEW.size_bytes
-                );
-            END
-        ''')
+    def _refresh_logs_view(self, conn: sqlite3.Connection, partitions: List[Tuple[float, float, str]]):
+        """전체 파티션을 합친 logs 뷰 재생성 (통계/분석용 단일 테이블 호환)
         
-        conn.commit()
-        conn.close()
+        created_at 조건은 각 파티션 인덱스로 내려가므로 범위 밖 파티션은 즉시 건너뛴다.
+        """
+        column_list = ', '.join(self.LOG_COLUMNS)
+        conn.execute('DROP VIEW IF EXISTS logs')
+        if partitions:
+            body = ' UNION ALL '.join(f'SELECT {column_list} FROM {name}' for _, _, name in partitions)
+        else:
+            # 파티션이 하나도 없으면 같은 컬럼의 빈 결과
+            body = 'SELECT ' + ', '.join(f'NULL AS {column}' for column in self.LOG_COLUMNS) + ' WHERE 0'
+        conn.execute('CREATE VIEW logs AS ' + body)
+        
+    def _partition_for_write(self, conn: sqlite3.Connection, created_at: float) -> Tuple[Tuple[float, float, str], bool]:
+        """쓰기 대상 파티션 - 없으면 생성 (호출자 트랜잭션 내)
+        
+        반환: (파티션, 새로 생성 여부). 새 파티션은 커밋 후 _register_partition으로 등록해야
+        읽기 연결이 커밋 전 테이블을 조회하지 않는다.
+        """
+        with self._partitions_lock:
+            partitions = list(self._partitions)
+        for partition in reversed(partitions):
+            if partition[0] <= created_at < partition[1]:
+                return partition, False
+                
+        partition = self._create_partition(conn, created_at, partitions)
+        self._refresh_logs_view(conn, sorted(partitions + [partition]))
+        return partition, True
+        
+    def _register_partition(self, partition: Tuple[float, float, str]):
+        with self._partitions_lock:
+            self._partitions = sorted(self._partitions + [partition])
+            
+    def _partitions_between(self, since: float = None, until: float = None) -> List[Tuple[float, float, str]]:
+        """[since, until] 구간과 겹치는 파티션 (최신순) - 조회 시 파티션 가지치기"""
+        with self._partitions_lock:
+            partitions = list(self._partitions)
+        return [
+            partition for partition in reversed(partitions)
+            if (since is None or partition[1] > since) and (until is None or partition[0] <= until)
+        ]
+        
+    def list_partitions(self) -> List[Dict]:
+        """파티션 목록 (최신순)"""
+        return [{'name': name, 'start': start, 'end': end}
+                for start, end, name in self._partitions_between()]
         
     def _start_maintenance(self):
         """유지보수 작업 시작"""
@@ -265,87 +1206,188 @@ class LogStorage:
         """정기 유지보수 작업"""
         print("로그 저장소 유지보수 시작...")
         
-        # 1. 오래된 로그 정리
-        self._cleanup_old_logs()
+        steps = [
+            self._cleanup_old_logs,   # 1. 오래된 로그 정리
+            self._cleanup_by_size,    # 2. 크기 기반 정리
+            self._archive_old_logs,   # 3. 압축 및 아카이빙
+            self._prune_rollups,      # 4. 보존 기간이 지난 롤업 정리
+            self._vacuum_database,    # 5. VACUUM (공간 회수)
+        ]
+        for step in steps:
+            # 한 단계가 실패해도 나머지 단계는 계속 수행
+            try:
+                step()
+            except Exception as e:
+                print(f"유지보수 단계 실패 ({step.__name__}): {e}")
+                
+        print("로그 저장소 유지보수 완료")
         
-        # 2. 크기 기반 정리
-        self._cleanup_by_size()
+    def store_log(self, log_entry: LogEntry, durable: bool = False) -> Optional[Future]:
+        """단일 로그 저장 (배치 처리) - durable=True면 저장 결과 Future 반환"""
+        return self.batch_processor.add_log(log_entry, durable)
         
-        # 3. 압축 및 아카이빙
-        self._archive_old_logs()
+    def store_logs_batch(self, log_entries: List[LogEntry], durable: bool = False) -> List[Future]:
+        """배치 로그 저장 - durable=True면 로그별 저장 결과 Future 목록 반환"""
+        futures = [self.batch_processor.add_log(log_entry, durable) for log_entry in log_entries]
+        return [future for future in futures if future]
         
-        # 4. VACUUM (공간 회수)
-        self._vacuum_database()
+    async def store_log_async(self, log_entry: LogEntry, durable: bool = False) -> Optional[Future]:
+        """이벤트 루프용 단일 로그 저장 - store_logs_batch_async 참고"""
+        futures = await self.store_logs_batch_async([log_entry], durable)
+        return futures[0] if futures else None
         
-        print("로그 저장소 유지보수 완료")
+    async def store_logs_batch_async(self, log_entries: List[LogEntry], durable: bool = False) -> List[Future]:
+        """이벤트 루프용 배치 로그 저장 - durable=True면 로그별 저장 결과 Future 목록 반환
         
-    def store_log(self, log_entry: LogEntry):
-        """단일 로그 저장 (배치 처리)"""
-        self.batch_processor.add_log(log_entry)
+        큐에 여유가 있으면 루프에서 바로 넣고, 가득 차서 block 대기나 스필 쓰기가 필요해지면
+        그 로그부터 나머지를 ingest 스레드에서 store_logs_batch로 처리하며 기다린다.
+        백프레셔는 이 코루틴의 대기로 나타나고 이벤트 루프는 막히지 않는다.
+        """
+        futures = []
+        for index, log_entry in enumerate(log_entries):
+            future = Future() if durable else None
+            if not self.batch_processor.offer(log_entry, future):
+                loop = asyncio.get_running_loop()
+                futures.extend(await loop.run_in_executor(
+                    self.ingest_executor, self.store_logs_batch, log_entries[index:], durable))
+                break
+            if future:
+                futures.append(future)
+        return futures
         
-    def store_logs_batch(self, log_entries: List[LogEntry]):
-        """배치 로그 저장"""
-        for log_entry in log_entries:
-            self.batch_processor.add_log(log_entry)
-            
-    def _store_logs_direct(self, log_entries: List[LogEntry]):
-        """직접 로그 저장 (배치 처리기에서 호출)"""
-        conn = sqlite3.connect(self.db_path)
+    def flush(self) -> Future:
+        """지금까지 들어온 로그가 모두 저장되면 완료되는 Future"""
+        return self.batch_processor.flush()
+        
+    def get_ingest_stats(self) -> Dict:
+        """수집 큐 깊이와 삭제/스필 카운터"""
+        return self.batch_processor.get_metrics()
+        
+
+    def _store_logs_direct(self, log_entries: List[LogEntry], rollups: RollupAccumulator = None):
+        """직접 로그 저장 (배치 처리기에서 호출)
+        
+        같은 ID는 행을 교체하지만 롤업(통계/지연 스케치)에는 처음 저장될 때 한 번만 더한다.
+        수집기 스풀 재전송처럼 같은 로그를 다시 보내도 집계가 부풀지 않는다.
+        """
+        rollups = rollups if rollups is not None else RollupAccumulator()
+        conn = self.pool.acquire_writer()
         try:
-            logs_data = []
-            fts_data = []
+            entries = {}
             current_time = time.time()
             
             for log_entry in log_entries:
-                # 크기 계산
+                # 크기 계산 (배치 안의 같은 ID는 마지막 것만)
                 size_bytes = len(json.dumps(asdict(log_entry)).encode('utf-8'))
+                entries.pop(log_entry.id, None)
+                entries[log_entry.id] = (log_entry, size_bytes)
                 
-                logs_data.append((
-                    log_entry.id,
-                    log_entry.source,
-                    log_entry.level,
-                    log_entry.timestamp,
-                    log_entry.message,
-                    json.dumps(log_entry.metadata),
-                    json.dumps(log_entry.tags),
-                    log_entry.trace_id,
-                    current_time,
-                    size_bytes
-                ))
-                
-                fts_data.append((
-                    log_entry.id,
-                    log_entry.source,
-                    log_entry.message,
-                    json.dumps(log_entry.metadata)
-                ))
+            logs_data = [(
+                log_entry.id,
+                log_entry.source,
+                log_entry.level,
+                log_entry.timestamp,
+                log_entry.message,
+                json.dumps(log_entry.metadata),
+                json.dumps(log_entry.tags),
+                log_entry.trace_id,
+                current_time,
+                size_bytes
+            ) for log_entry, size_bytes in entries.values()]
             
             # 트랜잭션으로 일괄 처리
             conn.execute('BEGIN TRANSACTION')
             
-            conn.executemany('''
-                INSERT OR REPLACE INTO logs 
+            # 배치 전체가 같은 created_at이므로 파티션 하나에 저장 (ID 중복 교체도 파티션 내에서만)
+            partition, created = self._partition_for_write(conn, current_time)
+            table = partition[2]
+            
+            # REPLACE로 교체될 기존 행은 FTS 색인에서 먼저 제거하고 롤업에서 제외
+            ids = list(entries)
+            existing = set()
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                where = f"id IN ({','.join('?' * len(chunk))})"
+                existing.update(row[0] for row in conn.execute(f"SELECT id FROM {table} WHERE {where}", chunk))
+                self._delete_fts_rows(conn, table, where, chunk)
+                
+            for log_id, (log_entry, size_bytes) in entries.items():
+                if log_id in existing:
+                    continue
+                rollups.add(log_entry.timestamp[:10], log_entry.source, log_entry.level,
+                            current_time, size_bytes)
+                rollups.add_latency(log_entry.source, log_entry.metadata, current_time,
+                                    log_entry.id, log_entry.message)
+                
+            # 새 행은 항상 기존 최대 rowid 뒤에 할당됨
+            last_rowid = conn.execute(f'SELECT COALESCE(MAX(rowid), 0) FROM {table}').fetchone()[0]
+            
+            conn.executemany(f'''
+                INSERT OR REPLACE INTO {table} 
                 (id, source, level, timestamp, message, metadata, tags, trace_id, created_at, size_bytes)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', logs_data)
             
-            conn.executemany('''
-                INSERT OR REPLACE INTO logs_fts (id, source, message, metadata) 
-                VALUES (?, ?, ?, ?)
-            ''', fts_data)
+            conn.execute(f'''
+                INSERT INTO {table}_fts (rowid, source, message, metadata)
+                SELECT rowid, source, message, metadata FROM {table} WHERE rowid > ?
+            ''', (last_rowid,))
+            
+            # 통계 롤업 (플러시당 1회)
+            rollups.upsert(conn)
             
             conn.execute('COMMIT')
+            if created:
+                self._register_partition(partition)
             
         except Exception as e:
-            conn.execute('ROLLBACK')
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
             raise e
         finally:
-            conn.close()
+            self.pool.release_writer(conn)
+            
+    def _delete_fts_rows(self, conn: sqlite3.Connection, table: str, where: str, params: List = ()):
+        """삭제될 파티션 행을 FTS 색인에서 제거 (외부 콘텐츠 테이블은 원본 값으로 'delete' 필요)
+        
+        파티션에서 행을 지우기 전에 같은 조건으로 호출해야 한다.
+        """
+        conn.execute(f'''
+            INSERT INTO {table}_fts ({table}_fts, rowid, source, message, metadata)
+            SELECT 'delete', rowid, source, message, metadata FROM {table} WHERE {where}
+        ''', params)
+        
+    def _delete_logs(self, conn: sqlite3.Connection, table: str, where: str, params: List = ()) -> int:
+        """파티션에서 조건에 맞는 로그와 해당 FTS 색인 삭제 - 삭제된 행 수 반환"""
+        self._delete_fts_rows(conn, table, where, params)
+        return conn.execute(f'DELETE FROM {table} WHERE {where}', params).rowcount
+        
+    async def run(self, func, *args, timeout: float = None, **kwargs):
+        """저장소 함수를 읽기 스레드 풀에서 실행 (이벤트 루프 밖)
+        
+        timeout(기본 query_timeout) 초과나 호출 태스크 취소 시 진행 중인 SQLite 문을
+        interrupt()로 중단하고 asyncio.TimeoutError / CancelledError를 그대로 전파한다.
+        """
+        token = QueryToken()
+        
+        def call():
+            self.pool.bind_token(token)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.pool.bind_token(None)
+                
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, call)
+        try:
+            return await asyncio.wait_for(future, timeout or self.config.query_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            token.cancel()
+            raise
             
     async def query_logs_async(self, **kwargs) -> List[Dict]:
         """비동기 로그 조회"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, self.query_logs, **kwargs)
+        return await self.run(self.query_logs, **kwargs)
         
     def query_logs(self, 
                    sources: List[str] = None,
@@ -356,132 +1398,567 @@ class LogStorage:
                    offset: int = 0,
                    search: str = None,
                    trace_id: str = None,
-                   include_archived: bool = False) -> List[Dict]:
-        """고급 로그 조회"""
+                   include_archived: bool = False,
+                   cursor: str = None,
+                   search_mode: str = 'auto',
+                   rank: bool = False) -> List[Dict]:
+        """고급 로그 조회
         
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        cursor를 주면 (created_at, id) 키셋 페이징 - 해당 위치 이후 행부터 반환.
+        OFFSET과 달리 깊은 페이지도 인덱스 탐색 한 번으로 조회되고,
+        수집이 계속되어도 페이지 경계가 밀리지 않는다.
         
+        시간 조건과 겹치는 파티션만 최신순으로 조회하며, 파티션끼리 시간 구간이
+        겹치지 않으므로 limit을 채우면 더 오래된 파티션은 열지 않는다.
+        include_archived면 파티션 다음으로 아카이브 블록을 필요한 만큼만 해제해 이어 붙인다.
+        """
+        filters = dict(sources=sources, levels=levels, since=since, until=until,
+                       trace_id=trace_id, cursor=cursor)
+        queries = self._build_log_queries(search=search, search_mode=search_mode, rank=rank, **filters)
+        include_archived = include_archived and not search
+        if not queries and not include_archived:
+            return []
+            
+        conn = self.pool.acquire_reader()
         try:
-            # 기본 쿼리
-            if include_archived:
-                # 아카이브 테이블도 포함 (압축 해제 필요)
-                query = '''
-                    SELECT id, source, level, timestamp, message, metadata, tags, trace_id, created_at 
-                    FROM logs WHERE 1=1
-                    UNION ALL
-                    SELECT id, source, level, timestamp, NULL as message, NULL as metadata, NULL as tags, NULL as trace_id, created_at
-                    FROM logs_archive WHERE 1=1
+            if search and rank:
+                # 관련도순은 파티션 전체를 합쳐 정렬
+                query = ('SELECT * FROM (' + ' UNION ALL '.join(query for query, _ in queries) +
+                         ') ORDER BY rank, created_at DESC LIMIT ? OFFSET ?')
+                params = [param for _, query_params in queries for param in query_params]
+                rows = conn.execute(query, params + [limit, offset]).fetchall()
+            else:
+                rows = []
+                wanted = limit + offset
+                for query, params in queries:
+                    if len(rows) >= wanted:
+                        break
+                    rows.extend(conn.execute(query + " LIMIT ?", params + [wanted - len(rows)]).fetchall())
+                if include_archived and len(rows) < wanted:
+                    archived = self._iter_archived_rows(conn, **filters)
+                    rows.extend(itertools.islice(archived, wanted - len(rows)))
+                rows = rows[offset:]
+            return [self._row_to_log(row) for row in rows]
+        except sqlite3.OperationalError as e:
+            if search and 'fts5' in str(e):
+                raise ValueError(f"Invalid search query: {e}")
+            raise
+        finally:
+            self.pool.release_reader(conn)
+            
+    def iter_logs(self, chunk_size: int = 500, limit: int = None, **filters):
+        """조회 결과를 chunk_size 단위 리스트로 순차 생성 (스트리밍 내보내기용)
+        
+        청크마다 (created_at, id) 키셋 커서로 query_logs를 호출하므로 전체 결과를
+        메모리에 올리지 않고, 읽기 연결도 청크 조회 동안만 점유한다. 느린 클라이언트가
+        다음 청크를 기다리는 동안 연결은 풀에 반환되어 다른 조회가 쓸 수 있다.
+        """
+        cursor = filters.pop('cursor', None)
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            logs = self.query_logs(limit=size, cursor=cursor, **filters)
+            if not logs:
+                return
+            if remaining is not None:
+                remaining -= len(logs)
+            yield logs
+            if len(logs) < size:
+                return
+            cursor = self.encode_cursor(logs[-1])
+            
+    # 조회 결과 컬럼 (파티션 / logs_archive 공통)
+    LOG_COLUMNS = ('id', 'source', 'level', 'timestamp', 'message', 'metadata',
+                   'tags', 'trace_id', 'created_at', 'size_bytes')
+    
+    def _build_log_queries(self,
+                           sources: List[str] = None,
+                           levels: List[str] = None,
+                           since: str = None,
+                           until: str = None,
+                           search: str = None,
+                           trace_id: str = None,
+                           cursor: str = None,
+                           search_mode: str = 'auto',
+                           rank: bool = False) -> List[Tuple[str, List]]:
+        """조회 조건으로 파티션별 SELECT 문 목록 구성 (최신 파티션부터, LIMIT 제외)
+        
+        search가 있으면 파티션의 FTS 색인과 rowid로 조인하여 bm25 점수(rank)와
+        서버측 highlight/snippet을 함께 반환한다. rank=True면 정렬은 호출자가
+        파티션을 합쳐서 수행한다.
+        """
+        conditions = []
+        params = []
+        since_timestamp = self._parse_time_since(since) if since else None
+        until_timestamp = self._parse_time_since(until) if until else None
+        
+        # 필터 조건 추가
+        if sources:
+            conditions.append(f"logs.source IN ({','.join('?' * len(sources))})")
+            params.extend(sources)
+            
+        if levels:
+            conditions.append(f"logs.level IN ({','.join('?' * len(levels))})")
+            params.extend(levels)
+            
+        if since_timestamp is not None:
+            conditions.append("logs.created_at >= ?")
+            params.append(since_timestamp)
+            
+        if until_timestamp is not None:
+            conditions.append("logs.created_at <= ?")
+            params.append(until_timestamp)
+            
+        # 키셋 페이징
+        upper = until_timestamp
+        if cursor:
+            cursor_key = self.decode_cursor(cursor)
+            conditions.append("(logs.created_at, logs.id) < (?, ?)")
+            params.extend(cursor_key)
+            upper = cursor_key[0] if upper is None else min(upper, cursor_key[0])
+            
+        if trace_id:
+            conditions.append("logs.trace_id = ?")
+            params.append(trace_id)
+            
+        columns = ', '.join(f'logs.{column}' for column in self.LOG_COLUMNS)
+        where = ''.join(f" AND {condition}" for condition in conditions)
+        match = self.build_fts_query(search, search_mode) if search else None
+        
+        queries = []
+        for _, _, table in self._partitions_between(since_timestamp, upper):
+            if search:
+                # 전문검색 - 파티션별 외부 콘텐츠 FTS 조인
+                fts = f'{table}_fts'
+                query = f'''
+                    SELECT {columns},
+                           bm25({fts}) as rank,
+                           highlight({fts}, 1, '**', '**') as highlighted_message,
+                           snippet({fts}, 1, '**', '**', '…', 16) as snippet
+                    FROM {fts} JOIN {table} AS logs ON logs.rowid = {fts}.rowid
+                    WHERE {fts} MATCH ?{where}
                 '''
+                query_params = [match] + params
             else:
-                query = "SELECT * FROM logs WHERE 1=1"
+                query = f"SELECT {columns} FROM {table} AS logs WHERE 1=1{where}"
+                query_params = list(params)
                 
-            params = []
+            if not (search and rank):
+                query += " ORDER BY logs.created_at DESC, logs.id DESC"
+            queries.append((query, query_params))
+            
+        return queries
+        
+    @staticmethod
+    def build_fts_query(text: str, mode: str = 'auto') -> str:
+        """검색어를 FTS5 MATCH 식으로 변환
+        
+        mode: raw (FTS5 문법 그대로), terms (모든 단어 포함), phrase (구문 일치),
+              prefix (모든 단어 접두어 일치), auto (FTS5 연산자가 보이면 raw, 아니면 terms)
+        """
+        def quote(token: str) -> str:
+            return '"' + token.replace('"', '""') + '"'
+            
+        if mode == 'auto':
+            has_syntax = ('"' in text or '*' in text or 'NEAR(' in text or
+                          any(op in text.split() for op in ('AND', 'OR', 'NOT')))
+            mode = 'raw' if has_syntax else 'terms'
             
-            # 필터 조건 추가
+        tokens = text.split()
+        if mode == 'raw':
+            return text
+        if mode == 'phrase':
+            return quote(text)
+        if mode == 'prefix':
+            return ' '.join(quote(token) + '*' for token in tokens)
+        if mode == 'terms':
+            return ' '.join(quote(token) for token in tokens)
+        raise ValueError(f"Unknown search mode: {mode}")
+        
+    def _iter_archived_rows(self, conn: sqlite3.Connection,
+                            sources: List[str] = None,
+                            levels: List[str] = None,
+                            since: str = None,
+                            until: str = None,
+                            trace_id: str = None,
+                            cursor: str = None):
+        """아카이브 행을 (created_at, id) 내림차순으로 생성 - 블록은 필요할 때만 해제
+        
+        블록 메타데이터(시간 범위, 소스/레벨)로 후보 블록을 고르고, 아직 열지 않은 블록의
+        최대 시각보다 새로운 행만 먼저 내보내므로 호출자가 멈추면 나머지 블록은 해제하지 않는다.
+        구버전 행 단위 gzip 아카이브도 같은 순서로 병합한다.
+        """
+        since_timestamp = self._parse_time_since(since) if since else None
+        until_timestamp = self._parse_time_since(until) if until else None
+        cursor_key = self.decode_cursor(cursor) if cursor else None
+        upper = until_timestamp
+        if cursor_key:
+            upper = cursor_key[0] if upper is None else min(upper, cursor_key[0])
+        source_set = set(sources) if sources else None
+        level_set = set(levels) if levels else None
+        
+        def sort_key(row: Dict) -> Tuple[float, str]:
+            return (row['created_at'], row['id'])
+            
+        def matches(row: Dict) -> bool:
+            return ((source_set is None or row['source'] in source_set) and
+                    (level_set is None or row['level'] in level_set) and
+                    (since_timestamp is None or row['created_at'] >= since_timestamp) and
+                    (until_timestamp is None or row['created_at'] <= until_timestamp) and
+                    (trace_id is None or row['trace_id'] == trace_id) and
+                    (cursor_key is None or sort_key(row) < cursor_key))
+                    
+        def time_conditions(low: str, high: str) -> Tuple[str, List]:
+            conditions, params = [], []
+            if since_timestamp is not None:
+                conditions.append(f"{high} >= ?")
+                params.append(since_timestamp)
+            if upper is not None:
+                conditions.append(f"{low} <= ?")
+                params.append(upper)
+            return ''.join(f" AND {condition}" for condition in conditions), params
+            
+        def iter_blocks():
+            where, params = time_conditions('min_created_at', 'max_created_at')
+            blocks = [
+                block for block in conn.execute(f'''
+                    SELECT id, max_created_at, sources, levels, codec FROM logs_archive_blocks
+                    WHERE 1=1{where} ORDER BY max_created_at DESC
+                ''', params).fetchall()
+                if (source_set is None or source_set.intersection(json.loads(block['sources']))) and
+                   (level_set is None or level_set.intersection(json.loads(block['levels'])))
+            ]
+            
+            buffer = []  # 해제된 행 (오름차순, 끝이 가장 최신)
+            for block in blocks:
+                # 다음 블록보다 확실히 새로운 행은 블록을 열지 않고 먼저 내보냄
+                while buffer and buffer[-1]['created_at'] > block['max_created_at']:
+                    yield buffer.pop()
+                data = conn.execute('SELECT data FROM logs_archive_blocks WHERE id = ?', (block['id'],)).fetchone()[0]
+                columns = json.loads(self._decompress_block(block['codec'], data))
+                buffer.extend(row for row in (dict(zip(self.LOG_COLUMNS, values)) for values in zip(*columns))
+                              if matches(row))
+                buffer.sort(key=sort_key)
+            while buffer:
+                yield buffer.pop()
+                
+        def iter_legacy():
+            where, params = time_conditions('created_at', 'created_at')
             if sources:
-                placeholders = ','.join('?' * len(sources))
-                query += f" AND source IN ({placeholders})"
+                where += f" AND source IN ({','.join('?' * len(sources))})"
                 params.extend(sources)
-                
             if levels:
-                placeholders = ','.join('?' * len(levels))
-                query += f" AND level IN ({placeholders})"
+                where += f" AND level IN ({','.join('?' * len(levels))})"
                 params.extend(levels)
+            for row in conn.execute(f'''
+                SELECT compressed_data FROM logs_archive
+                WHERE 1=1{where} ORDER BY created_at DESC, id DESC
+            ''', params):
+                data = json.loads(gzip.decompress(row['compressed_data']))
+                log = {column: data.get(column) for column in self.LOG_COLUMNS}
+                if matches(log):
+                    yield log
+                    
+        return heapq.merge(iter_blocks(), iter_legacy(), key=sort_key, reverse=True)
+        
+    def _compress_block(self, payload: bytes) -> Tuple[str, bytes]:
+        """archive_codec으로 블록 압축 - 반환: (코덱, 압축 데이터)"""
+        if self.config.archive_codec == 'lzma':
+            return 'lzma', lzma.compress(payload, preset=6)
+        return 'zlib', zlib.compress(payload, 9)
+        
+    @staticmethod
+    def _decompress_block(codec: str, data: bytes) -> bytes:
+        if codec == 'lzma':
+            return lzma.decompress(data)
+        return zlib.decompress(data)
+        
+    def _write_archive_blocks(self, conn: sqlite3.Connection, rows) -> Tuple[int, int]:
+        """(created_at, id) 오름차순 행들을 archive_block_rows 단위 블록으로 압축 저장 (호출자 트랜잭션 내)
+        
+        블록은 컬럼별 배열(JSON)로 묶어 압축하므로 반복되는 소스/레벨/메타데이터 키가
+        인접하여 짧은 로그도 높은 압축률을 얻는다. 반환: (행 수, 블록 수)
+        """
+        block_rows = max(1, self.config.archive_block_rows)
+        created_index = self.LOG_COLUMNS.index('created_at')
+        rows = iter(rows)
+        row_count = block_count = 0
+        
+        while True:
+            block = [tuple(row[column] for column in self.LOG_COLUMNS)
+                     for row in itertools.islice(rows, block_rows)]
+            if not block:
+                break
                 
-            if trace_id:
-                query += " AND trace_id = ?"
-                params.append(trace_id)
-                
-            if since:
-                since_timestamp = self._parse_time_since(since)
-                query += " AND created_at >= ?"
-                params.append(since_timestamp)
+            columns = [list(values) for values in zip(*block)]
+            payload = json.dumps(columns, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            codec, data = self._compress_block(payload)
+            conn.execute('''
+                INSERT INTO logs_archive_blocks
+                (min_created_at, max_created_at, row_count, sources, levels, codec, data, original_size, compressed_size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                min(columns[created_index]), max(columns[created_index]), len(block),
+                json.dumps(sorted(set(columns[1]))), json.dumps(sorted(set(columns[2]))),
+                codec, data, len(payload), len(data)
+            ))
+            row_count += len(block)
+            block_count += 1
+            
+        return row_count, block_count
+        
+    def get_archive_stats(self) -> Dict:
+        """아카이브 블록 수, 행 수, 압축률"""
+        conn = self.pool.acquire_reader()
+        try:
+            row = conn.execute('''
+                SELECT COUNT(*) as blocks, COALESCE(SUM(row_count), 0) as rows,
+                       COALESCE(SUM(original_size), 0) as original_size,
+                       COALESCE(SUM(compressed_size), 0) as compressed_size
+                FROM logs_archive_blocks
+            ''').fetchone()
+            legacy_rows = conn.execute('SELECT COUNT(*) FROM logs_archive').fetchone()[0]
+        finally:
+            self.pool.release_reader(conn)
+            
+        stats = dict(row)
+        stats['legacy_rows'] = legacy_rows
+        stats['compression_ratio'] = (round(stats['original_size'] / stats['compressed_size'], 2)
+                                      if stats['compressed_size'] else 0.0)
+        return stats
+        
+    def _row_to_log(self, row: sqlite3.Row) -> Dict:
+        """DB 행을 로그 딕셔너리로 변환 (JSON 필드 파싱)"""
+        result = dict(row)
+        result['metadata'] = json.loads(result['metadata']) if result['metadata'] else {}
+        result['tags'] = json.loads(result['tags']) if result['tags'] else []
+        return result
+        
+    def query_logs_page(self, limit: int = 100, **kwargs) -> Dict:
+        """커서 기반 페이지 조회 - 다음 페이지용 next_cursor 포함"""
+        logs = self.query_logs(limit=limit + 1, **kwargs)
+        has_more = len(logs) > limit
+        logs = logs[:limit]
+        
+        return {
+            'logs': logs,
+            'next_cursor': self.encode_cursor(logs[-1]) if has_more else None,
+            'has_more': has_more
+        }
+        
+    @staticmethod
+    def encode_cursor(log: Dict) -> str:
+        """(created_at, id) 위치를 불투명 토큰으로 인코딩"""
+        raw = json.dumps([log['created_at'], log['id']], separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+        
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[float, str]:
+        """커서 토큰 디코딩 - 잘못된 토큰은 ValueError"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, log_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            return float(created_at), str(log_id)
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor}")
+            
+    def _plan_stat_segments(self, since: float, until: float) -> List[Tuple[str, float, float]]:
+        """집계 구간 계획 - 온전한 시간/분 버킷은 롤업, 버킷 경계 밖 잔여 구간만 원본 조회
+        
+        반환: [(종류, 시작, 끝)] - 종류는 'h' / 'm' (롤업) 또는 'raw' (logs 커버링 인덱스)
+        """
+        segments = []
+        hour_start = -(-since // 3600) * 3600
+        hour_end = until // 3600 * 3600
+        if hour_start < hour_end:
+            segments.append(('h', hour_start, hour_end))
+            edges = [(since, hour_start), (hour_end, until)]
+        else:
+            edges = [(since, until)]
+            
+        # 분 단위 롤업은 minute_rollup_hours 이내만 보존됨
+        minute_floor = time.time() - self.config.minute_rollup_hours * 3600
+        for start, end in edges:
+            minute_start = -(-start // 60) * 60
+            minute_end = end // 60 * 60
+            if minute_start < minute_end and minute_start >= minute_floor:
+                segments.extend([('raw', start, minute_start), ('m', minute_start, minute_end),
+                                 ('raw', minute_end, end)])
+            else:
+                segments.append(('raw', start, end))
                 
-            if until:
-                until_timestamp = self._parse_time_since(until)
-                query += " AND created_at <= ?"
-                params.append(until_timestamp)
+        return [segment for segment in segments if segment[1] < segment[2]]
+        
+    def _aggregate_counts(self, conn: sqlite3.Connection, since: float, until: float) -> Dict[Tuple, List[int]]:
+        """[since, until) 구간의 (소스, 레벨, 시간 버킷)별 정확한 건수/크기"""
+        totals = defaultdict(lambda: [0, 0])
+        
+        for kind, start, end in self._plan_stat_segments(since, until):
+            if kind == 'raw':
+                rows = []
+                for _, _, table in self._partitions_between(start, end):
+                    rows.extend(conn.execute(f'''
+                        SELECT source, level, CAST(created_at / 3600 AS INTEGER) * 3600 as hour,
+                               COUNT(*) as count, COALESCE(SUM(size_bytes), 0) as total_size
+                        FROM {table} INDEXED BY {table}_stats_cover
+                        WHERE created_at >= ? AND created_at < ?
+                        GROUP BY source, level, hour
+                    ''', (start, end)))
+            else:
+                rows = conn.execute('''
+                    SELECT source, level, bucket / 3600 * 3600 as hour,
+                           SUM(count) as count, SUM(total_size) as total_size
+                    FROM log_rollups
+                    WHERE granularity = ? AND bucket >= ? AND bucket < ?
+                    GROUP BY source, level, hour
+                ''', (kind, int(start), int(end)))
                 
-            # 전문검색
-            if search:
-                fts_subquery = '''
-                    SELECT id FROM logs_fts WHERE logs_fts MATCH ?
-                '''
-                query += f" AND id IN ({fts_subquery})"
-                params.append(search)
+            for row in rows:
+                entry = totals[(row['source'], row['level'], row['hour'])]
+                entry[0] += row['count']
+                entry[1] += row['total_size']
                 
-            # 정렬 및 페이징
-            query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
-            
-            cursor = conn.execute(query, params)
-            rows = cursor.fetchall()
+        return totals
+        
+    def get_counts(self, timerange: str = "1h", until: str = None) -> Dict:
+        """소스/레벨/시간별 정확한 로그 건수
+        
+        롤업 버킷과 경계 구간의 커버링 인덱스 조회를 조합하므로
+        logs 크기와 무관하게 밀리초 단위로 응답한다.
+        """
+        started = time.perf_counter()
+        since_timestamp = self._parse_time_since(timerange)
+        until_timestamp = self._parse_time_since(until) if until else time.time()
+        
+        conn = self.pool.acquire_reader()
+        try:
+            totals = self._aggregate_counts(conn, since_timestamp, until_timestamp)
+        finally:
+            self.pool.release_reader(conn)
             
-            results = []
-            for row in rows:
-                result = dict(row)
+        by_source = defaultdict(int)
+        by_level = defaultdict(int)
+        by_source_level = defaultdict(lambda: [0, 0])
+        by_hour = defaultdict(lambda: [0, 0])
+        for (source, level, hour), (count, size) in totals.items():
+            by_source[source] += count
+            by_level[level] += count
+            by_source_level[(source, level)][0] += count
+            by_source_level[(source, level)][1] += size
+            by_hour[hour][0] += count
+            if level == 'ERROR':
+                by_hour[hour][1] += count
                 
-                # JSON 필드 파싱
-                if result['metadata']:
-                    result['metadata'] = json.loads(result['metadata'])
-                else:
-                    result['metadata'] = {}
-                    
-                if result['tags']:
-                    result['tags'] = json.loads(result['tags'])
-                else:
-                    result['tags'] = []
-                    
-                results.append(result)
+        return {
+            'total_logs': sum(by_source.values()),
+            'total_size_bytes': sum(size for _, size in by_source_level.values()),
+            'by_source': dict(by_source),
+            'by_level': dict(by_level),
+            'by_source_level': sorted(
+                ({'source': source, 'level': level, 'count': count, 'total_size': size}
+                 for (source, level), (count, size) in by_source_level.items()),
+                key=lambda row: row['count'], reverse=True
+            ),
+            'by_hour': [
+                {'hour': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(hour)),
+                 'count': count, 'error_count': error_count}
+                for hour, (count, error_count) in sorted(by_hour.items(), reverse=True)
+            ],
+            'since': since_timestamp,
+            'until': until_timestamp,
+            'query_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+        
+    def get_latency_stats(self, since: float, until: float = None, sources: List[str] = None,
+                          threshold_ms: float = 1000, top_paths: int = 20) -> Dict:
+        """[since, until) 구간의 지연 시간 분위수 (원본 로그를 다시 읽지 않음)
+        
+        온전한 시간 버킷은 시간 스케치, 양 끝은 분 스케치를 병합한다 (분 단위 정밀도).
+        분 스케치가 보존 기간(minute_rollup_hours)을 넘은 구간은 시간 단위로 반올림된다.
+        """
+        started = time.perf_counter()
+        until = until or time.time()
+        minute_floor = time.time() - self.config.minute_rollup_hours * 3600
+        hour_start = -(-since // 3600) * 3600
+        hour_end = until // 3600 * 3600
+        segments = []
+        if hour_start < hour_end:
+            segments.append(('h', hour_start, hour_end))
+            edges = [(since, hour_start), (hour_end, until)]
+        else:
+            edges = [(since, until)]
+        for start, end in edges:
+            if start >= end:
+                continue
+            if start >= minute_floor:
+                segments.append(('m', start // 60 * 60, end))
+            else:
+                segments.append(('h', start // 3600 * 3600, end))
                 
-            return results
+        source_filter = ''
+        source_params = []
+        if sources:
+            source_filter = f" AND source IN ({','.join('?' * len(sources))})"
+            source_params = list(sources)
             
+        by_path = defaultdict(LatencySketch)
+        conn = self.pool.acquire_reader()
+        try:
+            for granularity, start, end in segments:
+                rows = conn.execute(f'''
+                    SELECT source, path, count, total_ms, min_ms, max_ms, bins, slowest FROM log_latency
+                    WHERE granularity = ? AND bucket >= ? AND bucket < ?{source_filter}
+                ''', [granularity, int(start), end, *source_params])
+                for row in rows:
+                    by_path[(row['source'], row['path'])].merge(LatencySketch.from_row(row))
         finally:
-            conn.close()
+            self.pool.release_reader(conn)
+            
+        by_source = defaultdict(LatencySketch)
+        overall = LatencySketch()
+        for (source, _), sketch in by_path.items():
+            by_source[source].merge(sketch)
+        for sketch in by_source.values():
+            overall.merge(sketch)
             
+        paths = sorted(by_path.items(), key=lambda item: item[1].quantile(0.99) or 0, reverse=True)
+        return {
+            'overall': overall.summary(threshold_ms),
+            'by_source': {source: {**sketch.summary(threshold_ms), 'slowest': sketch.slowest_requests()}
+                          for source, sketch in by_source.items()},
+            'by_path': [{'source': source, 'path': path, **sketch.summary(threshold_ms)}
+                        for (source, path), sketch in paths[:top_paths]],
+            'slowest': overall.slowest_requests(),
+            'since': since,
+            'until': until,
+            'query_ms': round((time.perf_counter() - started) * 1000, 3)
+        }
+        
     def get_statistics(self, timerange: str = "24h") -> Dict:
         """상세 통계 조회"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        counts = self.get_counts(timerange)
+        conn = self.pool.acquire_reader()
         
         try:
-            since_timestamp = self._parse_time_since(timerange)
-            
-            # 기본 통계
-            basic_stats = conn.execute('''
-                SELECT 
-                    COUNT(*) as total_logs,
-                    COUNT(DISTINCT source) as unique_sources,
-                    COUNT(DISTINCT trace_id) as unique_traces,
-                    SUM(size_bytes) as total_size_bytes,
-                    MIN(created_at) as earliest_log,
-                    MAX(created_at) as latest_log
-                FROM logs 
-                WHERE created_at >= ?
-            ''', (since_timestamp,)).fetchone()
+            since_timestamp = counts['since']
             
-            # 소스별 통계
-            source_stats = conn.execute('''
-                SELECT source, level, COUNT(*) as count, SUM(size_bytes) as total_size
+            # 기본 통계 - 건수/크기는 집계 엔진, 시간 범위는 created_at 인덱스로 조회
+            bounds = conn.execute('''
+                SELECT MIN(created_at) as earliest_log, MAX(created_at) as latest_log
                 FROM logs 
                 WHERE created_at >= ?
-                GROUP BY source, level
-                ORDER BY count DESC
-            ''', (since_timestamp,)).fetchall()
-            
-            # 시간대별 통계 (1시간 단위)
-            hourly_stats = conn.execute('''
-                SELECT 
-                    datetime((created_at / 3600) * 3600, 'unixepoch') as hour,
-                    COUNT(*) as count,
-                    COUNT(CASE WHEN level = 'ERROR' THEN 1 END) as error_count
-                FROM logs 
-                WHERE created_at >= ?
-                GROUP BY (created_at / 3600)
-                ORDER BY hour DESC
-                LIMIT 24
-            ''', (since_timestamp,)).fetchall()
+            ''', (since_timestamp,)).fetchone()
+            unique_traces = conn.execute('''
+                SELECT COUNT(DISTINCT trace_id) FROM logs WHERE created_at >= ?
+            ''', (since_timestamp,)).fetchone()[0]
+            basic_stats = {
+                'total_logs': counts['total_logs'],
+                'unique_sources': len(counts['by_source']),
+                'unique_traces': unique_traces,
+                'total_size_bytes': counts['total_size_bytes'],
+                'earliest_log': bounds['earliest_log'],
+                'latest_log': bounds['latest_log']
+            }
             
             # 가장 자주 발생하는 에러
             top_errors = conn.execute('''
@@ -495,33 +1972,92 @@ class LogStorage:
             
             return {
                 'timerange': timerange,
-                'basic': dict(basic_stats),
-                'by_source_level': [dict(row) for row in source_stats],
-                'hourly': [dict(row) for row in hourly_stats],
+                'basic': basic_stats,
+                'by_source_level': counts['by_source_level'],
+                'hourly': counts['by_hour'][:24],
                 'top_errors': [dict(row) for row in top_errors]
             }
             
         finally:
-            conn.close()
+            self.pool.release_reader(conn)
+            
+    def get_logs_since(self, since_timestamp: float, levels: List[str] = None, limit: int = None) -> List[Dict]:
+        """분석용 원본 로그 조회 (최신순, JSON 필드는 문자열 그대로)"""
+        query = 'SELECT * FROM logs WHERE created_at >= ?'
+        params = [since_timestamp]
+        if levels:
+            query += f" AND level IN ({','.join('?' * len(levels))})"
+            params.extend(levels)
+        query += ' ORDER BY created_at DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        
+        conn = self.pool.acquire_reader()
+        try:
+            return [dict(row) for row in conn.execute(query, params)]
+        finally:
+            self.pool.release_reader(conn)
+            
+    def get_analysis_columns(self, since: float, until: float = None) -> Dict:
+        """분석 엔진 입력 - [since, until) 구간의 롤업을 컬럼(리스트) 단위로 반환
+        
+        원본 행 대신 분 롤업(보존 기간 밖이면 시간 롤업)과 지연 시간 스케치의
+        건수/합계를 읽으므로 로그 수가 아니라 버킷 수에 비례한다.
+        """
+        until = until or time.time()
+        minute_floor = time.time() - self.config.minute_rollup_hours * 3600
+        granularity = 'm' if since >= minute_floor else 'h'
+        width = RollupAccumulator.GRANULARITIES[granularity]
+        start = int(since // width * width)
+        
+        conn = self.pool.acquire_reader()
+        try:
+            rows = conn.execute('''
+                SELECT bucket, source, level, count FROM log_rollups
+                WHERE granularity = ? AND bucket >= ? AND bucket < ?
+            ''', (granularity, start, until)).fetchall()
+            latency_rows = conn.execute('''
+                SELECT bucket, source, SUM(count), SUM(total_ms) FROM log_latency
+                WHERE granularity = ? AND bucket >= ? AND bucket < ?
+                GROUP BY bucket, source
+            ''', (granularity, start, until)).fetchall()
+        finally:
+            self.pool.release_reader(conn)
+            
+        bucket, source, level, count = (list(column) for column in zip(*rows)) if rows else ([], [], [], [])
+        latency_bucket, latency_source, latency_count, latency_total = (
+            (list(column) for column in zip(*latency_rows)) if latency_rows else ([], [], [], []))
+        return {
+            'since': since,
+            'until': until,
+            'width': width,
+            'bucket': bucket,
+            'source': source,
+            'level': level,
+            'count': count,
+            'latency_bucket': latency_bucket,
+            'latency_source': latency_source,
+            'latency_count': latency_count,
+            'latency_total_ms': latency_total
+        }
+        
+    def count_logs(self) -> int:
+        """현재 파티션에 저장된 전체 로그 수"""
+        conn = self.pool.acquire_reader()
+        try:
+            return conn.execute('SELECT COUNT(*) FROM logs').fetchone()[0]
+        finally:
+            self.pool.release_reader(conn)
             
     def get_trace_logs(self, trace_id: str) -> List[Dict]:
         """트레이스 ID로 관련 로그 조회"""
         return self.query_logs(trace_id=trace_id, limit=1000)
         
-    def search_logs(self, query: str, **kwargs) -> Dict:
-        """고급 전문검색"""
-        # 기본 FTS 검색
-        logs = self.query_logs(search=query, **kwargs)
-        
-        # 검색 결과 하이라이팅
-        for log in logs:
-            if query.lower() in log['message'].lower():
-                # 간단한 하이라이팅
-                highlighted = log['message'].replace(
-                    query, f"**{query}**"
-                )
-                log['highlighted_message'] = highlighted
-                
+    def search_logs(self, query: str, mode: str = 'auto', rank: bool = True, **kwargs) -> Dict:
+        """고급 전문검색 - bm25 관련도순, 하이라이트/스니펫은 FTS5가 생성"""
+        logs = self.query_logs(search=query, search_mode=mode, rank=rank, **kwargs)
+        
         return {
             'query': query,
             'total_found': len(logs),
@@ -544,126 +2080,188 @@ class LogStorage:
             return now - int(since) * 60
             
     def _cleanup_old_logs(self):
-        """오래된 로그 정리"""
+        """보존 기간이 지난 파티션 정리 - 행 단위 DELETE 대신 파티션 DROP
+        
+        만료 판단은 파티션 단위이므로 파티션 끝 시각이 보존 기한을 지나야 삭제된다.
+        수집이 보존 기간 이상 멈춰 있어도 가장 최신 파티션은 남겨 둔다 (_cleanup_by_size와 동일).
+        """
         cutoff_time = time.time() - (self.config.max_days * 86400)
+        partitions = self._partitions_between()
+        expired = [partition for partition in partitions[1:] if partition[1] <= cutoff_time]
+        
+        for partition in reversed(expired):  # 오래된 파티션부터
+            self._drop_partition(partition, archive=self.config.enable_compression)
+            
+    def _drop_partition(self, partition: Tuple[float, float, str], archive: bool = False):
+        """파티션 테이블과 FTS 색인 삭제 (archive=True면 삭제 전 행을 아카이브 블록으로 압축)
         
-        conn = sqlite3.connect(self.db_path)
+        삭제된 페이지는 freelist로 돌아가고 _vacuum_database의 incremental_vacuum이 파일에서 반환한다.
+        """
+        table = partition[2]
+        
+        # 새 조회가 삭제 중인 파티션을 열지 않도록 먼저 목록에서 제외
+        with self._partitions_lock:
+            self._partitions = [p for p in self._partitions if p != partition]
+            
+        conn = self.pool.acquire_writer()
         try:
-            # 아카이브로 이동할 로그 수 확인
-            count = conn.execute(
-                'SELECT COUNT(*) FROM logs WHERE created_at < ?', 
-                (cutoff_time,)
-            ).fetchone()[0]
-            
-            if count > 0:
-                print(f"{count}개의 오래된 로그를 정리합니다...")
-                
-                # 아카이브 테이블로 이동 (압축)
-                old_logs = conn.execute('''
-                    SELECT * FROM logs WHERE created_at < ? ORDER BY created_at
-                ''', (cutoff_time,)).fetchall()
-                
-                for log in old_logs:
-                    # 로그 데이터 압축
-                    log_data = json.dumps(dict(log)).encode('utf-8')
-                    compressed_data = gzip.compress(log_data)
-                    
-                    # 아카이브 테이블에 저장
-                    conn.execute('''
-                        INSERT OR REPLACE INTO logs_archive 
-                        (id, source, level, timestamp, compressed_data, created_at, original_size, compressed_size)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        log['id'], log['source'], log['level'], log['timestamp'],
-                        compressed_data, log['created_at'],
-                        len(log_data), len(compressed_data)
-                    ))
-                
-                # 원본 로그 삭제
-                conn.execute('DELETE FROM logs WHERE created_at < ?', (cutoff_time,))
-                conn.execute('DELETE FROM logs_fts WHERE id NOT IN (SELECT id FROM logs)')
-                
-                conn.commit()
-                print(f"로그 아카이빙 완료: {count}개")
+            conn.execute('BEGIN')
+            # 뷰는 트랜잭션 안에서 log_partitions로 다시 구성 (기다리는 사이 배치 워커가 만든 파티션 포함)
+            remaining = [tuple(row) for row in conn.execute(
+                'SELECT start_at, end_at, name FROM log_partitions WHERE name != ? ORDER BY start_at', (table,))]
+            if archive:
+                # 컬럼별 블록 압축 아카이브로 이동
+                rows = conn.execute(f"SELECT {', '.join(self.LOG_COLUMNS)} FROM {table} ORDER BY created_at, id")
+                count, blocks = self._write_archive_blocks(conn, rows)
+                print(f"로그 아카이빙 완료: {count}개 ({blocks}개 블록)")
                 
+            self._refresh_logs_view(conn, remaining)
+            conn.execute(f'DROP TABLE IF EXISTS {table}_fts')
+            conn.execute(f'DROP TABLE IF EXISTS {table}')
+            conn.execute('DELETE FROM log_partitions WHERE name = ?', (table,))
+            conn.execute('COMMIT')
+            print(f"파티션 삭제: {table}")
+        except Exception:
+            self._register_partition(partition)
+            raise
         finally:
-            conn.close()
+            self.pool.release_writer(conn)
             
+    def _used_bytes(self, conn: sqlite3.Connection) -> int:
+        """freelist를 제외한 실제 사용 중인 DB 크기"""
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        freelist_count = conn.execute('PRAGMA freelist_count').fetchone()[0]
+        return (page_count - freelist_count) * page_size
+        
     def _cleanup_by_size(self):
-        """크기 기반 로그 정리"""
+        """크기 기반 로그 정리 - 가장 오래된 파티션부터 삭제"""
         max_size_bytes = self.config.max_size_mb * 1024 * 1024
         
-        # 현재 DB 크기 확인
-        db_size = os.path.getsize(self.db_path)
-        
-        if db_size > max_size_bytes:
-            print(f"DB 크기 초과 ({db_size / 1024 / 1024:.1f}MB), 정리 시작...")
+        conn = self.pool.acquire_reader()
+        try:
+            db_size = self._used_bytes(conn)
+        finally:
+            self.pool.release_reader(conn)
             
-            conn = sqlite3.connect(self.db_path)
-            try:
-                # 가장 오래된 로그부터 삭제
-                while db_size > max_size_bytes * 0.8:  # 80%까지 줄임
-                    conn.execute('''
-                        DELETE FROM logs WHERE id IN (
-                            SELECT id FROM logs ORDER BY created_at LIMIT 1000
-                        )
-                    ''')
-                    conn.commit()
-                    
-                    new_size = os.path.getsize(self.db_path)
-                    if new_size >= db_size:  # 더 이상 줄어들지 않으면 중단
-                        break
-                    db_size = new_size
-                    
-                # FTS 정리
-                conn.execute('DELETE FROM logs_fts WHERE id NOT IN (SELECT id FROM logs)')
-                conn.commit()
+        if db_size <= max_size_bytes:
+            return
+            
+        print(f"DB 크기 초과 ({db_size / 1024 / 1024:.1f}MB), 정리 시작...")
+        while db_size > max_size_bytes * 0.8:  # 80%까지 줄임
+            partitions = self._partitions_between()
+            if len(partitions) > 1:
+                self._drop_partition(partitions[-1])
+            elif self._evict_archive_blocks():
+                # 현재 파티션만 남으면 더 오래된 아카이브 블록부터 삭제
+                pass
+            elif not partitions or not self._trim_partition(partitions[0][2]):
+                break
                 
+            conn = self.pool.acquire_reader()
+            try:
+                new_size = self._used_bytes(conn)
             finally:
-                conn.close()
-                
+                self.pool.release_reader(conn)
+            if new_size >= db_size:  # 더 이상 줄어들지 않으면 중단
+                break
+            db_size = new_size
+            
+    def _trim_partition(self, table: str, count: int = 1000) -> int:
+        """파티션에서 가장 오래된 행 삭제 (현재 파티션만 남았을 때의 크기 정리용)"""
+        conn = self.pool.acquire_writer()
+        try:
+            deleted = self._delete_logs(
+                conn, table, f'rowid IN (SELECT rowid FROM {table} ORDER BY created_at, rowid LIMIT ?)', (count,))
+            conn.commit()
+            return deleted
+        finally:
+            self.pool.release_writer(conn)
+            
     def _archive_old_logs(self):
-        """로그 압축 아카이빙"""
+        """구버전 행 단위 gzip 아카이브를 블록 압축으로 재압축 (유지보수 1회당 최대 10블록)"""
         if not self.config.enable_compression:
             return
             
-        # 1일 이상 된 로그를 압축
-        archive_cutoff = time.time() - 86400
-        
-        conn = sqlite3.connect(self.db_path)
+        conn = self.pool.acquire_writer()
         try:
-            logs_to_archive = conn.execute('''
-                SELECT * FROM logs 
-                WHERE created_at < ? AND level NOT IN ('ERROR', 'FATAL')
-                ORDER BY created_at
-                LIMIT 10000
-            ''', (archive_cutoff,)).fetchall()
-            
-            if logs_to_archive:
-                print(f"{len(logs_to_archive)}개 로그를 압축 아카이빙...")
-                
-                for log in logs_to_archive:
-                    # 압축 처리는 _cleanup_old_logs에서 수행
-                    pass
+            legacy = conn.execute('''
+                SELECT id, compressed_data FROM logs_archive 
+                ORDER BY created_at, id
+                LIMIT ?
+            ''', (max(1, self.config.archive_block_rows) * 10,)).fetchall()
+            
+            if legacy:
+                print(f"{len(legacy)}개 구버전 아카이브 로그를 블록으로 재압축...")
+                rows = []
+                for row in legacy:
+                    data = json.loads(gzip.decompress(row['compressed_data']))
+                    rows.append({column: data.get(column) for column in self.LOG_COLUMNS})
                     
+                conn.execute('BEGIN')
+                self._write_archive_blocks(conn, rows)
+                ids = [row['id'] for row in legacy]
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    conn.execute(f"DELETE FROM logs_archive WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+                conn.execute('COMMIT')
+                
+        finally:
+            self.pool.release_writer(conn)
+            
+    def _evict_archive_blocks(self, count: int = 10) -> int:
+        """가장 오래된 아카이브 블록 삭제 (크기 기반 정리용) - 삭제된 블록 수 반환"""
+        conn = self.pool.acquire_writer()
+        try:
+            deleted = conn.execute('''
+                DELETE FROM logs_archive_blocks WHERE id IN (
+                    SELECT id FROM logs_archive_blocks ORDER BY max_created_at LIMIT ?
+                )
+            ''', (count,)).rowcount
+            conn.commit()
+            return deleted
+        finally:
+            self.pool.release_writer(conn)
+            
+    def _prune_rollups(self):
+        """보존 기간이 지난 롤업 삭제 (분 단위는 minute_rollup_hours, 나머지는 max_days)"""
+        now = time.time()
+        minute_cutoff = now - self.config.minute_rollup_hours * 3600
+        cutoff = now - self.config.max_days * 86400
+        
+        conn = self.pool.acquire_writer()
+        try:
+            conn.execute("DELETE FROM log_rollups WHERE granularity = 'm' AND bucket < ?", (minute_cutoff,))
+            conn.execute("DELETE FROM log_rollups WHERE granularity = 'h' AND bucket < ?", (cutoff,))
+            conn.execute("DELETE FROM log_latency WHERE granularity = 'm' AND bucket < ?", (minute_cutoff,))
+            conn.execute("DELETE FROM log_latency WHERE granularity = 'h' AND bucket < ?", (cutoff,))
+            conn.execute("DELETE FROM log_stats WHERE date < date(?, 'unixepoch')", (cutoff,))
+            conn.commit()
         finally:
-            conn.close()
+            self.pool.release_writer(conn)
             
     def _vacuum_database(self):
         """데이터베이스 최적화"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.pool.acquire_writer()
         try:
             print("데이터베이스 최적화 중...")
-            conn.execute('VACUUM')
-            conn.execute('ANALYZE')
+            # 전체 VACUUM 대신 드롭된 파티션의 빈 페이지만 반환 (쓰기 차단 최소화)
+            conn.execute('PRAGMA incremental_vacuum')
+            conn.execute('PRAGMA optimize')
             print("데이터베이스 최적화 완료")
         finally:
-            conn.close()
+            self.pool.release_writer(conn)
             
     def close(self):
         """저장소 종료"""
+        self.ingest_executor.shutdown(wait=True)
         self.batch_processor.stop()
         self.executor.shutdown(wait=True)
+        self.pool.close()
+        
+    def get_pool_stats(self) -> Dict:
+        """연결 풀 통계 (hit/miss, 대기 시간)"""
+        return self.pool.get_stats()
 
 
 # 편의 함수들
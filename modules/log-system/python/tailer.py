@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+파일 tail 엔진 - 여러 로그 파일을 한 태스크에서 따라 읽는다
+리눅스에서는 inotify(ctypes)로 변경을 통지받고, 그 외에는 주기적으로 확인한다.
+파일 읽기는 executor 스레드에서 큰 청크 단위로 하고, (inode, 오프셋) 체크포인트로
+재시작 후 이어 읽으며 logrotate(이름 변경/새 파일)와 copytruncate를 따라간다.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import struct
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+# inotify 이벤트 마스크 (<sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+
+# 디렉토리를 감시해야 파일이 새로 생기거나 이름이 바뀌는 것(로테이션)까지 보인다
+DIR_WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                  IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class Inotify:
+    """libc inotify 최소 래퍼 - 지원하지 않는 환경이면 생성 시 OSError"""
+    
+    def __init__(self):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify는 리눅스에서만 사용 가능")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        try:
+            self._add_watch = libc.inotify_add_watch
+            init = libc.inotify_init1
+        except AttributeError:
+            raise OSError("libc에 inotify 함수가 없음")
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.watches = {}  # wd -> 디렉토리
+        
+    def add_watch(self, directory: str, mask: int = DIR_WATCH_MASK) -> int:
+        wd = self._add_watch(self.fd, os.fsencode(directory), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), directory)
+        self.watches[wd] = directory
+        return wd
+        
+    def read_events(self) -> List[Tuple[str, int, str]]:
+        """쌓인 이벤트를 모두 읽어 (디렉토리, 마스크, 파일명) 목록으로 반환"""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + EVENT_HEADER.size <= len(data):
+                wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+                offset += length
+                if mask & IN_IGNORED:
+                    # 감시 대상 디렉토리가 지워짐 - 다음 재확인 때 다시 등록
+                    self.watches.pop(wd, None)
+                events.append((self.watches.get(wd, ''), mask, name))
+        return events
+        
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+        self.watches = {}
+
+
+class TailState:
+    """파일 하나의 읽기 상태
+    
+    offset은 완전한 줄까지 전달한 위치(다음 줄의 시작)이고, partial은 그 뒤에
+    읽었지만 아직 줄바꿈이 오지 않은 바이트다. 체크포인트에는 offset만 저장한다.
+    """
+    
+    __slots__ = ('path', 'handle', 'inode', 'device', 'offset', 'partial', 'boundary', 'lines', 'bytes',
+                 'rotations', 'truncations')
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.handle = None
+        self.inode = None
+        self.device = None
+        self.offset = 0
+        self.partial = b''
+        self.boundary = True  # offset이 줄바꿈 바로 뒤인지 (잘림 확인에 사용)
+        self.lines = 0
+        self.bytes = 0
+        self.rotations = 0
+        self.truncations = 0
+        
+    def checkpoint(self) -> Optional[Dict]:
+        if self.inode is None:
+            return None
+        return {'inode': self.inode, 'device': self.device, 'offset': self.offset}
+
+
+class FileTailer:
+    """여러 파일을 따라 읽어 새 줄을 on_lines(path, lines) 코루틴으로 넘긴다
+    
+    - 처음 보는 파일은 start_at_end면 끝에서부터, 실행 중 새로 생긴 파일은 처음부터 읽는다.
+    - checkpoint_path가 있으면 (inode, 오프셋)을 저장해 재시작 시 이어 읽는다. 그 사이
+      로테이션됐으면 같은 디렉토리에서 inode가 같은 파일(예: app.log.1)의 나머지를 먼저 읽는다.
+    - 경로의 inode가 바뀌면(이름 변경 로테이션) 열어 둔 이전 파일을 끝까지 읽고 새 파일로 넘어가고,
+      크기가 오프셋보다 작아지면(copytruncate) 처음부터 다시 읽는다.
+    """
+    
+    def __init__(self, paths: List[str], on_lines: Callable[[str, List[str]], Awaitable[None]],
+                 checkpoint_path: str = None, start_at_end: bool = True, use_inotify: bool = True,
+                 poll_interval: float = 0.5, rescan_interval: float = 5.0, chunk_size: int = 1024 * 1024,
+                 max_read_bytes: int = 16 * 1024 * 1024, max_line_bytes: int = 1024 * 1024,
+                 checkpoint_interval: float = 5.0, encoding: str = 'utf-8'):
+        self.states = {os.path.abspath(path): TailState(os.path.abspath(path)) for path in paths}
+        self.on_lines = on_lines
+        self.checkpoint_path = checkpoint_path
+        self.start_at_end = start_at_end
+        self.use_inotify = use_inotify
+        self.poll_interval = poll_interval
+        self.rescan_interval = rescan_interval
+        self.chunk_size = chunk_size
+        self.max_read_bytes = max_read_bytes  # 파일당 한 번에 읽을 최대 바이트 (나머지는 다음 차례에)
+        self.max_line_bytes = max_line_bytes
+        self.checkpoint_interval = checkpoint_interval
+        self.encoding = encoding
+        self.running = False
+        self.inotify = None
+        self.dirty = set()
+        self.wakeup = None
+        self.checkpoints = self._load_checkpoints()
+        self.last_checkpoint = time.time()
+        
+    # 체크포인트
+    
+    def _load_checkpoints(self) -> Dict:
+        if not self.checkpoint_path:
+            return {}
+        try:
+            with open(self.checkpoint_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+            
+    def save_checkpoints(self):
+        if not self.checkpoint_path:
+            return
+        data = dict(self.checkpoints)
+        for path, state in self.states.items():
+            checkpoint = state.checkpoint()
+            if checkpoint:
+                data[path] = checkpoint
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.checkpoint_path)
+        self.last_checkpoint = time.time()
+        
+    # 파일 읽기 (executor 스레드에서 실행)
+    
+    def _open(self, state: TailState, stat: os.stat_result, initial: bool) -> List[str]:
+        """경로의 현재 파일을 열고 읽기 시작 위치를 정한다 - 이어 읽을 로테이션 파일의 줄을 반환"""
+        lines = []
+        handle = open(state.path, 'rb')
+        state.handle = handle
+        state.inode, state.device = stat.st_ino, stat.st_dev
+        state.offset = 0
+        state.partial = b''
+        state.boundary = True
+        if not initial:
+            return lines  # 실행 중 새로 생긴/로테이션된 파일은 처음부터
+        checkpoint = self.checkpoints.pop(state.path, None)
+        if checkpoint and (checkpoint.get('inode'), checkpoint.get('device')) == (stat.st_ino, stat.st_dev):
+            # 같은 파일 - 잘렸으면(copytruncate) 처음부터
+            state.offset = checkpoint['offset'] if checkpoint['offset'] <= stat.st_size else 0
+        elif checkpoint:
+            # 중단된 사이 로테이션됨 - 이전 파일이 남아 있으면 나머지를 먼저 읽는다
+            lines = self._drain_rotated(state, checkpoint)
+        elif self.start_at_end:
+            state.offset = stat.st_size
+        handle.seek(state.offset)
+        return lines
+        
+    def _drain_rotated(self, state: TailState, checkpoint: Dict) -> List[str]:
+        directory, base = os.path.split(state.path)
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return []
+        for entry in entries:
+            if not entry.name.startswith(base + '.'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if (stat.st_ino, stat.st_dev) != (checkpoint.get('inode'), checkpoint.get('device')):
+                continue
+            rotated = TailState(entry.path)
+            try:
+                rotated.handle = open(entry.path, 'rb')
+            except OSError:
+                return []
+            try:
+                rotated.offset = checkpoint['offset'] if checkpoint['offset'] <= stat.st_size else 0
+                rotated.handle.seek(rotated.offset)
+                lines = self._read_available(rotated, limit=None)
+                lines.extend(self._flush_partial(rotated))
+            finally:
+                rotated.handle.close()
+            state.rotations += 1
+            state.lines += len(lines)
+            state.bytes += rotated.bytes
+            return lines
+        return []
+        
+    def _read_available(self, state: TailState, limit: Optional[int]) -> List[str]:
+        """열린 파일에서 limit 바이트까지 청크 단위로 읽어 완성된 줄 목록 반환"""
+        lines = []
+        total = 0
+        while limit is None or total < limit:
+            chunk = state.handle.read(self.chunk_size)
+            if not chunk:
+                break
+            total += len(chunk)
+            data = state.partial + chunk if state.partial else chunk
+            end = data.rfind(b'\n')
+            if end < 0:
+                # 줄바꿈 없는 거대한 줄 - max_line_bytes 조각으로 나눠 모두 내보내고 나머지는 이어 읽는다
+                size = self.max_line_bytes
+                pieces = (len(data) - 1) // size if len(data) > size else 0
+                for start in range(0, pieces * size, size):
+                    lines.append(data[start:start + size].decode(self.encoding, 'replace'))
+                if pieces:
+                    state.offset += pieces * size
+                    state.boundary = False
+                state.partial = data[pieces * size:]
+                continue
+            state.partial = data[end + 1:]
+            state.offset += end + 1
+            state.boundary = True
+            for line in data[:end].split(b'\n'):
+                line = line.rstrip(b'\r')
+                for start in range(0, max(len(line), 1), self.max_line_bytes):
+                    lines.append(line[start:start + self.max_line_bytes].decode(self.encoding, 'replace'))
+        state.bytes += total
+        state.lines += len(lines)
+        return lines
+        
+    def _flush_partial(self, state: TailState) -> List[str]:
+        """더 이상 이어 쓰이지 않을 파일의 마지막 줄 (줄바꿈 없이 끝난 경우)"""
+        if not state.partial:
+            return []
+        line = state.partial.rstrip(b'\r').decode(self.encoding, 'replace')
+        state.offset += len(state.partial)
+        state.partial = b''
+        state.boundary = False
+        state.lines += 1
+        return [line]
+        
+    def _close(self, state: TailState):
+        if state.handle:
+            state.handle.close()
+        state.handle = None
+        
+    def _truncated(self, state: TailState, stat: os.stat_result) -> bool:
+        """잘린 뒤 다시 쓰여 크기가 이전 오프셋을 넘었을 수도 있으므로, 크기와 함께
+        오프셋 바로 앞 바이트가 여전히 줄바꿈인지 확인한다"""
+        if stat.st_size < state.offset + len(state.partial):
+            return True
+        if state.offset == 0 or not state.boundary:
+            return False
+        return os.pread(state.handle.fileno(), 1, state.offset - 1) != b'\n'
+        
+    def _poll_file(self, state: TailState, initial: bool = False) -> Tuple[List[str], bool]:
+        """파일 하나의 새 줄을 읽는다 - (줄 목록, 아직 읽을 게 남았는지)"""
+        try:
+            stat = os.stat(state.path)
+        except FileNotFoundError:
+            stat = None
+        lines = []
+        
+        if state.handle is not None:
+            rotated = stat is None or (stat.st_ino, stat.st_dev) != (state.inode, state.device)
+            if not rotated and self._truncated(state, stat):
+                # copytruncate - 같은 파일이 잘림
+                lines.extend(self._flush_partial(state))
+                state.truncations += 1
+                state.offset = 0
+                state.boundary = True
+                state.handle.seek(0)
+            if rotated:
+                # 이름이 바뀐 이전 파일은 끝까지 읽고 닫는다
+                lines.extend(self._read_available(state, limit=None))
+                lines.extend(self._flush_partial(state))
+                self._close(state)
+                state.rotations += 1
+            else:
+                lines.extend(self._read_available(state, self.max_read_bytes))
+                
+        if state.handle is None and stat is not None:
+            try:
+                lines.extend(self._open(state, stat, initial))
+            except OSError:
+                return lines, False
+            lines.extend(self._read_available(state, self.max_read_bytes))
+            
+        pending = state.handle is not None and stat is not None and \
+            stat.st_size > state.offset + len(state.partial)
+        return lines, pending
+        
+    def _poll_files(self, paths: List[str], initial: bool = False) -> List[Tuple[str, List[str], bool]]:
+        results = []
+        for path in paths:
+            state = self.states[path]
+            try:
+                lines, pending = self._poll_file(state, initial)
+            except OSError as e:
+                print(f"[WARNING] 파일 읽기 실패 ({path}): {e}")
+                self._close(state)
+                lines, pending = [], False
+            results.append((path, lines, pending))
+        return results
+        
+    # 변경 통지
+    
+    def _start_inotify(self, loop: asyncio.AbstractEventLoop):
+        if not self.use_inotify:
+            return
+        try:
+            self.inotify = Inotify()
+        except OSError as e:
+            print(f"[INFO] inotify 사용 불가, 주기적 확인으로 대체: {e}")
+            self.inotify = None
+            return
+        self._add_watches()
+        loop.add_reader(self.inotify.fd, self._on_inotify)
+        
+    def _add_watches(self):
+        """감시 중이 아닌 디렉토리 등록 (아직 없는 디렉토리는 다음 재확인 때 다시 시도)"""
+        watched = set(self.inotify.watches.values())
+        for directory in {os.path.dirname(path) for path in self.states}:
+            if directory in watched:
+                continue
+            try:
+                self.inotify.add_watch(directory)
+            except OSError:
+                pass
+                
+    def _on_inotify(self):
+        by_dir = {}
+        for path in self.states:
+            by_dir.setdefault(os.path.dirname(path), {})[os.path.basename(path)] = path
+        for directory, mask, name in self.inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                self.dirty.update(self.states)
+                continue
+            files = by_dir.get(directory)
+            if not files:
+                continue
+            if name in files:
+                self.dirty.add(files[name])
+            elif mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                self.dirty.update(files.values())
+        if self.dirty:
+            self.wakeup.set()
+            
+    def _stop_inotify(self, loop: asyncio.AbstractEventLoop):
+        if self.inotify:
+            try:
+                loop.remove_reader(self.inotify.fd)
+            except (ValueError, OSError):
+                pass
+            self.inotify.close()
+            self.inotify = None
+            
+    # 실행
+    
+    async def _dispatch(self, results: List[Tuple[str, List[str], bool]]):
+        for path, lines, pending in results:
+            if lines:
+                await self.on_lines(path, lines)
+            if pending:
+                self.dirty.add(path)
+        if self.dirty:
+            self.wakeup.set()
+            
+    async def run(self):
+        """stop()이 호출될 때까지 파일을 따라 읽는다"""
+        loop = asyncio.get_running_loop()
+        self.running = True
+        self.wakeup = asyncio.Event()
+        self._start_inotify(loop)
+        try:
+            results = await loop.run_in_executor(None, self._poll_files, list(self.states), True)
+            await self._dispatch(results)
+            last_scan = time.time()
+            
+            while self.running:
+                timeout = self.rescan_interval if self.inotify else self.poll_interval
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                if not self.running:
+                    break
+                    
+                # inotify가 놓친 변경(감시 전 생성된 디렉토리, NFS 등)에 대비해 주기적으로 전체 확인
+                if time.time() - last_scan >= timeout:
+                    self.dirty.update(self.states)
+                    if self.inotify:
+                        self._add_watches()
+                    last_scan = time.time()
+                if not self.dirty:
+                    continue
+                    
+                paths, self.dirty = list(self.dirty), set()
+                results = await loop.run_in_executor(None, self._poll_files, paths)
+                await self._dispatch(results)
+                
+                if self.checkpoint_path and time.time() - self.last_checkpoint >= self.checkpoint_interval:
+                    await loop.run_in_executor(None, self.save_checkpoints)
+        finally:
+            self._stop_inotify(loop)
+            await loop.run_in_executor(None, self.save_checkpoints)
+            for state in self.states.values():
+                self._close(state)
+                
+    def stop(self):
+        self.running = False
+        if self.wakeup:
+            self.wakeup.set()
+            
+    def get_stats(self) -> Dict:
+        return {
+            'mode': 'inotify' if self.inotify else 'polling',
+            'files': {
+                path: {
+                    'open': state.handle is not None,
+                    'inode': state.inode,
+                    'offset': state.offset,
+                    'lines': state.lines,
+                    'bytes': state.bytes,
+                    'rotations': state.rotations,
+                    'truncations': state.truncations
+                }
+                for path, state in self.states.items()
+            }
+        }